@@ -6,6 +6,7 @@ about.py
 import wx
 import wx.richtext as rt
 import webbrowser
+import assets
 
 class About(wx.Dialog):
     def __init__(self, parent):
@@ -27,7 +28,7 @@ class About(wx.Dialog):
 
         master = wx.BoxSizer(wx.VERTICAL)
 
-        logo = wx.StaticBitmap(self, -1, wx.Bitmap('images/icons/app_logo.ico'))
+        logo = wx.StaticBitmap(self, -1, assets.manager.getBitmap('images/icons/app_logo.ico'))
         name = wx.StaticText(self, -1, 'Laboratório Virtual de Bombas Hidráulicas')
         ver = wx.StaticText(self, -1, f'Versão: {self.parent.version}')
         pyVer = wx.StaticText(self, -1, 'Python: 3.9.2')
@@ -86,7 +87,7 @@ class About(wx.Dialog):
 
         self.rtc.Newline()
         self.rtc.BeginAlignment(wx.TEXT_ALIGNMENT_CENTER)
-        self.rtc.WriteImage(wx.Bitmap('images/lab_logo_50.png'))
+        self.rtc.WriteImage(assets.manager.getBitmap('images/lab_logo_50.png'))
         self.rtc.Newline()
 
         self.rtc.AppendText('Laboratório de Eficiência Energética e Hidráulica no Saneamento')
@@ -0,0 +1,479 @@
+"""
+Arquivo responsável pelo gerenciador central de imagens (wx.Bitmap / wx.Image) do programa.
+assets.py
+"""
+
+import os
+import sys
+import json
+import struct
+import queue
+import atexit
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import wx
+import imaging
+
+MB = 1024 * 1024
+DEFAULT_BUDGET = 256 * MB
+DEFAULT_DISK_BUDGET = 512 * MB
+PERSIST_DELAY = 500     # ms sem redimensionar a janela até o tamanho final da imagem ser gravado em disco.
+
+MAGIC = b'LVI1'
+HEADER = struct.Struct('<4sIIB')    # MAGIC, largura, altura, tem alpha
+INDEX = 'index.json'
+
+def getCacheDir():
+    ''' Retorna a pasta de cache de imagens do usuário, de acordo com o sistema operacional. '''
+
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    elif sys.platform == 'darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'labvirtual', 'images')
+
+class DiskCache():
+    ''' Guarda em disco, entre execuções, imagens já decodificadas e redimensionadas, sem compressão.
+    Cada arquivo é identificado pelo hash do conteúdo da imagem de origem, pelo tamanho e pelas sobreposições
+    desenhadas sobre ela. Os arquivos usados há mais tempo (LRU) são apagados quando `capacity` é ultrapassada.
+    As gravações acontecem em uma thread, fora da UI. '''
+
+    def __init__(self, folder, capacity=DEFAULT_DISK_BUDGET):
+        self.folder = folder
+        self.capacity = capacity
+        self.digests = {}           # path -> ((mtime, tamanho do arquivo), hash)
+        self.sources = {}           # hash -> [largura, altura] da imagem de origem
+        self.files = OrderedDict()  # nome do arquivo -> bytes. O último é o mais recente.
+        self.usedBytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self.lock = threading.RLock()   # Protege `files` e `usedBytes`, também alterados pela thread de gravação.
+        self.jobs = queue.Queue()       # (nome do arquivo, imaging.Pixels ou bytes) a gravar.
+        self.queued = set()             # Nomes na fila, para não gravar o mesmo arquivo duas vezes.
+        self.thread = None
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+            self.scan()
+            self.enabled = True
+        except OSError:
+            self.enabled = False
+
+        atexit.register(self.flush)
+
+    def scan(self):
+        ''' Lê o índice e a lista de arquivos já gravados, do menos para o mais recente. '''
+
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.raw'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+
+        for _, name, size in sorted(entries):
+            self.files[name] = size
+            self.usedBytes += size
+
+        try:
+            with open(os.path.join(self.folder, INDEX), 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def getDigest(self, path, verify=True):
+        ''' Retorna o hash do conteúdo de `path`. O arquivo só é lido de novo se o mtime ou o tamanho mudarem.
+        Sem `verify`, nem o mtime é consultado: retorna o hash já calculado, ou None se ainda não houver. '''
+
+        if not verify:
+            memo = self.digests.get(path)
+            return memo[1] if memo else None
+
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        memo = self.digests.get(path)
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(MB), b''):
+                sha.update(chunk)
+
+        digest = sha.hexdigest()[:20]
+        self.digests[path] = (signature, digest)
+        return digest
+
+    def getName(self, path, layers, size, verify=True):
+        ''' Retorna o nome do arquivo de `path` com as camadas `layers` ([(nome, path, (x, y)), ...]) em `size`.
+        Sem `verify`, usa apenas os hashes já calculados (veja getDigest) e retorna None se faltar algum. '''
+
+        digests = [self.getDigest(layerPath, verify) for _, layerPath, _ in layers]
+        digest = self.getDigest(path, verify)
+        if digest is None or None in digests:
+            return None
+
+        overlay = 'base'
+        if layers:
+            key = ';'.join(f'{name}:{layerDigest}@{pos[0]},{pos[1]}' for (name, _, pos), layerDigest in zip(layers, digests))
+            overlay = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+        return f'{digest}_{overlay}_{size[0]}x{size[1]}.raw'
+
+    def getSourceSize(self, path):
+        ''' Retorna (largura, altura) da imagem original de `path`, se ela já foi vista, ou None. '''
+
+        if not self.enabled:
+            return None
+
+        try:
+            size = self.sources.get(self.getDigest(path))
+        except OSError:
+            return None
+
+        return tuple(size) if size else None
+
+    def setSourceSize(self, path, size):
+        ''' Grava no índice o tamanho original da imagem de `path`. '''
+
+        if not self.enabled:
+            return
+
+        try:
+            digest = self.getDigest(path)
+            if self.sources.get(digest) == list(size):
+                return
+
+            self.sources[digest] = list(size)
+        except OSError:
+            return
+
+        self.enqueue(INDEX, json.dumps(self.sources).encode('utf-8'))
+
+    def load(self, path, layers, size, verify=True):
+        ''' Retorna o imaging.Pixels gravado para `path`, `layers` e `size`, ou None se não houver.
+        Os arrays são views dos bytes lidos do arquivo, sem cópia. Sem `verify`, os arquivos de origem não são
+        consultados (veja getDigest): só há leitura do disco quando a versão pedida existe. '''
+
+        if not self.enabled:
+            return None
+
+        try:
+            name = self.getName(path, layers, size, verify)
+            with self.lock:
+                isStored = name in self.files
+            if not isStored:
+                self.misses += 1
+                return None
+
+            filepath = os.path.join(self.folder, name)
+            with open(filepath, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        magic, width, height, hasAlpha = HEADER.unpack_from(data) if len(data) >= HEADER.size else (None, 0, 0, 0)
+        pixels = width * height
+        if magic != MAGIC or (width, height) != tuple(size) or len(data) != HEADER.size + pixels * (4 if hasAlpha else 3):
+            self.remove(name)
+            self.misses += 1
+            return None
+
+        rgb = np.frombuffer(data, np.uint8, pixels * 3, HEADER.size).reshape(height, width, 3)
+        alpha = None
+        if hasAlpha:
+            alpha = np.frombuffer(data, np.uint8, pixels, HEADER.size + pixels * 3).reshape(height, width)
+
+        with self.lock:
+            if name in self.files:
+                self.files.move_to_end(name)
+        try:
+            os.utime(filepath)      # Para manter a ordem LRU na próxima execução.
+        except OSError:
+            pass
+
+        self.hits += 1
+        return imaging.Pixels(rgb, alpha, data)
+
+    def save(self, path, layers, size, pixels):
+        ''' Agenda a gravação de `pixels` (imaging.Pixels) como a versão de `path` com `layers` em `size`.
+        Não faz nada se ela já estiver gravada. Retorna imediatamente. '''
+
+        if not self.enabled:
+            return
+
+        try:
+            name = self.getName(path, layers, size)
+        except OSError:
+            return
+
+        with self.lock:
+            if name in self.files:
+                return
+
+        self.enqueue(name, pixels)
+
+    def enqueue(self, name, content):
+        ''' Coloca na fila da thread de gravação o arquivo `name`, com `content` (imaging.Pixels ou bytes). '''
+
+        with self.lock:
+            if name in self.queued and name != INDEX:
+                return
+            self.queued.add(name)
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name='DiskCache', daemon=True)
+            self.thread.start()
+
+        self.jobs.put((name, content))
+
+    def work(self):
+        ''' Thread que grava os arquivos da fila, um por vez. '''
+
+        while True:
+            name, content = self.jobs.get()
+            try:
+                self.write(name, content)
+            except OSError:
+                pass
+            finally:
+                with self.lock:
+                    self.queued.discard(name)
+                self.jobs.task_done()
+
+    def write(self, name, content):
+        ''' Grava o arquivo `name`. Chamada pela thread de gravação. '''
+
+        if name == INDEX:
+            self.writeFile(INDEX, [content])
+            return
+
+        hasAlpha = content.alpha is not None
+        chunks = [HEADER.pack(MAGIC, content.width, content.height, int(hasAlpha)), np.ascontiguousarray(content.rgb)]
+        if hasAlpha:
+            chunks.append(np.ascontiguousarray(content.alpha))
+
+        written = self.writeFile(name, chunks)
+        with self.lock:
+            self.usedBytes -= self.files.pop(name, 0)
+            self.files[name] = written
+            self.usedBytes += written
+            self.evict()
+
+    def flush(self):
+        ''' Espera as gravações pendentes terminarem. '''
+
+        if self.thread is not None:
+            self.jobs.join()
+
+    def writeFile(self, name, chunks):
+        ''' Grava `chunks` em `name` de forma atômica e retorna a quantidade de bytes gravados. '''
+
+        fd, tmpPath = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                written = f.tell()
+            os.replace(tmpPath, os.path.join(self.folder, name))
+        except OSError:
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+            raise
+
+        return written
+
+    def remove(self, name):
+        ''' Apaga o arquivo `name` do cache. '''
+
+        with self.lock:
+            self.usedBytes -= self.files.pop(name, 0)
+        try:
+            os.remove(os.path.join(self.folder, name))
+        except OSError:
+            pass
+
+    def evict(self):
+        ''' Apaga os arquivos menos usados até `self.usedBytes` caber em `self.capacity`. '''
+
+        with self.lock:
+            while self.usedBytes > self.capacity and len(self.files) > 1:
+                self.remove(next(iter(self.files)))
+
+class AssetManager():
+    ''' Carrega cada arquivo de imagem uma única vez, contabiliza o tamanho decodificado e descarta
+    as entradas usadas há mais tempo (LRU) quando o orçamento de memória é ultrapassado. '''
+
+    def __init__(self, budget=DEFAULT_BUDGET, disk=None):
+        self.budget = budget
+        self.disk = disk                # DiskCache com as imagens decodificadas das execuções anteriores, ou None (veja setDisk).
+        self.entries = OrderedDict()    # (tipo, path) -> (objeto, bytes). O último é o mais recente.
+        self.usedBytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getBitmap(self, path, bitmapType=wx.BITMAP_TYPE_ANY):
+        ''' Retorna o wx.Bitmap de `path`. O bitmap é compartilhado: não desenhe sobre ele. '''
+
+        key = ('bitmap', path)
+        entry = self.lookup(key)
+        if entry is not None:
+            return entry
+
+        bitmap = wx.Bitmap(path, bitmapType)
+        if bitmap.IsOk():
+            depth = max(bitmap.GetDepth(), 24)
+            self.store(key, bitmap, bitmap.GetWidth() * bitmap.GetHeight() * depth // 8)
+
+        return bitmap
+
+    def getPixels(self, path, persist=True):
+        ''' Retorna o imaging.Pixels de `path`, ou None se o arquivo não puder ser lido.
+        Os arrays são compartilhados: não os modifique. Com `persist`, a versão decodificada também vai para o disco. '''
+
+        key = ('pixels', path)
+        entry = self.lookup(key)
+        if entry is not None:
+            return entry
+
+        pixels = None
+        size = self.disk.getSourceSize(path) if self.disk else None
+        if size:
+            pixels = self.disk.load(path, [], size)
+
+        if pixels is None:
+            pixels = imaging.decode(path)
+            if pixels is None:
+                return None
+
+            if self.disk and persist:
+                self.disk.setSourceSize(path, pixels.getSize())
+                self.disk.save(path, [], pixels.getSize(), pixels)
+
+        self.store(key, pixels, pixels.getBytes())
+        return pixels
+
+    def getImageSize(self, path):
+        ''' Retorna (largura, altura) da imagem de `path`, sem decodificá-la se o tamanho já for conhecido. '''
+
+        entry = self.entries.get(('pixels', path))
+        if entry is not None:
+            return entry[0].getSize()
+
+        size = self.disk.getSourceSize(path) if self.disk else None
+        if size:
+            return size
+
+        return self.getPixels(path).getSize()
+
+    def setDisk(self, disk):
+        ''' Passa a usar o DiskCache `disk`. Sem ele, nada é lido nem gravado em disco. '''
+
+        self.disk = disk
+
+    def getScaled(self, path, layers, size, compose, isResizing=False):
+        ''' Retorna um array RGB (altura, largura, 3) de `path`, com as camadas `layers` ([(nome, path, (x, y)), ...]),
+        em `size`. `compose()` deve retornar o imaging.Pixels montado em tamanho original e só é chamada se o disco
+        não tiver esta versão. Uma versão nova é gravada em disco, exceto durante o redimensionamento da janela
+        (`isResizing`): aí o disco só é lido se a versão existir e o tamanho final é gravado por persistScaled. '''
+
+        if self.disk:
+            pixels = self.disk.load(path, layers, size, not isResizing)
+            if pixels is not None:
+                return pixels.rgb
+
+        rgb = imaging.scaler.scale(compose().rgb, size)
+        if self.disk and not isResizing:
+            self.disk.save(path, layers, size, imaging.Pixels(rgb))
+
+        return rgb
+
+    def persistScaled(self, path, layers, rgb):
+        ''' Grava em disco `rgb`, a versão de `path` com `layers` exibida depois de um redimensionamento. '''
+
+        if self.disk:
+            self.disk.save(path, layers, (rgb.shape[1], rgb.shape[0]), imaging.Pixels(rgb))
+
+    def lookup(self, key):
+        ''' Retorna o objeto em cache para `key`, ou None. Conta acertos e falhas. '''
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def store(self, key, obj, size):
+        ''' Guarda `obj` no cache e descarta as entradas mais antigas até caber no orçamento. '''
+
+        self.entries[key] = (obj, size)
+        self.usedBytes += size
+        self.evict()
+
+    def evict(self):
+        ''' Descarta as entradas menos usadas até `self.usedBytes` caber em `self.budget`.
+        A entrada mais recente nunca é descartada, mesmo que sozinha seja maior que o orçamento. '''
+
+        while self.usedBytes > self.budget and len(self.entries) > 1:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.usedBytes -= size
+            self.evictions += 1
+
+    def setBudget(self, budget):
+        ''' Muda o orçamento de memória, em bytes. '''
+
+        self.budget = budget
+        self.evict()
+
+    def release(self, prefix):
+        ''' Descarta todas as entradas do arquivo ou da pasta `prefix`. 'data/system1' não inclui 'data/system10'. '''
+
+        folder = prefix.rstrip('/') + '/'
+        for key in [key for key in self.entries if key[1] == prefix or key[1].startswith(folder)]:
+            _, size = self.entries.pop(key)
+            self.usedBytes -= size
+
+    def getStats(self):
+        ''' Retorna um dicionário com as estatísticas do cache. '''
+
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'usedBytes': self.usedBytes,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hitRate': self.hits / total if total else 0.0
+        }
+
+    def formatStats(self):
+        ''' Retorna as estatísticas do cache em uma linha de texto. '''
+
+        stats = self.getStats()
+        text = (f"Imagens: {stats['entries']} ({stats['usedBytes'] / MB:.1f} / {stats['budget'] / MB:.0f} MB), "
+                f"acertos: {stats['hits']}, falhas: {stats['misses']}, descartes: {stats['evictions']}, "
+                f"taxa de acerto: {stats['hitRate']:.0%}")
+
+        if self.disk and self.disk.enabled:
+            text += (f" | Disco: {len(self.disk.files)} ({self.disk.usedBytes / MB:.1f} / {self.disk.capacity / MB:.0f} MB), "
+                     f"acertos: {self.disk.hits}, falhas: {self.disk.misses}")
+
+        return text
+
+manager = AssetManager()     # O cache em disco é ligado pelo Init (setDisk), não ao importar o módulo.
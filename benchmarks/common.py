@@ -0,0 +1,123 @@
+"""
+Funções compartilhadas pelos benchmarks: preparação do ambiente, medição e gravação dos resultados.
+benchmarks/common.py
+"""
+
+import os
+import sys
+import json
+import timeit
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+# Configuração usada em todas as medições, com o tutorial de startup desligado.
+CONFIG = [
+    "version = 1.0\n",
+    "buttonStyle = Cor gradiente\n",
+    "buttonBackgroundColor = Azul\n",
+    "buttonHoverColor = 14120448\n",
+    "tooltipContent = 1\n",
+    "initMaximized = 0\n",
+    "soundActive = 1\n",
+    "volume = 25\n",
+    "assetBudget = 256\n",
+    "audioBuffer = 512\n",
+    "watchdogThreshold = 500\n",
+    "acquisitionRate = 10\n",
+    "acquisitionWindow = 3600\n",
+    "tutorial = 0"
+]
+
+def setup():
+    ''' Prepara o processo para importar os módulos do programa: os caminhos das imagens são relativos à raiz
+    do repositório e as pastas do usuário são trocadas por uma temporária, para não tocar na configuração
+    nem no cache de imagens reais. '''
+
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    home = tempfile.mkdtemp(prefix='labvirtual_bench_')
+    os.environ['HOME'] = home
+    os.environ['USERPROFILE'] = home
+    os.environ['XDG_CACHE_HOME'] = os.path.join(home, '.cache')
+    os.environ['LOCALAPPDATA'] = os.path.join(home, 'AppData', 'Local')
+    return home
+
+def writeConfig(home):
+    ''' Grava `CONFIG` como o labvirtual_config.ini da pasta do usuário `home`. '''
+
+    with open(os.path.join(home, 'labvirtual_config.ini'), 'w', encoding='utf-8') as f:
+        f.write(''.join(CONFIG))
+
+def getRSS():
+    ''' Retorna a memória residente do processo em MB, ou None se não for possível medir (apenas Linux). '''
+
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def percentile(values, p):
+    ''' Retorna o percentil `p` de `values`. '''
+
+    values = sorted(values)
+    last = len(values) - 1
+    return values[min(last, int(round(p / 100 * last)))]
+
+def bench(name, func, repeat=5, number=None):
+    ''' Mede `func` e retorna um dicionário com os tempos por chamada, em microssegundos.
+    Sem `number`, o número de chamadas por repetição é calibrado para durar pelo menos 0.2 s. '''
+
+    timer = timeit.Timer(func)
+    if number is None:
+        number, _ = timer.autorange()
+
+    times = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    result = {
+        'number': number,
+        'repeat': repeat,
+        'min_us': min(times),
+        'median_us': statistics.median(times),
+        'mean_us': statistics.mean(times),
+        'stdev_us': statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+
+    print(f"{name:<45} {result['median_us']:>14.1f} us  (min {result['min_us']:.1f}, n={number}x{repeat})")
+    return result
+
+def getMetadata():
+    ''' Retorna as informações da máquina e das versões, gravadas junto com os resultados. '''
+
+    meta = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor()
+    }
+
+    try:
+        import wx
+        meta['wx'] = wx.version()
+    except ImportError:
+        pass
+
+    return meta
+
+def writeResults(path, results):
+    ''' Grava `results` em `path` (JSON), junto com os metadados. '''
+
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': getMetadata(), 'results': results}, f, indent=4, ensure_ascii=False)
+
+    print(f"\nResultados gravados em {path}")
@@ -0,0 +1,201 @@
+"""
+Microbenchmarks dos trechos mais usados do programa. Os resultados são gravados em JSON para comparar versões.
+Uso: python benchmarks/hotpaths.py [-o saida.json] [-k filtro] [--sizes 10 1000 100000]
+benchmarks/hotpaths.py
+"""
+
+import os
+import sys
+import random
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+HOME = common.setup()
+
+import wx
+import systems
+import layout
+import helper
+import settings
+import imaging
+import simulation
+import derived
+
+KEYS = ['abertura', 'q(l/m)', 'rpm', 'p1', 'p2', 'piezometro']     # Mesma ordem dos controles (buttons.json).
+WINDOW_SIZES = [(1200, 700), (1366, 768), (1920, 1080), (2560, 1440)]
+SEED = 2021
+
+class ParentStub(wx.Frame):
+    ''' Faz o papel do MainFrame para as janelas que só precisam de alguns atributos dele. '''
+
+    def __init__(self, system):
+        super().__init__(None)
+
+        self.version = 1.0
+        self.isTutorial = False
+        self.settingsWindow = None
+        self.path = system.path
+        self.ctrls = []
+        self.derivedCtrls = {}
+        self.derived = derived.DerivedTable(system.getJson('data'))
+
+        for dic in system.getJson('buttons'):
+            self.ctrls.append(wx.TextCtrl(self, -1, name=dic['jsonKey']))
+
+    def getSteadyStatus(self):
+        status = {ctrl.GetName(): ctrl.GetValue() for ctrl in self.ctrls}
+        status.update(self.derived.getText(7))     # Os controles mostram a linha 7 de data.json.
+        return status
+
+def getControlValues(system, rng):
+    ''' Sorteia valores possíveis para os controles que o usuário pode modificar. '''
+
+    values = []
+    for dic in system.getJson('buttons'):
+        if dic['isControllable']:
+            if dic['jsonKey'] == 'rpm':
+                value = rng.choice([f"{unit[0]} ({unit[1]})" for unit in dic['unit']])
+            else:
+                value = rng.choice(['0', '25', '50', '75', '100'])
+            values.append({'key': dic['jsonKey'], 'value': value})
+
+    return values
+
+def makeReportList(system, count, rng):
+    ''' Cria uma lista de modificações no formato de `Report.reportList`. '''
+
+    data = system.getJson('data')
+    table = derived.DerivedTable(data)
+    reportList = []
+    for _ in range(count):
+        before = rng.randrange(len(data))
+        after = rng.randrange(len(data))
+        state = {
+            'before': {**{key: str(data[before][key]) for key in KEYS}, **table.getText(before)},
+            'changed': {'abertura': str(data[after]['abertura'])} if rng.random() < 0.5 else {'rpm': data[after]['rpm']},
+            'after': {**{key: str(data[after][key]) for key in KEYS}, **table.getText(after)}
+        }
+        reportList.append(state)
+
+    return reportList
+
+def fitSize(imageSize, windowSize):
+    ''' Mesmo cálculo do frameImage: o maior tamanho que cabe na janela sem distorcer a imagem. '''
+
+    aspect = imageSize[0] / imageSize[1]
+    width = windowSize[0]
+    height = int(width / aspect)
+    if height > windowSize[1]:
+        height = windowSize[1]
+        width = int(height * aspect)
+
+    return width, height
+
+def run(args):
+    ''' Executa os benchmarks e retorna {nome: resultado}. '''
+
+    rng = random.Random(SEED)
+    system = systems.SystemRegistry('data').getDefault()
+    results = {}
+
+    def add(name, func, **kwargs):
+        if args.filter and args.filter not in name:
+            return
+        results[name] = common.bench(name, func, **kwargs)
+
+    # Resolução do estado em data.json, como em OnValueChanged.
+    samples = [getControlValues(system, rng) for _ in range(256)]
+    cycle = {'i': 0}
+
+    def findDataIndex():
+        cycle['i'] = (cycle['i'] + 1) % len(samples)
+        system.findDataIndex(samples[cycle['i']])
+
+    add('state/findDataIndex', findDataIndex)
+
+    # Gravação de uma modificação no relatório, como em TakeNote.
+    parent = ParentStub(system)
+    report = helper.Report(parent)
+    for ctrl, key in zip(parent.ctrls, KEYS):
+        ctrl.SetValue(str(system.getJson('data')[7][key]))
+    before = {key: str(system.getJson('data')[6][key]) for key in KEYS}
+    before.update(parent.derived.getText(6))
+
+    def takeNotes():
+        for _ in range(100):
+            report.TakeNote(before, parent.ctrls[0])
+        report.ClearScrolled()
+
+    add('report/TakeNote x100', takeNotes, repeat=3)
+
+    # Exportação em CSV e PDF.
+    path = os.path.join(HOME, 'export')
+    for size in args.sizes:
+        fixture = SimpleNamespace(reportList=makeReportList(system, size, rng), order=report.order)
+        big = size >= 100000
+        add(f'export/csv {size}', lambda: helper.Export.writeCSV(fixture, path + '.csv'),
+            repeat=1 if big else 5, number=1 if big else None)
+        add(f'export/pdf {size}', lambda: helper.Export.writePDF(fixture, path + '.pdf'),
+            repeat=1 if size >= 1000 else 5, number=1 if size >= 1000 else None)
+
+    # Leitura das configurações, como em Settings.applyUserConfig.
+    common.writeConfig(HOME)
+    settingsFrame = settings.Settings(parent, True)
+    settingsFrame.fileLines = common.CONFIG[:]
+    add('config/applyUserConfig', lambda: settingsFrame.applyUserConfig(True))
+
+    # Posição dos botões sobre a imagem, como em updateButtons.
+    coordinates = [dic['coordinates'] for dic in system.getJson('buttons')]
+    coordinates += [dic['coordinates'] for dic in system.getJson('misc_buttons')]
+    overlay = layout.OverlayLayout(coordinates)
+    pixels = imaging.decode(system.getImages()[0])
+    aspect = pixels.width / pixels.height
+
+    def layoutCold():
+        overlay.cache.clear()
+        overlay.getPositions((1366, 768), aspect, 0)
+
+    add('layout/getPositions cold', layoutCold)
+    add('layout/getPositions cached', lambda: overlay.getPositions((1366, 768), aspect, 0))
+
+    # Decodificação e redimensionamento da imagem principal, como em frameImage.
+    add('image/decode 0.JPG', lambda: imaging.decode(system.getImages()[0]), repeat=3)
+    for windowSize in WINDOW_SIZES:
+        width, height = fitSize(pixels.getSize(), windowSize)
+        add(f'image/scale {windowSize[0]}x{windowSize[1]}',
+            lambda: imaging.toBitmap(imaging.scaler.scale(pixels.rgb, (width, height))), repeat=3)
+
+    # Um tick da simulação dos transitórios, como em OnSimulationTimer.
+    data = system.getJson('data')
+    keys = ['q(l/m)', 'p1', 'p2', 'piezometro']
+    transient = simulation.Transient(['rpm'] + keys, [0.5] + [1e-9] * len(keys))
+    points = [[int(row['rpm'].split()[0])] + [row[key] for key in keys] for row in data]
+    clock = {'now': 0.0, 'i': 0}
+    transient.setTarget(points[0], 0.0)
+
+    def simulationTick():
+        clock['now'] += 1 / simulation.FPS
+        if transient.isSettled():
+            clock['i'] = (clock['i'] + 1) % len(points)
+            transient.setTarget(points[clock['i']], clock['now'])
+        transient.advance(clock['now'])
+
+    add('simulation/advance', simulationTick)
+
+    settingsFrame.Destroy()
+    report.Destroy()
+    parent.Destroy()
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Microbenchmarks do Laboratório Virtual.')
+    parser.add_argument('-o', '--output', default=os.path.join(common.ROOT, 'benchmarks', 'hotpaths.json'))
+    parser.add_argument('-k', '--filter', default='', help='Executa apenas os benchmarks cujo nome contém o texto.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000], help='Tamanhos do relatório exportado.')
+    args = parser.parse_args()
+
+    app = wx.App(False)
+    common.writeResults(args.output, run(args))
@@ -0,0 +1,242 @@
+"""
+Testes de regressão de desempenho: roteiros de uso executados no programa completo, com limites de latência e
+memória por roteiro e comparação do frameImage e do TakeNote com uma linha de base gravada.
+Precisa de um servidor X (no Linux, um virtual serve): xvfb-run -a python benchmarks/regression.py
+Uso: python benchmarks/regression.py [--record] [--tolerance 0.25] [-k filtro] [-o saida.json]
+benchmarks/regression.py
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common
+
+HOME = common.setup()
+common.writeConfig(HOME)
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import wx
+import main_frame
+import profiler
+
+BASELINE_PATH = os.path.join(common.ROOT, 'benchmarks', 'baseline.json')
+TRACKED = ['frameImage', 'TakeNote']    # Funções comparadas com a linha de base.
+TOLERANCE = 0.25                        # Quanto (fração) a mediana pode piorar em relação à linha de base.
+CHANGES = 1000
+ZOOM_ROUNDS = 5
+SEED = 2021
+
+# Limites de cada roteiro: p95 do tempo por ação (ms) e crescimento da memória residente (MB).
+BUDGETS = {
+    'resize_storm': {'p95_ms': 50, 'memory_mb': 64},
+    'value_changes': {'p95_ms': 40, 'memory_mb': 160},
+    'equipment_zoom': {'p95_ms': 60, 'memory_mb': 64},
+    'tutorial': {'p95_ms': 120, 'memory_mb': 64}
+}
+
+def click(widget):
+    ''' Simula um clique no botão `widget`. '''
+
+    event = wx.CommandEvent(wx.wxEVT_BUTTON, widget.GetId())
+    event.SetEventObject(widget)
+    widget.ProcessEvent(event)
+
+def select(ctrl, value):
+    ''' Simula a escolha de `value` no wx.ComboBox `ctrl`. '''
+
+    ctrl.SetValue(value)
+    event = wx.CommandEvent(wx.wxEVT_COMBOBOX, ctrl.GetId())
+    event.SetEventObject(ctrl)
+    ctrl.GetEventHandler().ProcessEvent(event)
+
+class Harness():
+    ''' Abre a janela principal e executa os roteiros nela, medindo cada ação até a tela ser redesenhada. '''
+
+    def __init__(self):
+        self.top = main_frame.Init(None)
+        self.top.Show()
+        self.frame = self.top.frame
+        self.rng = random.Random(SEED)
+        self.settle()
+
+    def settle(self):
+        ''' Processa os eventos pendentes, incluindo os de pintura. '''
+
+        self.top.Update()
+        wx.GetApp().Yield(True)
+
+    def run(self, name, actions):
+        ''' Executa a lista de funções `actions` e retorna as medições do roteiro `name`. '''
+
+        profiler.stats.reset()
+        profiler.stats.window = max(len(actions) * 4, profiler.WINDOW)
+        profiler.stats.enabled = True
+
+        times = []
+        before = common.getRSS()
+        for action in actions:
+            start = time.perf_counter()
+            action()
+            self.settle()
+            times.append((time.perf_counter() - start) * 1000)
+        after = common.getRSS()
+
+        profiler.stats.enabled = False
+
+        handlers = {}
+        for handler in TRACKED:
+            values = profiler.stats.samples.get(handler)
+            if values:
+                handlers[handler] = {
+                    'count': len(values),
+                    'p50_ms': common.percentile(values, 50),
+                    'p95_ms': common.percentile(values, 95)
+                }
+
+        result = {
+            'actions': len(times),
+            'p50_ms': common.percentile(times, 50),
+            'p95_ms': common.percentile(times, 95),
+            'max_ms': max(times),
+            'memory_mb': None if before is None else after - before,
+            'handlers': handlers
+        }
+
+        print(f"{name:<16} {result['p50_ms']:>8.2f} ms p50  {result['p95_ms']:>8.2f} ms p95  "
+              f"{result['max_ms']:>8.2f} ms max  ({len(times)} ações)")
+        return result
+
+    def resizeStorm(self):
+        ''' Redimensiona a janela 200 vezes, entre o tamanho mínimo e Full HD. '''
+
+        sizes = [(1200 + (i * 37) % 721, 700 + (i * 23) % 381) for i in range(200)]
+        actions = [lambda size=size: self.top.SetSize(size) for size in sizes]
+        actions.append(lambda: self.top.SetSize((1366, 768)))
+        return actions
+
+    def valueChanges(self):
+        ''' Muda `CHANGES` vezes a abertura da válvula ou a rotação do motor, como pelo Painel de Controle. '''
+
+        def change():
+            ctrl = self.frame.ctrls[self.rng.choice([0, 2])]     # ctrls[0] = Registro Esfera, ctrls[2] = Motor Elétrico
+            choices = [value for value in ctrl.GetStrings() if value != ctrl.GetValue()]
+            select(ctrl, self.rng.choice(choices))
+
+        actions = [change] * CHANGES
+        actions.append(lambda: self.frame.OnClearReport(None))
+        return actions
+
+    def equipmentZoom(self):
+        ''' Passa por todos os zooms da toolbar, voltando para a imagem principal depois de cada um. '''
+
+        def zoom(toolId):
+            event = wx.CommandEvent(wx.wxEVT_TOOL, toolId)
+            event.SetEventObject(self.top.toolbar)
+            self.top.GetEventHandler().ProcessEvent(event)
+
+        actions = []
+        for _ in range(ZOOM_ROUNDS):
+            for toolId in range(1000, 1007):
+                actions.append(lambda toolId=toolId: zoom(toolId))
+                actions.append(lambda: self.frame.OnNext(None))
+
+        return actions
+
+    def tutorial(self):
+        ''' Executa o tutorial do início ao fim, com os cliques pedidos em cada passo de first_tutorial.json. '''
+
+        widgets = self.frame.widgets
+        onMotor = [btn[0] for btn in self.frame.miscButtonsRef if btn[0].GetName() == 'onMotor'][0]
+
+        actions = [lambda: self.frame.initTutorial(None)]
+        actions += [lambda: self.frame.OnNext(None)] * 14           # Passos 0 a 13: visão geral e zooms.
+        actions.append(lambda: click(onMotor))                      # 14: ligar o motor.
+        actions.append(lambda: click(widgets[0][0]))                # 15: abrir o Registro Esfera...
+        actions.append(lambda: select(self.frame.ctrls[0], '50'))   # ... e abrir a válvula.
+        for i in (1, 4, 3):                                         # 16 a 18: Medidor de Vazão, Manômetro, Manovacuômetro.
+            actions.append(lambda i=i: click(widgets[i][0]))
+        actions += [lambda: self.frame.OnNext(None)] * 2            # 19 e 20: fim.
+        return actions
+
+    def close(self):
+        ''' Fecha o programa. '''
+
+        self.top.OnCloseApp(None)
+        wx.GetApp().Yield(True)
+
+def check(results, baseline, tolerance):
+    ''' Retorna a lista de limites estourados por `results`. '''
+
+    failures = []
+    for name, result in results.items():
+        budget = BUDGETS[name]
+        if result['p95_ms'] > budget['p95_ms']:
+            failures.append(f"{name}: p95 de {result['p95_ms']:.2f} ms, o limite é {budget['p95_ms']} ms")
+
+        if result['memory_mb'] is not None and result['memory_mb'] > budget['memory_mb']:
+            failures.append(f"{name}: a memória cresceu {result['memory_mb']:.1f} MB, o limite é {budget['memory_mb']} MB")
+
+        reference = baseline.get(name, {}).get('handlers', {})
+        for handler, values in result['handlers'].items():
+            if handler in reference:
+                limit = reference[handler]['p50_ms'] * (1 + tolerance)
+                if values['p50_ms'] > limit:
+                    failures.append(f"{name}: {handler} levou {values['p50_ms']:.3f} ms (mediana), "
+                                    f"a linha de base é {reference[handler]['p50_ms']:.3f} ms (+{tolerance:.0%} = {limit:.3f} ms)")
+
+    return failures
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Testes de regressão de desempenho do Laboratório Virtual.')
+    parser.add_argument('-o', '--output', default=os.path.join(common.ROOT, 'benchmarks', 'regression.json'))
+    parser.add_argument('-k', '--filter', default='', help='Executa apenas os roteiros cujo nome contém o texto.')
+    parser.add_argument('--record', action='store_true', help=f'Grava os resultados como a nova linha de base ({BASELINE_PATH}).')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Piora aceita em relação à linha de base (fração).')
+    args = parser.parse_args()
+
+    app = wx.App(False)
+    harness = Harness()
+    scenarios = [
+        ('resize_storm', harness.resizeStorm),
+        ('value_changes', harness.valueChanges),
+        ('equipment_zoom', harness.equipmentZoom),
+        ('tutorial', harness.tutorial)
+    ]
+
+    results = {}
+    for name, scenario in scenarios:
+        if args.filter in name:
+            results[name] = harness.run(name, scenario())
+
+    if 'tutorial' in results and harness.frame.tutorialObj.isTutorialInProgress:
+        sys.exit('ERRO: o roteiro do tutorial não chegou ao fim. first_tutorial.json mudou?')
+
+    harness.close()
+    common.writeResults(args.output, results)
+
+    if args.record:
+        common.writeResults(BASELINE_PATH, results)
+        sys.exit(0)
+
+    baseline = {}
+    if os.path.isfile(BASELINE_PATH):
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    else:
+        print(f"\nAVISO: {BASELINE_PATH} não existe, apenas os limites absolutos foram verificados. Use --record para gravá-la.")
+
+    failures = check(results, baseline, args.tolerance)
+    if failures:
+        print('\n' + '=' * 80)
+        print(f'REGRESSÃO DE DESEMPENHO: {len(failures)} limite(s) estourado(s)')
+        for failure in failures:
+            print(f'  - {failure}')
+        print('=' * 80)
+        sys.exit(1)
+
+    print('\nTodos os limites foram respeitados.')
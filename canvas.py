@@ -0,0 +1,258 @@
+"""
+Arquivo responsável pela tela principal: uma única janela que desenha a imagem e os botões dos equipamentos.
+canvas.py
+"""
+
+import wx
+
+# Estilos dos botões, na ordem das opções em Configurações -> Aparência.
+STYLE_NOBG = 0          # Borda transparente
+STYLE_GRADIENT = 1      # Cor gradiente
+STYLE_DEFAULT = 2       # Bordas redondas
+STYLE_SQUARE = 3        # Bordas quadradas
+
+RADIUS = 6
+
+class Sprite(wx.EvtHandler):
+    ''' Botão desenhado pelo SceneCanvas, sem janela nativa. Imita a parte da API do pb.PlateButton usada pelo
+    programa e emite wx.EVT_BUTTON quando clicado, então pode ser ligado com Bind() como um botão comum. '''
+
+    def __init__(self, canvas, id=wx.ID_ANY, name='', size=(0, 0)):
+        super().__init__()
+
+        self.canvas = canvas
+        self.id = wx.NewIdRef() if id == wx.ID_ANY else id
+        self.name = name
+        self.rect = wx.Rect(0, 0, size[0], size[1])
+        self.bitmap = None
+        self.tooltip = ''
+        self.shown = True
+
+        canvas.addSprite(self)
+
+    def GetId(self):
+        return int(self.id)
+
+    def GetName(self):
+        return self.name
+
+    def GetRect(self):
+        return wx.Rect(self.rect)
+
+    def IsShown(self):
+        return self.shown
+
+    def Show(self, show=True):
+        if self.shown != show:
+            self.shown = show
+            self.canvas.refreshSprite(self)
+
+    def Hide(self):
+        self.Show(False)
+
+    def Move(self, pos):
+        ''' Move o botão, redesenhando apenas a posição antiga e a nova. '''
+
+        if self.rect.GetPosition() != wx.Point(pos):
+            self.canvas.refreshSprite(self)
+            self.rect.SetPosition(wx.Point(pos))
+            self.canvas.refreshSprite(self)
+
+    def SetBitmap(self, bitmap):
+        self.bitmap = bitmap
+        self.canvas.refreshSprite(self)
+
+    def SetToolTip(self, text):
+        self.tooltip = text
+        self.canvas.updateToolTip(self)
+
+    def Destroy(self):
+        self.canvas.removeSprite(self)
+
+class SceneCanvas(wx.Window):
+    ''' Desenha a imagem de fundo centralizada e, por cima, os Sprites. Os cliques e o hover são resolvidos por
+    hit-test na lista de sprites, e cada mudança redesenha apenas o retângulo afetado (double buffer). '''
+
+    def __init__(self, parent, groups=()):
+        super().__init__(parent, wx.ID_ANY)
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.groups = groups            # Grupos de recortes, na ordem de desenho.
+
+        self.background = None          # wx.Bitmap já redimensionado
+        self.patches = {group: [] for group in groups}  # grupo -> [(wx.Rect, wx.Bitmap), ...] sobre o fundo, relativos a ele.
+        self.sprites = []               # Em ordem de desenho. O último fica por cima.
+        self.hover = None
+        self.pressed = None
+        self.style = STYLE_NOBG
+        self.hoverColour = wx.Colour(wx.SystemSettings.GetColour(wx.SYS_COLOUR_HIGHLIGHT))
+
+        self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_MOTION, self.OnMotion)
+        self.Bind(wx.EVT_LEFT_DOWN, self.OnLeftDown)
+        self.Bind(wx.EVT_LEFT_DCLICK, self.OnLeftDown)
+        self.Bind(wx.EVT_LEFT_UP, self.OnLeftUp)
+        self.Bind(wx.EVT_LEAVE_WINDOW, self.OnLeave)
+
+    def addSprite(self, sprite):
+        self.sprites.append(sprite)
+        self.refreshSprite(sprite)
+
+    def removeSprite(self, sprite):
+        if sprite in self.sprites:
+            self.refreshSprite(sprite)
+            self.sprites.remove(sprite)
+
+        if self.hover is sprite:
+            self.hover = None
+            self.SetToolTip('')
+
+        if self.pressed is sprite:
+            self.pressed = None
+
+    def refreshSprite(self, sprite):
+        ''' Marca o retângulo de `sprite` para ser redesenhado. '''
+
+        self.RefreshRect(sprite.rect, False)
+
+    def updateToolTip(self, sprite):
+        ''' Atualiza a tooltip exibida se `sprite` estiver sob o mouse. '''
+
+        if sprite is self.hover:
+            self.SetToolTip(sprite.tooltip)
+
+    def SetBitmap(self, bitmap):
+        ''' Troca a imagem de fundo. Os recortes desenhados sobre a anterior são descartados. '''
+
+        self.background = bitmap
+        self.patches = {group: [] for group in self.groups}
+        self.Refresh(False)
+
+    def setPatches(self, group, patches):
+        ''' Troca os recortes do grupo `group` desenhados sobre o fundo (quadros de animação), redesenhando apenas
+        os retângulos dos recortes antigos e dos novos. '''
+
+        if self.background is not None:
+            offset = self.getBackgroundOffset()
+            rects = {tuple(rect.Get()) for rect, _ in self.patches[group] + patches}
+            for x, y, width, height in rects:
+                self.RefreshRect(wx.Rect(x + offset[0], y + offset[1], width, height), False)
+
+        self.patches[group] = patches
+
+    def getBackgroundOffset(self):
+        ''' Retorna a posição da imagem de fundo, centralizada na janela. '''
+
+        width, height = self.GetClientSize()
+        return ((width - self.background.GetWidth()) // 2, (height - self.background.GetHeight()) // 2)
+
+    def setButtonStyle(self, style):
+        self.style = style
+        self.Refresh(False)
+
+    def setHoverColour(self, colour):
+        self.hoverColour = wx.Colour(colour)
+        if self.hover is not None:
+            self.refreshSprite(self.hover)
+
+    def hitTest(self, pos):
+        ''' Retorna o sprite visível em `pos`, ou None. '''
+
+        for sprite in reversed(self.sprites):
+            if sprite.shown and sprite.rect.Contains(pos):
+                return sprite
+
+        return None
+
+    def setHover(self, sprite):
+        if sprite is self.hover:
+            return
+
+        for old in (self.hover, sprite):
+            if old is not None:
+                self.refreshSprite(old)
+
+        self.hover = sprite
+        self.SetToolTip(sprite.tooltip if sprite is not None else '')
+
+    def OnMotion(self, event):
+        self.setHover(self.hitTest(event.GetPosition()))
+        event.Skip()
+
+    def OnLeftDown(self, event):
+        self.pressed = self.hitTest(event.GetPosition())
+        if self.pressed is not None:
+            self.refreshSprite(self.pressed)
+
+        event.Skip()
+
+    def OnLeftUp(self, event):
+        ''' O clique vale se o botão for solto sobre o mesmo sprite em que foi apertado. '''
+
+        sprite = self.pressed
+        self.pressed = None
+        if sprite is not None:
+            self.refreshSprite(sprite)
+            if sprite is self.hitTest(event.GetPosition()):
+                click = wx.CommandEvent(wx.wxEVT_BUTTON, sprite.GetId())
+                click.SetEventObject(sprite)
+                sprite.ProcessEvent(click)
+
+        event.Skip()
+
+    def OnLeave(self, event):
+        self.setHover(None)
+        self.pressed = None
+        event.Skip()
+
+    def OnPaint(self, event):
+        ''' Redesenha apenas a área inválida: fundo, recortes e os sprites que a cruzam. '''
+
+        dc = wx.AutoBufferedPaintDC(self)
+        region = self.GetUpdateRegion()
+        dc.SetDeviceClippingRegion(region)
+
+        dc.SetBackground(wx.Brush(self.GetParent().GetBackgroundColour()))
+        dc.Clear()
+        if self.background:
+            x, y = self.getBackgroundOffset()
+            dc.DrawBitmap(self.background, x, y)
+            for patches in self.patches.values():
+                for rect, bitmap in patches:
+                    if region.Contains(rect.x + x, rect.y + y, rect.width, rect.height) != wx.OutRegion:
+                        dc.DrawBitmap(bitmap, rect.x + x, rect.y + y)
+
+        for sprite in self.sprites:
+            if sprite.shown and region.Contains(sprite.rect) != wx.OutRegion:
+                if sprite is self.hover or sprite is self.pressed:
+                    gc = wx.GraphicsContext.Create(dc)
+                    self.drawHighlight(gc, sprite)
+                    del gc      # Descarrega o desenho antes do bitmap, que fica por cima.
+
+                if sprite.bitmap and sprite.bitmap.IsOk():
+                    x = sprite.rect.x + (sprite.rect.width - sprite.bitmap.GetWidth()) // 2
+                    y = sprite.rect.y + (sprite.rect.height - sprite.bitmap.GetHeight()) // 2
+                    dc.DrawBitmap(sprite.bitmap, x, y, True)
+
+    def drawHighlight(self, gc, sprite):
+        ''' Desenha o fundo do botão sob o mouse, de acordo com `self.style`. '''
+
+        x, y, width, height = sprite.rect.Get()
+        colour = self.hoverColour
+        if sprite is self.pressed:
+            colour = colour.ChangeLightness(85)
+
+        if self.style == STYLE_GRADIENT:
+            brush = gc.CreateLinearGradientBrush(x, y, x, y + height, colour.ChangeLightness(150), colour)
+            gc.SetBrush(brush)
+        else:
+            gc.SetBrush(wx.Brush(colour))
+
+        if self.style == STYLE_NOBG:
+            gc.SetPen(wx.TRANSPARENT_PEN)
+        else:
+            gc.SetPen(wx.Pen(colour.ChangeLightness(70)))
+
+        if self.style == STYLE_SQUARE:
+            gc.DrawRectangle(x, y, width - 1, height - 1)
+        else:
+            gc.DrawRoundedRectangle(x, y, width - 1, height - 1, RADIUS)
@@ -0,0 +1,146 @@
+"""
+Arquivo responsável por montar a imagem exibida a partir da imagem base e das camadas sobrepostas (tutorial, tabelas).
+compositor.py
+"""
+
+from collections import OrderedDict
+import numpy as np
+import imaging
+
+BAND = 32               # Linhas processadas por vez, para manter o buffer de trabalho pequeno.
+MAX_LAYERS = 32         # Camadas pré-multiplicadas guardadas.
+
+class Layer():
+    ''' Uma imagem pronta para ser sobreposta: cortada para a área com alpha diferente de zero, com o RGB
+    pré-multiplicado pelo alpha e o complemento do alpha (255 - alpha). Sem alpha, a camada é opaca. '''
+
+    def __init__(self, pixels):
+        self.x, self.y = 0, 0
+        self.rgb = pixels.rgb
+        self.inverse = None
+        self.empty = False
+
+        alpha = pixels.alpha
+        if alpha is None:
+            return
+
+        rows = np.flatnonzero(alpha.any(axis=1))
+        cols = np.flatnonzero(alpha.any(axis=0))
+        if len(rows) == 0:
+            self.empty = True
+            return
+
+        self.y, self.x = rows[0], cols[0]
+        crop = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+        alpha = alpha[crop]
+
+        premultiplied = pixels.rgb[crop].astype(np.uint16) * alpha[:, :, None]
+        premultiplied += 127
+        self.rgb = (premultiplied // 255).astype(np.uint8)
+        self.inverse = 255 - alpha
+
+class Compositor():
+    ''' Monta a imagem base com uma pilha de camadas nomeadas. Cada nível da pilha (base + camadas até ali) fica
+    guardado, então mudar apenas a camada de cima, como o mascote entre os passos do tutorial, refaz só ela.
+    `load(path)` deve retornar o imaging.Pixels de `path`, ou None. '''
+
+    def __init__(self, load):
+        self.load = load
+        self.layers = OrderedDict()     # path -> Layer, do menos para o mais recente.
+        self.stack = []                 # Assinatura da última pilha montada: [(nome, path, (x, y)), ...]
+        self.baseKey = None
+        self.levels = []                # levels[i]: base com as camadas 0..i desenhadas.
+        self.work = None
+
+    def getLayer(self, path):
+        ''' Retorna a Layer de `path`, pré-multiplicando a imagem apenas na primeira vez. '''
+
+        layer = self.layers.get(path)
+        if layer is None:
+            pixels = self.load(path)
+            if pixels is None:
+                return None
+
+            layer = Layer(pixels)
+            self.layers[path] = layer
+            if len(self.layers) > MAX_LAYERS:
+                self.layers.popitem(last=False)
+        else:
+            self.layers.move_to_end(path)
+
+        return layer
+
+    def compose(self, baseKey, base, stack):
+        ''' Retorna o imaging.Pixels de `base` com as camadas `stack` ([(nome, path, (x, y)), ...]) por cima, em ordem.
+        Os níveis que não mudaram desde a última chamada são reaproveitados. O resultado é um buffer interno,
+        válido até a próxima chamada. '''
+
+        if not stack:
+            return base
+
+        stack = [(name, path, (int(pos[0]), int(pos[1]))) for name, path, pos in stack]
+
+        # Primeiro nível que difere da última pilha montada.
+        start = 0
+        if baseKey == self.baseKey:
+            while start < min(len(stack), len(self.stack)) and stack[start] == self.stack[start]:
+                start += 1
+
+        if start == len(stack) and len(stack) == len(self.stack):
+            return imaging.Pixels(self.levels[-1])
+
+        while len(self.levels) < len(stack):
+            self.levels.append(None)
+        del self.levels[len(stack):]
+
+        for i in range(start, len(stack)):
+            below = base.rgb if i == 0 else self.levels[i - 1]
+            if self.levels[i] is None or self.levels[i].shape != below.shape:
+                self.levels[i] = np.empty_like(below)
+
+            np.copyto(self.levels[i], below)
+            name, path, pos = stack[i]
+            layer = self.getLayer(path)
+            if layer is not None:
+                self.draw(self.levels[i], layer, pos)
+
+        self.baseKey = baseKey
+        self.stack = stack
+        return imaging.Pixels(self.levels[-1])
+
+    def getWork(self, rows, cols):
+        if self.work is None or self.work.shape[1] < cols:
+            self.work = np.empty((BAND, cols, 3), np.float32)
+
+        return self.work[:rows, :cols]
+
+    def draw(self, dst, layer, pos):
+        ''' Desenha `layer` sobre `dst`, no lugar, com a camada na posição `pos`: dst = rgb + dst * (255 - alpha) / 255 '''
+
+        if layer.empty:
+            return
+
+        x, y = pos[0] + layer.x, pos[1] + layer.y
+        height, width = layer.rgb.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + width, dst.shape[1]), min(y + height, dst.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        source = layer.rgb[y0 - y:y1 - y, x0 - x:x1 - x]
+        target = dst[y0:y1, x0:x1]
+        if layer.inverse is None:
+            np.copyto(target, source)
+            return
+
+        inverse = layer.inverse[y0 - y:y1 - y, x0 - x:x1 - x]
+        for start in range(0, y1 - y0, BAND):
+            stop = min(start + BAND, y1 - y0)
+            work = self.getWork(stop - start, x1 - x0)
+            band = target[start:stop]
+
+            np.multiply(band, inverse[start:stop, :, None], out=work, dtype=np.float32)
+            np.multiply(work, 1 / 255, out=work)
+            np.add(work, source[start:stop], out=work)
+            np.add(work, 0.5, out=work)
+            np.copyto(band, work, casting='unsafe')
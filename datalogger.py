@@ -0,0 +1,92 @@
+"""
+Arquivo responsável pela aquisição de dados: as leituras de todos os instrumentos gravadas continuamente em um buffer circular.
+datalogger.py
+"""
+
+import numpy as np
+import derived
+import simulation
+
+KEYS = ['abertura', 'q(l/m)', 'rpm', 'p1', 'p2', 'piezometro']     # Mesma ordem do relatório.
+DEFAULT_RATE = 10       # Amostras por segundo.
+MAX_RATE = simulation.FPS   # Acima disso, as leituras se repetiriam entre os ticks da simulação.
+DEFAULT_WINDOW = 3600   # Segundos de histórico guardados.
+MAX_ROWS = 500000       # Limite de memória: 500 mil linhas de 7 colunas float64 são 28 MB.
+
+class DataLogger():
+    ''' Guarda as últimas `rate * window` amostras em um array pré-alocado (linhas: tempo em segundos desde o início
+    da aquisição e uma coluna por grandeza de KEYS). Quando ele enche, as amostras mais antigas são sobrescritas. '''
+
+    def __init__(self, rate=DEFAULT_RATE, window=DEFAULT_WINDOW):
+        self.rate = rate
+        self.window = window
+        self.buffer = None
+        self.configure(rate, window)
+
+    def configure(self, rate=None, window=None):
+        ''' Muda a taxa e/ou a janela. Se o tamanho do buffer mudar, ele é realocado e o histórico é perdido. '''
+
+        self.rate = rate or self.rate
+        self.window = window or self.window
+        capacity = min(int(self.rate * self.window), MAX_ROWS)
+        if self.buffer is None or len(self.buffer) != capacity:
+            self.buffer = np.empty((capacity, len(KEYS) + 1), np.float64)
+            self.clear()
+
+    def getInterval(self):
+        ''' Retorna o intervalo entre as amostras, em ms. '''
+
+        return max(1000 // self.rate, 1)
+
+    def clear(self):
+        self.head = 0           # Próxima linha a ser escrita.
+        self.count = 0
+        self.total = 0          # Amostras gravadas desde o início, inclusive as já sobrescritas.
+        self.start = None       # Instante (s) da primeira amostra.
+
+    def append(self, now, values):
+        ''' Grava a amostra `values` (na ordem de KEYS) do instante `now` (segundos). '''
+
+        if self.start is None:
+            self.start = now
+
+        row = self.buffer[self.head]
+        row[0] = now - self.start
+        row[1:] = values
+        self.head = (self.head + 1) % len(self.buffer)
+        self.count = min(self.count + 1, len(self.buffer))
+        self.total += 1
+
+    def getData(self):
+        ''' Retorna uma cópia das amostras guardadas, da mais antiga para a mais recente. '''
+
+        if self.count < len(self.buffer):
+            return self.buffer[:self.count].copy()
+
+        return np.concatenate((self.buffer[self.head:], self.buffer[:self.head]))
+
+    def getColumns(self):
+        ''' Retorna {nome: array} com o tempo, as leituras de KEYS e as grandezas calculadas a partir delas. '''
+
+        data = self.getData()
+        columns = {'tempo': data[:, 0]}
+        columns.update((key, data[:, i + 1]) for i, key in enumerate(KEYS))
+        columns.update(derived.compute(columns))
+        return columns
+
+    def writeCSV(self, path):
+        ''' Exporta as amostras como .csv, com uma coluna de tempo e uma por grandeza. '''
+
+        columns = self.getColumns()
+        header = ','.join(['tempo (s)'] + list(columns)[1:])
+        np.savetxt(path, np.column_stack(list(columns.values())), delimiter=',', header=header, comments='', fmt='%.6g')
+
+    def writeNPY(self, path):
+        ''' Exporta as amostras como .npy: um array estruturado, com um campo por coluna de `getColumns`. '''
+
+        columns = self.getColumns()
+        table = np.empty(len(columns['tempo']), [(name, np.float64) for name in columns])
+        for name, values in columns.items():
+            table[name] = values
+
+        np.save(path, table)
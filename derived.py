@@ -0,0 +1,49 @@
+"""
+Arquivo responsável pelas grandezas calculadas a partir das medições: altura manométrica e potência hidráulica.
+derived.py
+"""
+
+import numpy as np
+
+RHO = 1000              # Massa específica da água (kg/m³).
+G = 9.81                # Aceleração da gravidade (m/s²).
+
+# Grandezas calculadas, na ordem do relatório. 'panel' é o jsonKey do equipamento em cujo painel ela é exibida.
+QUANTITIES = [
+    {'key': 'altura', 'name': 'Altura Manométrica', 'unit': 'mca', 'decimals': 2, 'panel': 'p2'},
+    {'key': 'potencia', 'name': 'Potência Hidráulica', 'unit': 'W', 'decimals': 1, 'panel': 'q(l/m)'}
+]
+KEYS = [quantity['key'] for quantity in QUANTITIES]
+
+def compute(columns):
+    ''' Calcula as grandezas de todas as linhas de `columns` ({jsonKey: sequência}) de uma vez e retorna {key: array}.
+    A altura manométrica é p2 - p1, pois o manovacuômetro marca a pressão negativa da sucção. A potência hidráulica
+    é ρ g Q H. O rendimento da bomba fica de fora enquanto data.json não tiver a potência no eixo de cada ponto. '''
+
+    flow = np.asarray(columns['q(l/m)'], np.float64) / 60000       # l/min -> m³/s
+    head = np.asarray(columns['p2'], np.float64) - np.asarray(columns['p1'], np.float64)
+    power = RHO * G * flow * head
+
+    return {'altura': head, 'potencia': power}
+
+def formatValue(quantity, value):
+    ''' Retorna o texto exibido de `value` para a grandeza `quantity`, ou '-' se ela não puder ser calculada. '''
+
+    if np.isnan(value):
+        return '-'
+
+    return f"{value + 0.0:.{quantity['decimals']}f}"     # + 0.0 transforma -0.0 (vazão nula) em 0.0.
+
+class DerivedTable():
+    ''' As grandezas calculadas para todas as linhas de data.json, uma vez, quando a bancada é carregada.
+    Durante o uso, o valor de um ponto de operação é só a consulta da sua linha. '''
+
+    def __init__(self, data):
+        keys = ['q(l/m)', 'p1', 'p2']
+        values = compute({key: [row[key] for row in data] for key in keys})
+        self.texts = [{q['key']: formatValue(q, values[q['key']][i]) for q in QUANTITIES} for i in range(len(data))]
+
+    def getText(self, index):
+        ''' Retorna {key: texto} das grandezas da linha `index` de data.json. '''
+
+        return self.texts[index]
@@ -0,0 +1,208 @@
+"""
+Arquivo responsável pela animação do fluxo de água: as setas das máscaras em `misc/overlays` andando pelos canos.
+flow.py
+"""
+
+import math
+import numpy as np
+import wx
+import imaging
+
+FPS = 30
+FRAMES = 30             # Quadros de um ciclo. A 30 fps, cada seta leva um segundo para percorrer o trajeto.
+COPIES = 2              # Cópias de cada seta no trajeto, defasadas, para sempre haver uma visível.
+TRAVEL = 1.5            # Distância percorrida pela seta em um ciclo, em comprimentos da própria seta.
+CELL = 8                # Lado (pixels) das células usadas para separar as setas da máscara.
+MIN_PIXELS = 32         # Pedaços menores que isso (restos do anti-aliasing) são ignorados.
+
+class Arrow():
+    ''' Uma seta da máscara, no tamanho original: o recorte em (x, y) com o RGB pré-multiplicado pelo alpha,
+    o alpha e a direção (dx, dy), unitária, para onde aponta. '''
+
+    def __init__(self, rgb, alpha, x, y, direction):
+        self.rgb = rgb
+        self.alpha = alpha
+        self.x, self.y = x, y
+        self.direction = direction
+        self.height, self.width = alpha.shape
+
+def getDirection(alpha):
+    ''' Retorna a direção para onde aponta a seta `alpha`. O eixo é o de maior variância e o sentido é o da ponta:
+    a cabeça concentra os pixels e a haste forma uma cauda no lado oposto, então a assimetria aponta para trás. '''
+
+    weight = alpha.astype(np.float64)
+    total = weight.sum()
+    ys, xs = np.mgrid[0:alpha.shape[0], 0:alpha.shape[1]]
+    dx = xs - (weight * xs).sum() / total
+    dy = ys - (weight * ys).sum() / total
+
+    cov = np.array([[(weight * dx * dx).sum(), (weight * dx * dy).sum()],
+                    [(weight * dx * dy).sum(), (weight * dy * dy).sum()]])
+    axis = np.linalg.eigh(cov)[1][:, 1]
+
+    skew = (weight * (dx * axis[0] + dy * axis[1]) ** 3).sum()
+    if skew > 0:
+        axis = -axis
+
+    return (float(axis[0]), float(axis[1]))
+
+def findArrows(pixels):
+    ''' Separa as setas da máscara `pixels` (imaging.Pixels com alpha). Retorna uma lista de Arrow. '''
+
+    alpha = pixels.alpha
+    if alpha is None:
+        return []
+
+    # As setas ficam longe umas das outras, então basta juntar as células vizinhas com algum pixel.
+    height, width = alpha.shape
+    rows, cols = math.ceil(height / CELL), math.ceil(width / CELL)
+    padded = np.zeros((rows * CELL, cols * CELL), np.uint8)
+    padded[:height, :width] = alpha
+    cells = padded.reshape(rows, CELL, cols, CELL).any(axis=(1, 3))
+
+    labels = np.zeros(cells.shape, np.int32)
+    label = 0
+    arrows = []
+    for row, col in zip(*np.nonzero(cells)):
+        if labels[row, col]:
+            continue
+
+        label += 1
+        labels[row, col] = label
+        stack = [(row, col)]
+        top, bottom, left, right = row, row, col, col
+        while stack:
+            r, c = stack.pop()
+            top, bottom, left, right = min(top, r), max(bottom, r), min(left, c), max(right, c)
+            for nr in range(max(r - 1, 0), min(r + 2, rows)):
+                for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                    if cells[nr, nc] and not labels[nr, nc]:
+                        labels[nr, nc] = label
+                        stack.append((nr, nc))
+
+        # Recorte da seta, sem os pixels de outras setas que caiam no mesmo retângulo.
+        y0, y1 = top * CELL, min((bottom + 1) * CELL, height)
+        x0, x1 = left * CELL, min((right + 1) * CELL, width)
+        own = (labels[top:bottom + 1, left:right + 1] == label).repeat(CELL, axis=0).repeat(CELL, axis=1)
+        crop = alpha[y0:y1, x0:x1] * own[:y1 - y0, :x1 - x0]
+        if np.count_nonzero(crop) < MIN_PIXELS:
+            continue
+
+        rgb = pixels.rgb[y0:y1, x0:x1].astype(np.uint16) * crop[:, :, None]
+        rgb += 127
+        arrows.append(Arrow((rgb // 255).astype(np.uint8), crop, x0, y0, getDirection(crop)))
+
+    return arrows
+
+class Flow():
+    ''' Gera e toca os quadros da animação. Os quadros de cada seta são recortes prontos (wx.Bitmap) da imagem
+    exibida, já com a seta desenhada, então a cada quadro só os retângulos das setas são redesenhados. '''
+
+    def __init__(self, load):
+        self.load = load            # load(path) -> imaging.Pixels, ou None.
+        self.arrows = {}            # path da máscara -> (largura da máscara, [Arrow])
+        self.scaler = imaging.Scaler()
+        self.key = None
+        self.pending = None
+        self.rects = []             # wx.Rect de cada seta, relativo à imagem exibida.
+        self.frames = []            # frames[k][i]: wx.Bitmap do retângulo i no quadro k.
+        self.frame = -1
+
+    def getArrows(self, path):
+        ''' Retorna a largura da máscara `path` e as suas setas, separando-as apenas na primeira vez. '''
+
+        if path not in self.arrows:
+            pixels = self.load(path)
+            if pixels is None:
+                self.arrows[path] = (1, [])
+            else:
+                self.arrows[path] = (pixels.width, findArrows(pixels))
+
+        return self.arrows[path]
+
+    def reset(self):
+        ''' Descarta os quadros. Chamada quando a imagem exibida muda. '''
+
+        self.key = None
+        self.pending = None
+        self.rects = []
+        self.frames = []
+        self.frame = -1
+
+    def update(self, path, background, now):
+        ''' Retorna [(wx.Rect, wx.Bitmap), ...] do quadro do instante `now` (segundos), para a máscara `path`
+        sobre `background` (array RGB da imagem exibida), ou None se o quadro não mudou ou ainda não existe.
+        Os quadros só são gerados quando `background` se repete em duas chamadas seguidas, para não gerá-los
+        a cada passo do redimensionamento da janela. '''
+
+        key = (path, id(background), background.shape)
+        if key != self.key:
+            if key != self.pending:
+                self.pending = key
+                return None
+
+            self.prepare(path, background)
+            self.key = key
+
+        frame = int(now * FPS) % FRAMES
+        if frame == self.frame or not self.frames:
+            return None
+
+        self.frame = frame
+        return list(zip(self.rects, self.frames[frame]))
+
+    def scaleArrow(self, arrow, factor):
+        ''' Retorna o RGB pré-multiplicado e o alpha (float32, 0 a 1) de `arrow` redimensionados por `factor`. '''
+
+        size = (max(round(arrow.width * factor), 1), max(round(arrow.height * factor), 1))
+        rgb = self.scaler.scale(arrow.rgb, size).astype(np.float32)
+        alpha = self.scaler.scale(np.repeat(arrow.alpha[:, :, None], 3, axis=2), size)[:, :, 0]
+        return rgb, alpha.astype(np.float32) / 255
+
+    def prepare(self, path, background):
+        ''' Gera os FRAMES quadros de cada seta de `path` sobre `background`. '''
+
+        self.rects = []
+        self.frames = [[] for _ in range(FRAMES)]
+        self.frame = -1
+
+        height, width = background.shape[:2]
+        maskWidth, arrows = self.getArrows(path)
+        factor = width / maskWidth
+        for arrow in arrows:
+            rgb, alpha = self.scaleArrow(arrow, factor)
+            size = alpha.shape[::-1]
+            x, y = arrow.x * factor, arrow.y * factor
+            travel = TRAVEL * max(size)
+            dx, dy = arrow.direction[0] * travel, arrow.direction[1] * travel
+
+            # Retângulo que cobre a seta em todo o trajeto, limitado à imagem.
+            x0, y0 = max(int(min(x, x + dx)), 0), max(int(min(y, y + dy)), 0)
+            x1, y1 = min(math.ceil(max(x, x + dx)) + size[0] + 1, width), min(math.ceil(max(y, y + dy)) + size[1] + 1, height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            self.rects.append(wx.Rect(x0, y0, x1 - x0, y1 - y0))
+            below = background[y0:y1, x0:x1].astype(np.float32)
+            for k in range(FRAMES):
+                patch = below.copy()
+                for copy in range(COPIES):
+                    phase = (k / FRAMES + copy / COPIES) % 1
+                    fade = math.sin(math.pi * phase)
+                    self.draw(patch, rgb, alpha, fade, round(x + dx * phase) - x0, round(y + dy * phase) - y0)
+
+                np.add(patch, 0.5, out=patch)
+                self.frames[k].append(imaging.toBitmap(patch.astype(np.uint8)))
+
+    def draw(self, patch, rgb, alpha, fade, x, y):
+        ''' Desenha a seta (`rgb` pré-multiplicado, `alpha`) com opacidade `fade` em (x, y) de `patch`, no lugar. '''
+
+        height, width = patch.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + alpha.shape[1], width), min(y + alpha.shape[0], height)
+        if x0 >= x1 or y0 >= y1 or fade <= 0:
+            return
+
+        target = patch[y0:y1, x0:x1]
+        target *= 1 - alpha[y0 - y:y1 - y, x0 - x:x1 - x, None] * fade
+        target += rgb[y0 - y:y1 - y, x0 - x:x1 - x] * fade
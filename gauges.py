@@ -0,0 +1,182 @@
+"""
+Arquivo responsável pelos instrumentos desenhados sobre os zooms: mostrador com ponteiro e o valor no visor do equipamento.
+gauges.py
+"""
+
+import math
+import numpy as np
+import wx
+import imaging
+
+START_ANGLE = 225       # Ângulo (graus, anti-horário a partir das 3 horas) do início da escala.
+SWEEP = 270             # Abertura da escala, no sentido horário.
+DIVISIONS = 10
+SUBDIVISIONS = 5
+
+FACE_COLOUR = wx.Colour(250, 250, 246)
+RIM_COLOUR = wx.Colour(60, 60, 64)
+TEXT_COLOUR = wx.Colour(30, 30, 30)
+NEEDLE_COLOUR = wx.Colour(200, 30, 30)
+LCD_COLOUR = wx.Colour(25, 35, 25)
+
+def getCrop(background, x, y, width, height):
+    ''' Retorna (wx.Rect, wx.Bitmap) com o retângulo (x, y, largura, altura) de `background` (array RGB),
+    limitado à imagem, ou None se ficar vazio. '''
+
+    x0, y0 = max(int(x), 0), max(int(y), 0)
+    x1, y1 = min(math.ceil(x + width), background.shape[1]), min(math.ceil(y + height), background.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return None
+
+    crop = np.ascontiguousarray(background[y0:y1, x0:x1])
+    return (wx.Rect(x0, y0, x1 - x0, y1 - y0), imaging.toBitmap(crop))
+
+def getFont(height, bold=False):
+    ''' Retorna uma fonte com `height` pixels de altura. '''
+
+    info = wx.FontInfo(wx.Size(0, max(int(height), 1))).Family(wx.FONTFAMILY_SWISS)
+    return wx.Font(info.Bold(bold))
+
+class Gauge():
+    ''' Um instrumento de gauges.json. O mostrador (fundo, escala e números) é desenhado uma vez para cada
+    tamanho da imagem e guardado. A cada valor, só o ponteiro e o valor digital são desenhados, sobre uma cópia. '''
+
+    def __init__(self, config):
+        self.name = config['name']
+        self.key = config['jsonKey']
+        self.unit = config['unit']
+        self.low, self.high = config['range']
+        self.decimals = config['decimals']
+        self.dial = config['dial']          # [x, y, raio] no tamanho original da imagem.
+        self.display = config['display']   # [x, y, largura, altura] do visor do equipamento, ou None.
+
+        self.value = 0          # Valor exibido.
+
+        self.scale = None       # Imagem e escala para as quais o mostrador e o visor foram desenhados.
+        self.face = None        # (wx.Rect, wx.Bitmap) do mostrador sem o ponteiro, relativo à imagem exibida.
+        self.center = None      # Centro do mostrador dentro de `self.face`.
+        self.radius = 0
+        self.lcd = None         # (wx.Rect, wx.Bitmap) do visor sem os números.
+
+    def setValue(self, value):
+        ''' Muda o valor exibido. Retorna True se ele mudou. '''
+
+        if value == self.value:
+            return False
+
+        self.value = value
+        return True
+
+    def getAngle(self, value):
+        ''' Retorna o ângulo (radianos) de `value` na escala. '''
+
+        fraction = min(max((value - self.low) / (self.high - self.low), 0), 1)
+        return math.radians(START_ANGLE - SWEEP * fraction)
+
+    def getPoint(self, angle, distance):
+        ''' Retorna o ponto a `distance` do centro, no ângulo `angle`, dentro de `self.face`. '''
+
+        return (self.center[0] + distance * math.cos(angle), self.center[1] - distance * math.sin(angle))
+
+    def formatValue(self, value):
+        return f'{value:.{self.decimals}f}'
+
+    def prepare(self, background, factor):
+        ''' Desenha e guarda o mostrador e o visor sobre `background` (array RGB da imagem exibida), que está na
+        escala `factor` em relação à imagem original. Não faz nada se já estiverem prontos para ela. '''
+
+        scale = (id(background), background.shape, factor)
+        if scale == self.scale:
+            return
+
+        self.scale = scale
+        x, y, radius = (value * factor for value in self.dial)
+        self.face = getCrop(background, x - radius, y - radius, radius * 2, radius * 2)
+        if self.face is not None:
+            self.center = (x - self.face[0].x, y - self.face[0].y)
+            self.radius = radius
+            self.drawFace(self.face[1])
+
+        self.lcd = None
+        if self.display:
+            self.lcd = getCrop(background, *(value * factor for value in self.display))
+
+    def getPatches(self):
+        ''' Retorna [(wx.Rect, wx.Bitmap), ...] com o valor exibido: o mostrador com o ponteiro e o visor. '''
+
+        patches = []
+        for part, draw in ((self.face, self.drawNeedle), (self.lcd, self.drawReadout)):
+            if part is not None:
+                rect, cached = part
+                bitmap = cached.GetSubBitmap(wx.Rect(0, 0, rect.width, rect.height))
+                dc = wx.MemoryDC(bitmap)
+                gc = wx.GraphicsContext.Create(dc)
+                draw(gc, rect)
+                del gc
+                dc.SelectObject(wx.NullBitmap)
+                patches.append((rect, bitmap))
+
+        return patches
+
+    def drawFace(self, bitmap):
+        ''' Desenha em `bitmap` o mostrador: fundo, aro, marcações, números e a unidade. '''
+
+        dc = wx.MemoryDC(bitmap)
+        gc = wx.GraphicsContext.Create(dc)
+        radius = self.radius
+        cx, cy = self.center
+
+        gc.SetPen(wx.Pen(RIM_COLOUR, max(int(radius * 0.06), 1)))
+        gc.SetBrush(wx.Brush(FACE_COLOUR))
+        gc.DrawEllipse(cx - radius * 0.96, cy - radius * 0.96, radius * 1.92, radius * 1.92)
+
+        ticks = DIVISIONS * SUBDIVISIONS
+        for i in range(ticks + 1):
+            angle = math.radians(START_ANGLE - SWEEP * i / ticks)
+            isMajor = i % SUBDIVISIONS == 0
+            inner = radius * (0.70 if isMajor else 0.76)
+            gc.SetPen(wx.Pen(TEXT_COLOUR, max(int(radius * (0.025 if isMajor else 0.012)), 1)))
+            gc.StrokeLine(*self.getPoint(angle, inner), *self.getPoint(angle, radius * 0.84))
+
+        gc.SetFont(getFont(radius * 0.13), TEXT_COLOUR)
+        for i in range(DIVISIONS + 1):
+            value = self.low + (self.high - self.low) * i / DIVISIONS
+            text = f'{value:g}'
+            width, height = gc.GetTextExtent(text)
+            x, y = self.getPoint(math.radians(START_ANGLE - SWEEP * i / DIVISIONS), radius * 0.56)
+            gc.DrawText(text, x - width / 2, y - height / 2)
+
+        gc.SetFont(getFont(radius * 0.12), TEXT_COLOUR)
+        width, height = gc.GetTextExtent(self.unit)
+        gc.DrawText(self.unit, cx - width / 2, cy + radius * 0.22)
+
+        del gc
+        dc.SelectObject(wx.NullBitmap)
+
+    def drawNeedle(self, gc, rect):
+        ''' Desenha o ponteiro e o valor digital do mostrador. '''
+
+        radius = self.radius
+        cx, cy = self.center
+
+        text = self.formatValue(self.value)
+        gc.SetFont(getFont(radius * 0.16, True), TEXT_COLOUR)
+        width, height = gc.GetTextExtent(text)
+        gc.DrawText(text, cx - width / 2, cy + radius * 0.50)
+
+        angle = self.getAngle(self.value)
+        gc.SetPen(wx.Pen(NEEDLE_COLOUR, max(int(radius * 0.035), 1)))
+        gc.StrokeLine(*self.getPoint(angle + math.pi, radius * 0.15), *self.getPoint(angle, radius * 0.78))
+
+        gc.SetPen(wx.TRANSPARENT_PEN)
+        gc.SetBrush(wx.Brush(RIM_COLOUR))
+        cap = radius * 0.07
+        gc.DrawEllipse(cx - cap, cy - cap, cap * 2, cap * 2)
+
+    def drawReadout(self, gc, rect):
+        ''' Desenha o valor no visor do equipamento, alinhado à direita, como um display de LCD. '''
+
+        text = self.formatValue(self.value)
+        gc.SetFont(getFont(rect.height * 0.62, True), LCD_COLOUR)
+        width, height = gc.GetTextExtent(text)
+        gc.DrawText(text, rect.width - width - rect.height * 0.2, (rect.height - height) / 2)
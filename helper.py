@@ -6,6 +6,9 @@ helper.py
 
 import os
 import wx
+import assets
+import profiler
+import derived
 import wx.lib.scrolledpanel as scrolled
 import wx.grid as gridlib
 from reportlab.lib.pagesizes import A4
@@ -26,10 +29,10 @@ class ItemFrame(wx.Panel):
         sizer = wx.BoxSizer(wx.VERTICAL)
 
         exitButton = wx.Button(self, dic['index'] + 1000, size=(32, 32))
-        exitButton.SetBitmap(wx.Bitmap(f"images/icons/close.png"))
+        exitButton.SetBitmap(assets.manager.getBitmap("images/icons/close.png"))
         exitButton.Bind(wx.EVT_LEFT_DOWN, parent.OnClosePanel)
 
-        itemBitmap = wx.StaticBitmap(self, -1, wx.Bitmap(f"images/{dic['buttonName']}.png"))
+        itemBitmap = wx.StaticBitmap(self, -1, assets.manager.getBitmap(f"images/{dic['buttonName']}.png"))
         itemName = wx.StaticText(self, -1, dic['buttonName'])
 
         if dic['jsonKey'] == 'rpm':
@@ -59,6 +62,17 @@ class ItemFrame(wx.Panel):
         sizer.Add(itemName, flag=wx.ALL | wx.ALIGN_CENTER, border=5)
         sizer.Add(dataSizer, flag=wx.ALL | wx.ALIGN_CENTER, border=5)
 
+        # Grandezas calculadas exibidas neste painel, apenas para leitura.
+        for quantity in derived.QUANTITIES:
+            if quantity['panel'] == dic['jsonKey']:
+                derivedCtrl = wx.TextCtrl(self, -1, style=wx.TE_READONLY, name=quantity['key'], size=((80, 23)))
+                derivedSizer = wx.BoxSizer(wx.HORIZONTAL)
+                derivedSizer.Add(derivedCtrl)
+                derivedSizer.Add(wx.StaticText(self, -1, quantity['unit'], size=((60, 23)), style=wx.ALIGN_CENTER), flag=wx.TOP | wx.LEFT, border=3)
+                sizer.Add(wx.StaticText(self, -1, quantity['name']), flag=wx.LEFT | wx.RIGHT | wx.TOP | wx.ALIGN_CENTER, border=5)
+                sizer.Add(derivedSizer, flag=wx.ALL | wx.ALIGN_CENTER, border=5)
+                parent.derivedCtrls[quantity['key']] = derivedCtrl
+
         self.Hide()
         self.SetSizer(sizer)
 
@@ -91,6 +105,7 @@ class Report(wx.Frame):
         self.scrolled.SetupScrolling(scroll_x=False)
         self.order = ['Válvula (%)', 'Medidor de Vazão (Q (l/min))', 'Motor Elétrico (RPM (%))',
         'Manovacuômetro (mca)', 'Manômetro (mca)', 'Piezômetro (m)']
+        self.order += [f"{quantity['name']} ({quantity['unit']})" for quantity in derived.QUANTITIES]
 
         self.Bind(wx.EVT_CHAR_HOOK, self.OnKey)
 
@@ -103,6 +118,7 @@ class Report(wx.Frame):
                 self.exportWindow = Export(self)
                 self.exportWindow.ShowModal()
 
+    @profiler.measure()
     def TakeNote(self, before, obj):
         ''' Toma nota de uma modificação. Grava o estado do sistema anterior, o que foi mudado pelo usuário
         e o estado posterior. '''
@@ -110,19 +126,18 @@ class Report(wx.Frame):
         self.Freeze()
         dic = {}
 
-        listCtrl = wx.ListCtrl(self.scrolled, -1, size=((775, 90)), style=wx.LC_REPORT | wx.SUNKEN_BORDER)
-        listCtrl.InsertColumn(0, self.order[0])
-        listCtrl.InsertColumn(1, self.order[1])
-        listCtrl.InsertColumn(2, self.order[2])
-        listCtrl.InsertColumn(3, self.order[3])
-        listCtrl.InsertColumn(4, self.order[4])
-        listCtrl.InsertColumn(5, self.order[5])
+        # A lista ocupa a largura da janela e rola na horizontal, então as colunas novas não a alargam.
+        listCtrl = wx.ListCtrl(self.scrolled, -1, size=((-1, 110)), style=wx.LC_REPORT | wx.SUNKEN_BORDER)
+        for i, name in enumerate(self.order):
+            listCtrl.InsertColumn(i, name)
 
         listCtrl.SetColumnWidth(1, 170)
         listCtrl.SetColumnWidth(2, 145)
         listCtrl.SetColumnWidth(3, 145)
         listCtrl.SetColumnWidth(4, 115)
         listCtrl.SetColumnWidth(5, 110)
+        listCtrl.SetColumnWidth(6, 150)
+        listCtrl.SetColumnWidth(7, 140)
 
         # Pegando as informações de antes da mudança.
         listCtrl.InsertItem(0, before['abertura'])
@@ -131,6 +146,8 @@ class Report(wx.Frame):
         listCtrl.SetItem(0, 3, before['p1'])
         listCtrl.SetItem(0, 4, before['p2'])
         listCtrl.SetItem(0, 5, before['piezometro'])
+        for i, key in enumerate(derived.KEYS, 6):
+            listCtrl.SetItem(0, i, before[key])
         dic['before'] = copy.deepcopy(before)
 
         # Pegando as informações do controle que mudou.
@@ -144,16 +161,14 @@ class Report(wx.Frame):
             listCtrl.SetItem(1, 2, value)
             dic['changed'] = {'rpm': value}
 
-        # Pegando as informações depois da mudança.
-        after = {}
+        # Pegando as informações depois da mudança, já no novo ponto de operação (sem esperar o transitório).
+        after = self.parent.getSteadyStatus()
         listCtrl.InsertItem(2, '')
-        for i in range(0, len(self.parent.ctrls)):
-            value = self.parent.ctrls[i].GetValue()
+        for i, value in enumerate(after.values()):
             listCtrl.SetItem(2, i, value)
-            after[self.parent.ctrls[i].GetName()] = value
 
         dic['after'] = copy.deepcopy(after)
-        self.scrolledSizer.Add(listCtrl, flag=wx.ALL, border=5)
+        self.scrolledSizer.Add(listCtrl, flag=wx.ALL | wx.EXPAND, border=5)
         self.scrolled.SendSizeEvent()
         self.reportList.append(dic)
         self.Thaw()
@@ -170,6 +185,71 @@ class Report(wx.Frame):
 
         self.Hide()
 
+class PerfOverlay(wx.StaticText):
+    ''' Painel de desempenho exibido sobre a imagem e resumido na status bar. Liga `profiler.stats` enquanto existir. '''
+
+    names = ['frameImage', 'OnValueChanged', 'TakeNote', 'updateButtons']
+
+    def __init__(self, parent, statusBar):
+        super().__init__(parent.scene, -1, '', pos=(5, 5))
+
+        self.parent = parent
+        self.statusBar = statusBar
+
+        self.SetBackgroundColour('#1e1e1e')
+        self.SetForegroundColour('#7cfc00')
+        self.SetFont(wx.Font(8, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        self.statusBar.SetFieldsCount(2, [-1, 380])
+
+        profiler.stats.reset()
+        profiler.stats.enabled = True
+
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.timer.Start(500)
+        self.refresh()
+
+    def OnTimer(self, event):
+        ''' Atualiza os números a cada disparo do timer. '''
+
+        self.refresh()
+
+    def refresh(self):
+        ''' Reescreve o painel e a status bar com os percentis atuais. '''
+
+        lines = []
+        for name in self.names:
+            p = profiler.stats.getPercentiles(name)
+            if p:
+                count = profiler.stats.getCount(name)
+                lines.append(f"{name:<15} p50 {p[50]:6.1f}  p90 {p[90]:6.1f}  p99 {p[99]:6.1f} ms  (n={count})")
+            else:
+                lines.append(f"{name:<15} -")
+
+        fps = profiler.stats.getFPS()
+        lines.append(f"Redesenhos: {fps} FPS")
+
+        latency = self.parent.sound.getLatency()
+        if latency['total'] is not None:
+            lines.append(f"Som: {latency['total']:.1f} ms (comando {latency['command']:.1f} + buffer {latency['output']:.1f})")
+
+        lines.append(assets.manager.formatStats())
+
+        self.SetLabel('\n'.join(lines))
+        self.Raise()
+
+        p = profiler.stats.getPercentiles('frameImage')
+        summary = f"frameImage p50 {p[50]:.1f} / p90 {p[90]:.1f} ms" if p else "frameImage -"
+        self.statusBar.SetStatusText(f"{summary} | {fps} FPS", 1)
+
+    def close(self):
+        ''' Desliga as medições e remove o painel. '''
+
+        self.timer.Stop()
+        profiler.stats.enabled = False
+        self.statusBar.SetFieldsCount(1)
+        self.Destroy()
+
 class BombCurve(wx.Dialog):
     def __init__(self, parent):
         style = wx.DEFAULT_FRAME_STYLE & (~wx.MAXIMIZE_BOX) & (~wx.MINIMIZE_BOX) & (~wx.RESIZE_BORDER)
@@ -227,7 +307,7 @@ class BombCurve(wx.Dialog):
         for i in range(0, 9):
             grid.SetCellValue(i + 3, 1, str(y[i]))
 
-        bitmap = wx.StaticBitmap(self, -1, wx.Bitmap('data/system1/misc/curva_bomba.png'))
+        bitmap = wx.StaticBitmap(self, -1, assets.manager.getBitmap(f'{self.parent.path}/misc/curva_bomba.png'))
         bitmap.SetFocus()
 
         hBox.Add(vBox, flag=wx.EXPAND | wx.ALL, border=5)
@@ -285,6 +365,7 @@ class Export(wx.Dialog):
 
         self.SetSizerAndFit(master)
 
+    @profiler.measure()
     def OnExport(self, event):
         ''' Chamada quando o botão `Exportar` é clicado. '''
 
@@ -314,6 +395,7 @@ class Export(wx.Dialog):
             func(file_path)
             wx.MessageBox(f'Arquivo {filename} salvo com sucesso.', 'Sucesso', wx.OK | wx.ICON_INFORMATION)
 
+    @profiler.measure()
     def writeCSV(self, filepath):
         ''' Exporta o relatório como .csv. '''
 
@@ -328,10 +410,12 @@ class Export(wx.Dialog):
                 before.insert(0, 'Antes')
                 writerObj.writerow(before)
 
+                changed = ['Alteração'] + [''] * len(self.order)
                 if 'abertura' in state['changed']:
-                    writerObj.writerow(['Alteração', state['changed']['abertura'], '', '', '', '', ''])
+                    changed[1] = state['changed']['abertura']
                 else:
-                    writerObj.writerow(['Alteração', '', '', state['changed']['rpm'], '', '', ''])
+                    changed[3] = state['changed']['rpm']
+                writerObj.writerow(changed)
 
                 after = [value for value in state['after'].values()]
                 after.insert(0, 'Depois')
@@ -341,9 +425,11 @@ class Export(wx.Dialog):
             now = datetime.now().strftime("%d/%m/%Y às %H:%M:%S")
             writerObj.writerow(['Obtido em:', now])
 
+    @profiler.measure()
     def writePDF(self, filepath):
         ''' Exporta o relatório como .pdf. '''
 
+        doc = SimpleDocTemplate(filepath, pagesize=A4)
         flowables = []
         styles = getSampleStyleSheet()
         spacer = Spacer(1, 0.25 * inch)
@@ -356,17 +442,20 @@ class Export(wx.Dialog):
         flowables.append(spacer)
         flowables.append(Paragraph("Laboratório Virtual - Relatório de Uso", titleStyle))
 
-        head = self.order[:]
-        head.insert(0, 'Situação')
+        # Os cabeçalhos quebram a linha para que todas as colunas caibam na largura da página.
+        headStyle = ParagraphStyle('tablehead', fontName='Helvetica', fontSize=5, leading=6)
+        head = [Paragraph(name, headStyle) for name in ['Situação'] + self.order]
+        colWidths = [doc.width / len(head)] * len(head)
 
         for state in self.reportList:
             before = [value for value in state['before'].values()]
             before.insert(0, 'Antes')
 
+            changed = ['Alteração'] + [''] * len(self.order)
             if 'abertura' in state['changed']:
-                changed = ['Alteração', state['changed']['abertura'], '', '', '', '', '']
+                changed[1] = state['changed']['abertura']
             else:
-                changed = ['Alteração', '', '', state['changed']['rpm'], '', '', '']
+                changed[3] = state['changed']['rpm']
 
             after = [value for value in state['after'].values()]
             after.insert(0, 'Depois')
@@ -380,7 +469,7 @@ class Export(wx.Dialog):
                 ('BACKGROUND', (0, 3), (-1, 3), '#f0f0f0'),
                 ('FONTSIZE', (0, 0), (-1, -1), 5)])
 
-            tbl = Table(data)
+            tbl = Table(data, colWidths=colWidths)
             tbl.setStyle(tblstyle)
             flowables.append(tbl)
             flowables.append(spacer)
@@ -390,9 +479,6 @@ class Export(wx.Dialog):
         p = Paragraph(now, styles['Normal'])
         flowables.append(p)
 
-        ### ------------------ ###
-
-        doc = SimpleDocTemplate(filepath, pagesize=A4)
         doc.build(flowables)
 
     def putFileSuffix(self, filename, suffix):
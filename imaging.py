@@ -0,0 +1,181 @@
+"""
+Arquivo responsável pelo processamento das imagens exibidas como buffers NumPy: decodificação e redimensionamento.
+imaging.py
+"""
+
+import math
+from collections import OrderedDict
+import numpy as np
+import wx
+
+BAND = 32   # Quantidade de linhas da saída processadas por vez, para manter os buffers de trabalho pequenos.
+PLANS = 8   # Planos (AxisPlan) guardados. Uma janela alternando entre poucos tamanhos não recalcula nada.
+
+class Pixels():
+    ''' Imagem decodificada: `rgb` é um array (altura, largura, 3) uint8 e `alpha` um array (altura, largura) ou None.
+    Os arrays podem ser views de outro buffer (wx.Image, arquivo lido do disco), guardado em `owner`. '''
+
+    def __init__(self, rgb, alpha=None, owner=None):
+        self.rgb = rgb
+        self.alpha = alpha
+        self.owner = owner
+        self.height, self.width = rgb.shape[:2]
+
+    def getSize(self):
+        return (self.width, self.height)
+
+    def getBytes(self):
+        return self.rgb.nbytes + (self.alpha.nbytes if self.alpha is not None else 0)
+
+def fromImage(image):
+    ''' Retorna um Pixels com views (sem cópia) dos buffers de `image` (wx.Image). '''
+
+    if image.HasMask() and not image.HasAlpha():
+        image.InitAlpha()
+
+    width, height = image.GetWidth(), image.GetHeight()
+    rgb = np.frombuffer(image.GetDataBuffer(), np.uint8).reshape(height, width, 3)
+    alpha = None
+    if image.HasAlpha():
+        alpha = np.frombuffer(image.GetAlphaBuffer(), np.uint8).reshape(height, width)
+
+    return Pixels(rgb, alpha, image)
+
+def decode(path, bitmapType=wx.BITMAP_TYPE_ANY):
+    ''' Decodifica o arquivo `path`. Retorna None se não for possível. '''
+
+    image = wx.Image(path, bitmapType)
+    if not image.IsOk():
+        return None
+
+    return fromImage(image)
+
+def getView(buffer, rows, width):
+    ''' Retorna uma view (rows, width, 3) do início do buffer plano `buffer`, sem cópia. '''
+
+    return buffer[:rows * width * 3].reshape(rows, width, 3)
+
+def toBitmap(rgb):
+    ''' Cria o wx.Bitmap a partir do array (altura, largura, 3) uint8 contíguo `rgb`, sem cópias intermediárias. '''
+
+    height, width = rgb.shape[:2]
+    return wx.Bitmap.FromBuffer(width, height, rgb)
+
+class AxisPlan():
+    ''' Índices e pesos para reamostrar um eixo de `n` para `m` pixels. Cada pixel da saída é a soma de `taps`
+    pixels da entrada, `index[t]`, com pesos `weight[t]`. Na redução é a média da área coberta (area-averaging);
+    na ampliação, interpolação linear. '''
+
+    def __init__(self, n, m):
+        out = np.arange(m, dtype=np.float64)
+
+        if m <= n:
+            scale = n / m
+            start = out * scale
+            end = start + scale
+            self.taps = math.ceil(scale) + 1
+            first = np.floor(start).astype(np.int64)
+
+            index = np.empty((self.taps, m), np.int64)
+            weight = np.empty((self.taps, m), np.float64)
+            for t in range(self.taps):
+                pixel = first + t
+                overlap = np.minimum(end, pixel + 1) - np.maximum(start, pixel)
+                index[t] = np.minimum(pixel, n - 1)
+                weight[t] = np.clip(overlap, 0, None) / scale
+        else:
+            source = np.clip((out + 0.5) * n / m - 0.5, 0, n - 1)
+            left = np.floor(source).astype(np.int64)
+            frac = source - left
+            self.taps = 2
+            index = np.stack([left, np.minimum(left + 1, n - 1)])
+            weight = np.stack([1 - frac, frac])
+
+        self.index = index
+        self.weight = weight.astype(np.float32)
+
+class Scaler():
+    ''' Redimensiona arrays RGB uint8. Os planos dos últimos tamanhos ficam guardados e os buffers de trabalho têm
+    a maior largura já vista, usados em fatias. Durante o redimensionamento da janela, cada tamanho novo só
+    calcula os planos. Os buffers não são alocados de novo e o único array novo é o de saída. '''
+
+    def __init__(self):
+        self.key = None
+        self.plans = OrderedDict()      # (n, m) -> AxisPlan. O último é o mais recente.
+        self.capacity = (0, 0)          # Larguras (origem, saída) para as quais os buffers foram alocados.
+
+    def getPlan(self, n, m):
+        ''' Retorna o AxisPlan de `n` para `m` pixels, calculado apenas se não estiver guardado. '''
+
+        key = (n, m)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = AxisPlan(n, m)
+            self.plans[key] = plan
+            if len(self.plans) > PLANS:
+                self.plans.popitem(last=False)
+        else:
+            self.plans.move_to_end(key)
+
+        return plan
+
+    def prepare(self, srcSize, dstSize):
+        ''' Escolhe os planos para `srcSize` -> `dstSize` (largura, altura). Os buffers só são alocados
+        de novo se uma das larguras for maior que todas as anteriores. '''
+
+        key = (srcSize, dstSize)
+        if key == self.key:
+            return
+
+        (srcWidth, srcHeight), (width, height) = srcSize, dstSize
+        self.rows = self.getPlan(srcHeight, height)
+        self.cols = self.getPlan(srcWidth, width)
+        self.rowWeights = [w.reshape(-1, 1, 1) for w in self.rows.weight]
+        self.colWeights = [w.reshape(1, -1, 1) for w in self.cols.weight]
+
+        if srcWidth > self.capacity[0]:
+            self.taken = np.empty(BAND * srcWidth * 3, np.uint8)
+            self.product = np.empty(BAND * srcWidth * 3, np.float32)
+            self.rowBand = np.empty(BAND * srcWidth * 3, np.float32)
+        if width > self.capacity[1]:
+            self.colTaken = np.empty(BAND * width * 3, np.float32)
+            self.colBand = np.empty(BAND * width * 3, np.float32)
+
+        self.capacity = (max(srcWidth, self.capacity[0]), max(width, self.capacity[1]))
+        self.key = key
+
+    def scale(self, rgb, size):
+        ''' Retorna um array novo (altura, largura, 3) uint8 com `rgb` redimensionado para `size` (largura, altura). '''
+
+        srcHeight, srcWidth = rgb.shape[:2]
+        self.prepare((srcWidth, srcHeight), size)
+
+        out = np.empty((size[1], size[0], 3), np.uint8)
+        for start in range(0, size[1], BAND):
+            stop = min(start + BAND, size[1])
+            rows = stop - start
+            taken, product, rowBand = (getView(buffer, rows, srcWidth) for buffer in (self.taken, self.product, self.rowBand))
+            colTaken, colBand = (getView(buffer, rows, size[0]) for buffer in (self.colTaken, self.colBand))
+
+            # Eixo vertical: linhas [start, stop) da saída, com a largura original.
+            for t in range(self.rows.taps):
+                np.take(rgb, self.rows.index[t, start:stop], axis=0, out=taken, mode='clip')
+                target = rowBand if t == 0 else product
+                np.multiply(taken, self.rowWeights[t][start:stop], out=target)
+                if t > 0:
+                    np.add(rowBand, product, out=rowBand)
+
+            # Eixo horizontal.
+            for t in range(self.cols.taps):
+                target = colBand if t == 0 else colTaken
+                np.take(rowBand, self.cols.index[t], axis=1, out=target, mode='clip')
+                np.multiply(target, self.colWeights[t], out=target)
+                if t > 0:
+                    np.add(colBand, colTaken, out=colBand)
+
+            np.add(colBand, 0.5, out=colBand)
+            np.copyto(out[start:stop], colBand, casting='unsafe')
+
+        return out
+
+scaler = Scaler()
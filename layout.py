@@ -0,0 +1,59 @@
+"""
+Arquivo responsável por posicionar os botões sobre a imagem exibida.
+layout.py
+"""
+
+class OverlayLayout():
+    ''' Converte as coordenadas normalizadas (0 ~ 1) de buttons.json e misc_buttons.json em posições na tela.
+    A imagem é exibida centralizada e sem distorção, então sobram faixas vazias nas laterais ou em cima e embaixo. '''
+
+    maxCacheSize = 64
+
+    def __init__(self, coordinates):
+        self.setCoordinates(coordinates)
+
+    def setCoordinates(self, coordinates):
+        ''' Recebe uma lista, por botão, com as coordenadas [x, y] de cada imagem. Ex: [[[0.12, 0.35], [0.08, 0.01]], ...] '''
+
+        self.coordinates = coordinates
+        self.cache = {}     # (largura, altura, aspecto, index) -> [(x, y), ...]
+
+    def getTransform(self, sizerDim, imageAspect):
+        ''' Retorna (offset_x, offset_y, largura, altura) da área da tela ocupada pela imagem. '''
+
+        width, height = sizerDim
+        if imageAspect <= width / height:
+            # Frame is wider than image so find the horizontal white space size to add
+            image_width = height * imageAspect
+            return ((width - image_width) / 2, 0, image_width, height)
+        else:
+            # Frame is higher than image so find the vertical white space size to add
+            image_height = width / imageAspect
+            return (0, (height - image_height) / 2, width, image_height)
+
+    def getPositions(self, sizerDim, imageAspect, index):
+        ''' Retorna a posição na tela de todos os botões para a imagem `index`.
+        O resultado é guardado, então a mesma lista é retornada enquanto nada mudar. Retorna None se a área for vazia. '''
+
+        width, height = sizerDim
+        if width <= 0 or height <= 0:
+            return None
+
+        key = (width, height, imageAspect, index)
+        positions = self.cache.get(key)
+        if positions is None:
+            offset_x, offset_y, image_width, image_height = self.getTransform(sizerDim, imageAspect)
+            positions = [(int(offset_x + image_width * coords[index][0]), int(offset_y + image_height * coords[index][1]))
+                         for coords in self.coordinates]
+
+            if len(self.cache) >= self.maxCacheSize:
+                self.cache.clear()
+            self.cache[key] = positions
+
+        return positions
+
+    def mapPoint(self, pos, sizerDim, imageAspect):
+        ''' Converte uma única coordenada normalizada `pos` em posição na tela. '''
+
+        offset_x, offset_y, image_width, image_height = self.getTransform(sizerDim, imageAspect)
+        return (int(offset_x + image_width * pos[0]), int(offset_y + image_height * pos[1]))
@@ -4,24 +4,45 @@ main_frame.py
 """
 
 import os
+import sys
+import math
+import time
+from datetime import datetime
+import numpy as np
 import wx
 from wx.core import Colour
-import wx.lib.platebtn as pb
 import wx.lib.scrolledpanel as scrolled
 from pubsub import pub
-import json
 import sound
 import settings
 import helper
 import tutorial
 import about
+import systems
+import assets
+import layout
+import permissions
+import profiler
+import watchdog
+import viewmodel
+import canvas
+import imaging
+import compositor
+import flow
+import gauges
+import simulation
+import noise
+import datalogger
+import stripchart
+import derived
 
 class MainFrame(wx.Panel):
-    def __init__(self, parent, folderPath):
+    def __init__(self, parent, system):
         super().__init__(parent)
 
         self.parent = parent
-        self.path = folderPath
+        self.system = system    # systems.LabSystem exibido
+        self.path = system.path
         self.images = []        # Contém os paths das imagens da pasta
         self.widgets = []       # (btnRef, sizerRefs, btnCoordinates)
         self.ctrls = []         # Widgets que exibem ou recebem dados (wx.Slider, wx.TextCtrl, wx.ComboBox)
@@ -29,7 +50,7 @@ class MainFrame(wx.Panel):
         self.data = []          # Irá conter os dados de data.json
         self.tables = []        # Irá conter os dados das tabelas dos equipamentos (zoom)
         self.lastStatus = {}    # Irá conter os valores de todo o sistema antes da mudança de valor.
-        self.canAcess = []      # Irá conter bools de permissão de acesso as principais funções.
+        self.canAcess = permissions.Access.ALL  # Máscara de permissão de acesso as principais funções.
 
         self.index = 0
         self.version = 1.0
@@ -44,15 +65,37 @@ class MainFrame(wx.Panel):
         self.isTooltip = True           # True para valor da medição, False para nenhuma.
         self.isEquipZoom = False        # Se a imagem atualmente exibida é de algum 'zoom'.
         self.curZoomTablePos = None     # Lista com as coordenadas do último zoom. Ex: [x, y]
+        self.tablePath = None           # Path da tabela do último zoom.
+        self.imagePath = None           # Path da imagem exibida.
+        self.overlayLayers = []         # Camadas sobre a imagem exibida: [(nome, path, (x, y)), ...]
+        self.flowMaskPath = None        # Máscara do fluxo de água da imagem exibida (veja getFlowMaskPath).
+        self.compositor = compositor.Compositor(lambda path: assets.manager.getPixels(path, False))
+        self.image = None               # imaging.Pixels exibido em tamanho original, montado apenas quando necessário.
+        self.scaledImage = None         # Array RGB exibido na tela, base dos quadros da animação do fluxo de água.
+        self.isWaterFlowing = False
+        self.flow = flow.Flow(lambda path: assets.manager.getPixels(path, False))
+        self.flowTimer = wx.Timer(self)
+        self.persistTimer = wx.Timer(self)  # Grava a imagem em disco quando a janela para de ser redimensionada.
+        self.gauges = {}                # Nome do equipamento -> gauges.Gauge desenhado no seu zoom, de gauges.json.
+        self.transient = None           # simulation.Transient com os valores exibidos pelos instrumentos.
+        self.noise = None               # noise.NoiseModel somado aos valores da simulação.
+        self.noiseSample = None         # Ruído atual de cada grandeza de `self.transient`.
+        self.derived = None             # derived.DerivedTable com as grandezas calculadas de cada linha de data.json.
+        self.derivedCtrls = {}          # key -> wx.TextCtrl de cada grandeza calculada, nos painéis dos equipamentos.
+        self.simulationTimer = wx.Timer(self)
+        self.logger = datalogger.DataLogger()  # Aquisição de dados: histórico de todas as leituras.
+        self.loggerTimer = wx.Timer(self)
+        self.stripChart = None          # stripchart.StripChart aberto, com as amostras da aquisição.
         self.canShowMotorPanel = False
         self.miscButtons = []
         self.miscButtonsRef = []
-        self.waterFlowBitmaps = []
-        self.greenArrowBitmaps = []
-        self.mascotBitmaps = []
+        self.layout = None              # layout.OverlayLayout com as coordenadas de todos os botões sobre a imagem.
+        self.buttonPositions = None     # Última lista de posições aplicada aos botões.
+        self.view = viewmodel.ViewModel()   # O que está exibido nos widgets, para só atualizar o que mudou.
 
         self.settingsWindow = None
         self.aboutWindow = None
+        self.perfOverlay = None
         self.tutorialObj = tutorial.MainTutorial(self)
 
         self.initUI()
@@ -61,6 +104,10 @@ class MainFrame(wx.Panel):
         self.getSystemStatus()
 
         self.Bind(wx.EVT_SIZE, self.OnResizing)
+        self.Bind(wx.EVT_TIMER, self.OnFlowTimer, self.flowTimer)
+        self.Bind(wx.EVT_TIMER, self.OnPersistTimer, self.persistTimer)
+        self.Bind(wx.EVT_TIMER, self.OnSimulationTimer, self.simulationTimer)
+        self.Bind(wx.EVT_TIMER, self.OnLoggerTimer, self.loggerTimer)
         self.SetDoubleBuffered(True)
 
         self.updateButtonTooltips()
@@ -91,23 +138,19 @@ class MainFrame(wx.Panel):
         self.scrolledSizer.Add( wx.StaticText(self.scrolled, -1, 'Painel de Controle'), flag=wx.ALIGN_CENTER | wx.ALL, border=10)
         self.scrolled.SetBackgroundColour('#f0f0f0')
 
-        self.bmpImage = wx.StaticBitmap(self, wx.ID_ANY)
-        self.tutorialBitmap = None
+        self.scene = canvas.SceneCanvas(self, ('flow', 'gauges'))     # Desenha a imagem e os botões dos equipamentos.
         self.tableBitmap = None
 
         self.mainSizer.Add(self.scrolled, 1, wx.EXPAND)
-        self.imageSizer.Add(self.bmpImage, 1, wx.EXPAND)
+        self.imageSizer.Add(self.scene, 1, wx.EXPAND)
         self.mainSizer.Add(self.imageSizer, 9, wx.EXPAND)
 
-        self.images = self.getFolderImages(f'{self.path}')
+        self.images = self.system.getImages()
 
         self.SetSizerAndFit(self.mainSizer)
         self.frameImage(self.images[self.index])
 
-        pub.subscribe(self.AcessPermissionHandler, 'acessHandler')
-        for _ in range(0, 17):
-            self.canAcess.append(True)
-
+    @profiler.measure()
     def initTutorial(self, event):
         ''' Inicia o tutorial. '''
 
@@ -116,12 +159,14 @@ class MainFrame(wx.Panel):
 
         self.tutorialObj.InitTutorial()
 
+    @profiler.measure()
     def endTutorial(self, event):
         ''' Finaliza o tutorial. '''
 
         if self.tutorialObj.isTutorialInProgress:
             self.tutorialObj.endTutorial()
 
+    @profiler.measure()
     def OnAbout(self, event):
         ''' Abre a janela de Sobre. '''
 
@@ -143,26 +188,38 @@ class MainFrame(wx.Panel):
     def getButtons(self):
         ''' Popula a lista `self.widgets`. '''
 
-        with open(f"{self.path}/buttons.json", 'r', encoding='utf-8') as f:
-            text = f.read()
-            self.buttons = json.loads(text)
+        self.buttons = self.system.getJson('buttons')
+        self.data = self.system.getJson('data')
+        self.miscButtons = self.system.getJson('misc_buttons')
+        self.tables = self.system.getJson('tables')
+
+        self.gauges = {}
+        if os.path.isfile(f'{self.path}/gauges.json'):
+            self.gauges = {dic['name']: gauges.Gauge(dic) for dic in self.system.getJson('gauges')}
+
+        # A rotação e os instrumentos são simulados. A tolerância de cada um é meia unidade da última casa decimal.
+        keys = ['rpm'] + [dic['jsonKey'] for dic in self.buttons if not dic['isControllable']]
+        tolerances = [0.5] + [0.5 * 10 ** -simulation.getDecimals(row[key] for row in self.data) for key in keys[1:]]
+        self.decimals = {key: simulation.getDecimals(row[key] for row in self.data) for key in keys[1:]}
+        self.transient = simulation.Transient(keys, tolerances)
 
-        with open(f"{self.path}/data.json", 'r', encoding='utf-8') as f:
-            text = f.read()
-            self.data = json.loads(text)
+        config = self.system.getJson('noise') if os.path.isfile(f'{self.path}/noise.json') else {}
+        self.noise = noise.NoiseModel(keys, config)
+        self.noiseSample = np.zeros(len(keys))
 
-        with open(f"{self.path}/misc_buttons.json", 'r', encoding='utf-8') as f:
-            text = f.read()
-            self.miscButtons = json.loads(text)
+        # Com o ruído, uma grandeza que nunca é negativa em data.json (ex: vazão com a válvula fechada) não pode ficar negativa.
+        self.floors = [0] + [0 if min(row[key] for row in self.data) >= 0 else -math.inf for key in keys[1:]]
 
-        with open(f"{self.path}/tables.json", 'r', encoding='utf-8') as f:
-            text = f.read()
-            self.tables = json.loads(text)
+        units = [dic['unit'] for dic in self.buttons if dic['jsonKey'] == 'rpm'][0]
+        self.rpmTable = ([unit[0] for unit in units], [unit[1] for unit in units])  # Rotação -> porcentagem.
+
+        self.derived = derived.DerivedTable(self.data)
+        self.derivedCtrls = {}
 
         for dic in self.buttons:
-            b = pb.PlateButton(self.bmpImage, 1000 + dic['index'], style=pb.PB_STYLE_NOBG, name=dic['jsonKey'], size=((129, 35)))
+            b = canvas.Sprite(self.scene, 1000 + dic['index'], name=dic['jsonKey'], size=((129, 35)))
             b.Bind(wx.EVT_BUTTON, self.OnButton)
-            b.SetBitmap(wx.Bitmap(f"images/buttons/0_{dic['buttonName']}.png"))
+            b.SetBitmap(assets.manager.getBitmap(f"images/buttons/0_{dic['buttonName']}.png"))
 
             s = helper.ItemFrame(self.scrolled, self, dic)
             self.scrolledSizer.Add(s, flag=wx.ALL | wx.ALIGN_CENTER, border=10)
@@ -175,66 +232,84 @@ class MainFrame(wx.Panel):
     def getTutorialFile(self, jsonName):
         ''' Carrega e retorna o .json do tutorial. '''
 
-        with open(f"{self.path}/{jsonName}.json", 'r', encoding='utf-8') as f:
-            text = f.read()
-            outList = json.loads(text)
-
-        return outList
+        return self.system.getJson(jsonName)
 
     def getMiscButtons(self):
         ''' Popula a lista self.misc_buttons. '''
 
         for dic in self.miscButtons:
-            b = pb.PlateButton(self.bmpImage, -1, style=pb.PB_STYLE_NOBG, name=dic['buttonName'], size=((70, 45)))
+            b = canvas.Sprite(self.scene, name=dic['buttonName'], size=((70, 45)))
             b.Bind(wx.EVT_BUTTON, self.OnMiscButton)
-            b.SetBitmap(wx.Bitmap(f"images/buttons/0_{dic['buttonName']}.png"))
+            b.SetBitmap(assets.manager.getBitmap(f"images/buttons/0_{dic['buttonName']}.png"))
             self.miscButtonsRef.append((b, None, dic['coordinates']))   # Uma gambiarra para o reaproveitamento de função.
 
+        coordinates = [btn[2] for btn in self.widgets] + [btn[2] for btn in self.miscButtonsRef]
+        self.layout = layout.OverlayLayout(coordinates)
+        self.buttonPositions = None
+
+        # Prepara o som da bomba para cada rotação do Motor Elétrico.
+        for dic in self.buttons:
+            if dic['jsonKey'] == 'rpm':
+                self.sound.buildPumpTable([value[0] for value in dic['unit']])
+
     def getSystemStatus(self):
         ''' Guarda o estado de todo o sistema, como o nome dos equipamentos e valores, no dicionário `self.lastStatus`. '''
 
         self.lastStatus.clear()
-        for ctrl in self.ctrls:
-            self.lastStatus[ctrl.GetName()] = ctrl.GetValue()
+        self.lastStatus.update(self.getSteadyStatus())
 
-    def AcessPermissionHandler(self, index=0, boolValue=True, setAll=False):
-        ''' Modifica para `bool` em `index` na lista self.canAcess.
-        Se `setAll` for True, `boolValue` será usado para a lista inteira. '''
+    def getSteadyStatus(self):
+        ''' Retorna {nome: valor} de todos os controles no ponto de operação atual (data.json), e não os valores
+        exibidos durante um transitório. '''
 
-        if setAll:
-            for i in range(0, len(self.canAcess)):
-                self.canAcess[i] = boolValue
-        else:
-            self.canAcess[index] = boolValue
+        status = {}
+        row = self.data[self.dataIndex]
+        for i, ctrl in enumerate(self.ctrls):
+            name = ctrl.GetName()
+            status[name] = ctrl.GetValue() if self.buttons[i]['isControllable'] else str(row[name])
+
+        status.update(self.derived.getText(self.dataIndex))
+        return status
 
+    def setAccess(self, mask):
+        ''' Substitui todas as permissões de acesso pela máscara `mask` (permissions.Access). '''
+
+        self.canAcess = mask
+
+    def hasAccess(self, flag):
+        ''' Retorna True se a permissão `flag` (permissions.Access) estiver liberada. '''
+
+        return bool(self.canAcess & flag)
+
+    @profiler.measure()
     def OnButton(self, event):
         ''' Chamada quando um botão é clicado. '''
 
         obj = event.GetEventObject()
         ID = obj.GetId() - 1000
 
-        # [9] -> Registro Esfera, botao
-        if not self.canAcess[ID + 9]:
+        if not self.hasAccess(permissions.BUTTON[ID]):
             return
 
         if self.tutorialObj.isTutorialInProgress:
             self.tutorialObj.Notify(None, buttonPressed=True)
 
-        if self.widgets[ID][1].IsShown():
-            self.widgets[ID][1].Hide()
+        if self.view.isShown(ID, self.widgets[ID][1]):
+            self.showPanel(ID, False)
         else:
             # Motor Elétrico ID = 2
             if ID == 2:
                 if self.canShowMotorPanel:
-                    self.widgets[ID][1].Show()
+                    self.showPanel(ID, True)
                 else:
                     pub.sendMessage('OnStatusBar', msg='Ligue o motor elétrico para acessar o painel.', isError=True)
             else:
-                self.widgets[ID][1].Show()
+                self.showPanel(ID, True)
 
         self.updateScrolledVisibility()
         self.frameImage(self.images[self.index], True)
 
+    @profiler.measure()
     def OnMiscButton(self, event):
         ''' Quando qualquer um dos outros botões for clicado. '''
 
@@ -243,39 +318,38 @@ class MainFrame(wx.Panel):
         rpmCtrl = self.ctrls[2]     # ctrls[2] = Motor Elétrico
 
         if name == 'onMotor':
-            if not self.canAcess[15]:
+            if not self.hasAccess(permissions.Access.MOTOR_ON):
                 return
 
             self.canShowMotorPanel = True
             if self.getRPMValue() == 0:
                 rpmCtrl.SetValue('890 (50)')
-                self.widgets[2][1].Show(True)
+                self.showPanel(2, True)
                 self.updateScrolledVisibility()
                 self.OnValueChanged(self.ctrls[2])
 
         elif name == 'offMotor':
-            if not self.canAcess[16]:
+            if not self.hasAccess(permissions.Access.MOTOR_OFF):
                 return
 
             self.canShowMotorPanel = False
             if self.getRPMValue() != 0:
                 rpmCtrl.SetValue('0 (0)')
-                self.widgets[2][1].Hide()
+                self.showPanel(2, False)
                 self.updateScrolledVisibility()
                 self.OnValueChanged(self.ctrls[2])
 
 
+    def showPanel(self, index, show):
+        ''' Mostra ou esconde o painel do equipamento `index` no Painel de Controle. '''
+
+        self.view.setShown(index, self.widgets[index][1], show)
+
     def updateScrolledVisibility(self):
         ''' Atualiza a visibilidade do self.scrolled. '''
 
-        isAnyShown = []
-        for i in range (0, len(self.widgets)):
-            isAnyShown.append(self.widgets[i][1].IsShown())
-
-        if any(isAnyShown):
-            self.scrolled.Show(True)
-        else:
-            self.scrolled.Show(False)
+        isAnyShown = any(self.view.isShown(i, self.widgets[i][1]) for i in range(0, len(self.widgets)))
+        self.view.setShown('scrolled', self.scrolled, isAnyShown)
 
     def showButtons(self, show):
         ''' Mostra ou esconde todos os botoões da imagem. '''
@@ -288,183 +362,249 @@ class MainFrame(wx.Panel):
             btn = d[0]
             btn.Show(show)
 
+    @profiler.measure()
     def updateButtons(self):
         ''' Atualiza a posição dos botões na tela. '''
 
-        sizerDim = self.imageSizer.GetSize()
-        sizer_aspect = sizerDim[0] / sizerDim[1]
-
-        for btn in self.widgets:
-            btn[0].Position = self.getButtonPosition(btn, sizerDim, sizer_aspect)
-
-        for btn in self.miscButtonsRef:
-            btn[0].Position = self.getButtonPosition(btn, sizerDim, sizer_aspect)
-
-    def getButtonPosition(self, btn, sizerDim, sizer_aspect):
-        ''' Retorna a posição de um botão do sistema. '''
-
-        button_horizontal = int(sizerDim[0] * btn[2][self.index][0])
-        button_vertical = int(sizerDim[1] * btn[2][self.index][1])
+        positions = self.layout.getPositions(tuple(self.imageSizer.GetSize()), self.image_aspect, self.index)
 
-        if self.image_aspect <= sizer_aspect:
-            # Frame is wider than image so find the horizontal white space size to add
-            image_width = sizerDim[1] * self.image_aspect
-            horizontal_offset = (sizerDim[0] - image_width) / 2
-            button_horizontal = int(horizontal_offset + image_width * btn[2][self.index][0])
+        # A mesma lista significa que nem o tamanho, nem a imagem mudaram desde a última vez.
+        if positions is None or positions is self.buttonPositions:
+            return
 
-        elif self.image_aspect > sizer_aspect:
-            # Frame is higher than image so find the vertical white space size to add
-            image_height = sizerDim[0] / self.image_aspect
-            vertical_offset = (sizerDim[1] - image_height) / 2
-            button_vertical = int(vertical_offset + image_height * btn[2][self.index][1])
+        buttons = [btn[0] for btn in self.widgets] + [btn[0] for btn in self.miscButtonsRef]
+        for i in range(0, len(buttons)):
+            if self.buttonPositions is None or positions[i] != self.buttonPositions[i]:
+                buttons[i].Move(positions[i])
 
-        return (button_horizontal, button_vertical)
+        self.buttonPositions = positions
 
     def getTutButtonPosition(self, pos):
         ''' Retorna a posição para a exibição do botão do mascote na imagem. '''
 
-        sizerDim = self.imageSizer.GetSize()
-        sizer_aspect = sizerDim[0] / sizerDim[1]
-
-        image_horizontal = int(sizerDim[0] * pos[0])
-        image_vertical = int(sizerDim[1] * pos[1])
-
-        if self.image_aspect <= sizer_aspect:
-            # Frame is wider than image so find the horizontal white space size to add
-            image_width = sizerDim[1] * self.image_aspect
-            horizontal_offset = (sizerDim[0] - image_width) / 2
-            image_horizontal = int(horizontal_offset + image_width * pos[0])
-
-        elif self.image_aspect > sizer_aspect:
-            # Frame is higher than image so find the vertical white space size to add
-            image_height = sizerDim[0] / self.image_aspect
-            vertical_offset = (sizerDim[1] - image_height) / 2
-            image_vertical = int(vertical_offset + image_height * pos[1])
-
-        return (image_horizontal, image_vertical)
-
-    def replaceImage(self, index, path):
-        ''' Substitui a imagem em `index` pela imagem (`path`) na lista `self.images`.
-        Retorna True em caso de sucesso. '''
-
-        if index < 0 or index >= len(self.images):
-            return False
-
-        self.images[index] = path
-        if not self.isEquipZoom:
-            self.frameImage(self.images[self.index])
-
-        return True
+        return self.layout.mapPoint(pos, tuple(self.imageSizer.GetSize()), self.image_aspect)
 
     def getFirstImagePath(self):
         ''' Retorna o caminho da primeira imagem corresponde ao `self.index = 0`. '''
 
         return self.images[0]
 
+    @profiler.measure()
     def frameImage(self, path, isJustResize=False):
         ''' Recebe o path da imagem e atualiza na tela. '''
 
+        profiler.stats.markFrame()
         self.Freeze()
         if not isJustResize:
-            self.bitmap = wx.Bitmap(path, wx.BITMAP_TYPE_ANY)
-
-            if self.tutorialObj.isTutorialInProgress:
-                self.drawTutorialImage()
+            self.imagePath = path
+            self.overlayLayers = self.getOverlayLayers()
+            self.flowMaskPath = self.getFlowMaskPath()
+            self.image = None
 
-            if self.isEquipZoom and not self.tutorialObj.isTutorialInProgress:
-                self.drawTableImage()
-
-            self.image = self.bitmap.ConvertToImage()
-            self.image_aspect = self.image.GetSize()[0] / self.image.GetSize()[1]
+            # O tamanho original fica guardado no cache em disco, então a imagem nem sempre precisa ser decodificada.
+            width, height = assets.manager.getImageSize(path)
+            self.image_aspect = width / height
 
         self.Layout()   # Para atualizar o tamanho do self.imageSizer
 
         image_width, image_height = self.imageSizer.GetSize()
-        new_image_width = image_width
-        new_image_height = int(new_image_width / self.image_aspect)
+        new_image_width = max(image_width, 1)
+        new_image_height = max(int(new_image_width / self.image_aspect), 1)
 
         if new_image_height > image_height:
-            new_image_height = image_height
-            new_image_width = int(new_image_height * self.image_aspect)
-
-        scaledImage = self.image.Scale(new_image_width, new_image_height, wx.IMAGE_QUALITY_BILINEAR)
-
-        self.bmpImage.SetBitmap(scaledImage.ConvertToBitmap())
+            new_image_height = max(image_height, 1)
+            new_image_width = max(int(new_image_height * self.image_aspect), 1)
+
+        # Durante o redimensionamento da janela os tamanhos intermediários não são gravados em disco.
+        scaled = assets.manager.getScaled(self.imagePath, self.overlayLayers, (new_image_width, new_image_height),
+                                          self.composeImage, isJustResize)
+        if isJustResize:
+            self.persistTimer.StartOnce(assets.PERSIST_DELAY)
+
+        self.scaledImage = scaled
+        self.flow.reset()
+        self.scene.SetBitmap(imaging.toBitmap(scaled))
         self.Layout()
         self.updateButtons()
+        self.updateFlow()
+        self.updateGauge()
         self.Thaw()     # Freeze() e Thaw() previne flickering.
 
-    def drawTutorialImage(self):
-        ''' Desenha a imagem do tutorial por cima da imagem base. '''
+    @profiler.measure()
+    def OnPersistTimer(self, event):
+        ''' A janela parou de ser redimensionada: grava em disco a imagem no tamanho final. '''
 
-        if not self.tutorialBitmap:
-            return
+        assets.manager.persistScaled(self.imagePath, self.overlayLayers, self.scaledImage)
+
+    def getOverlayLayers(self):
+        ''' Retorna as camadas que devem ser desenhadas sobre a imagem, de baixo para cima, como [(nome, path, (x, y)), ...].
+        No tutorial: o fluxo de água, a seta verde e o mascote. No zoom de um equipamento: a tabela. '''
 
-        pos = self.tutorialObj.pos
-        dc = wx.MemoryDC(self.bitmap)
+        layers = []
+        if self.tutorialObj.isTutorialInProgress:
+            equip = self.tutorialObj.curEquip
+            if equip:
+                layers.append(('water', f'{self.path}/misc/overlays/{equip}_overlay.png', (0, 0)))
+            else:
+                layers.append(('water', f'{self.path}/misc/overlays/base_overlay.png', (0, 0)))
+                index = self.tutorialObj.index
+                if index >= 14 and index <= 18:
+                    layers.append(('arrow', f'{self.path}/misc/overlays/{index}_overlay.png', (0, 0)))
+
+            pos = self.tutorialObj.pos
+            layers.append(('mascot', f'images/tutorial/{self.tutorialObj.index}.png', (pos[0], pos[1])))
+
+        elif self.isEquipZoom and self.tableBitmap:
+            pos = self.curZoomTablePos
+            layers.append(('table', self.tablePath, (pos[0], pos[1])))
+
+        return layers
 
-        equip = self.tutorialObj.curEquip
-        if equip:
-            dc.DrawBitmap(wx.Bitmap(self.getWaterFlowBitmap(equip)), 0, 0, True)
+    def getFlowMaskPath(self):
+        ''' Retorna o path da máscara com as setas do fluxo de água da imagem exibida, ou None se ela não tiver.
+        No tutorial as setas já são desenhadas, paradas, como uma das camadas. Chamada uma vez por imagem, em frameImage. '''
+
+        if self.tutorialObj.isTutorialInProgress:
+            return None
+
+        if self.isEquipZoom:
+            path = f'{self.path}/misc/overlays/{self.getZoomName()}_overlay.png'
+        elif self.imagePath == self.getFirstImagePath():
+            path = f'{self.path}/misc/overlays/base_overlay.png'
         else:
-            dc.DrawBitmap(self.baseWaterFlowBitmap, 0, 0, True)
-            index = self.tutorialObj.index
-            if index >= 14 and index <= 18:
-                dc.DrawBitmap(wx.Bitmap(self.greenArrowBitmaps[index - 14]), 0, 0, True)
+            return None
 
-        dc.DrawBitmap(self.tutorialBitmap, pos[0], pos[1], True)
-        del dc
+        return path if os.path.isfile(path) else None
 
-        self.bmpImage.SetBitmap(self.bitmap)
+    def updateFlow(self):
+        ''' Liga a animação do fluxo de água se a água estiver passando e a imagem exibida tiver as setas. '''
+
+        if self.isWaterFlowing and self.flowMaskPath:
+            if not self.flowTimer.IsRunning():
+                self.flowTimer.Start(1000 // flow.FPS)
+        else:
+            self.flowTimer.Stop()
+            self.flow.reset()
+            self.scene.setPatches('flow', [])
 
-    def drawTableImage(self):
-        ''' Desenha a imagem do tutorial por cima da imagem base. '''
+    @profiler.measure()
+    def OnFlowTimer(self, event):
+        ''' Desenha o quadro atual da animação do fluxo de água. Apenas os retângulos das setas são redesenhados. '''
 
-        if not self.tableBitmap:
+        path = self.flowMaskPath
+        if path is None or self.scaledImage is None or not self.IsShownOnScreen():
             return
 
-        pos = self.curZoomTablePos
-        dc = wx.MemoryDC(self.bitmap)
-        dc.DrawBitmap(self.tableBitmap, pos[0], pos[1], True)
-        del dc
-        self.bmpImage.SetBitmap(self.bitmap)
+        # O quadro vem do relógio, não da quantidade de eventos, então a velocidade não muda se algum atrasar.
+        patches = self.flow.update(path, self.scaledImage, time.perf_counter())
+        if patches is not None:
+            self.scene.setPatches('flow', patches)
 
-    def loadTutorialBitmaps(self):
-        ''' Carrega as imagens para as listas de bitmap. '''
+    def getZoomName(self):
+        ''' Retorna o nome do equipamento em zoom, tirado do nome da imagem exibida. '''
 
-        if len(self.waterFlowBitmaps) > 0:
+        return os.path.splitext(os.path.basename(self.imagePath))[0]
+
+    def getZoomGauge(self):
+        ''' Retorna o gauges.Gauge do equipamento em zoom, ou None. No tutorial os instrumentos não são desenhados. '''
+
+        if not self.isEquipZoom or self.tutorialObj.isTutorialInProgress:
+            return None
+
+        return self.gauges.get(self.getZoomName())
+
+    def updateGauge(self):
+        ''' Desenha o instrumento do zoom exibido, se houver. O mostrador só é redesenhado se a imagem mudou. '''
+
+        gauge = self.getZoomGauge()
+        if gauge is None or self.scaledImage is None:
+            self.scene.setPatches('gauges', [])
             return
 
-        equips = ['Piezômetro', 'Manovacuômetro', 'Motor Elétrico', 'Bomba', 'Manômetro', 'Medidor de Vazão', 'Registro Esfera']
-        for equip in equips:
-            self.waterFlowBitmaps.append( (equip, wx.Bitmap(f'data/system1/misc/overlays/{equip}_overlay.png')) )
+        width = assets.manager.getImageSize(self.imagePath)[0]
+        gauge.prepare(self.scaledImage, self.scaledImage.shape[1] / width)
+        self.scene.setPatches('gauges', gauge.getPatches())
 
-        for i in range(0, 5):
-            self.greenArrowBitmaps.append(wx.Bitmap(f'data/system1/misc/overlays/{i + 14}_overlay.png'))
+    def setGaugeValues(self):
+        ''' Passa os valores exibidos para os instrumentos, redesenhando o do zoom se o valor dele mudou. '''
 
-        for i in range(0, 21):
-            self.mascotBitmaps.append( wx.Bitmap(f'images/tutorial/{str(i)}.png') )
+        shown = self.getZoomGauge()
+        for gauge in self.gauges.values():
+            if gauge.setValue(self.getInstrumentValue(gauge.key)) and gauge is shown:
+                self.scene.setPatches('gauges', gauge.getPatches())
 
-        self.baseWaterFlowBitmap = wx.Bitmap('data/system1/misc/overlays/base_overlay.png')
+    def composeImage(self):
+        ''' Retorna o imaging.Pixels da imagem exibida em tamanho original, com as sobreposições desenhadas. '''
 
-    def getWaterFlowBitmap(self, name):
-        ''' Retorna o wx.Bitmap do equipamento em `name`. Retorna None em caso de erro. '''
+        if self.image is None:
+            # Os arrays do cache são compartilhados, então as camadas são desenhadas nos buffers do compositor.
+            base = assets.manager.getPixels(self.imagePath)
+            self.image = self.compositor.compose(self.imagePath, base, self.overlayLayers)
 
-        for bitmap in self.waterFlowBitmaps:
-            if bitmap[0] == name:
-                return bitmap[1]
+        return self.image
 
-        return None
+    def releaseSystemAssets(self):
+        ''' Libera os bitmaps e dados carregados da bancada atual. '''
+
+        self.tableBitmap = None
+        self.simulationTimer.Stop()
+        self.noise.close()
+        self.system.unload()
+        assets.manager.release(self.path)
+
+    def switchSystem(self, system):
+        ''' Troca a bancada exibida por `system`, liberando o que foi carregado da bancada anterior. '''
+
+        if system is self.system:
+            return
+
+        self.endTutorial(None)
+        self.sound.SoundPlayback('rpm', False)
+        self.sound.SoundPlayback('abertura', False)
+
+        self.Freeze()
+
+        # (btnRef, sizerRef, btnCoordinates)
+        for btn, panel, _ in self.widgets:
+            btn.Destroy()
+            panel.Destroy()
+
+        for btn, _, _ in self.miscButtonsRef:
+            btn.Destroy()
+
+        self.widgets.clear()
+        self.miscButtonsRef.clear()
+        self.ctrls.clear()
+        self.view.reset()
+        self.releaseSystemAssets()
+
+        self.system = system
+        self.path = system.path
+        self.images = system.getImages()
+        self.index = 0
+        self.isEquipZoom = False
+        self.canShowMotorPanel = False
+        self.report.ClearScrolled()
+        self.tutorialObj = tutorial.MainTutorial(self)
 
-    def getFolderImages(self, path):
-        ''' Recebe uma string com o caminho da pasta e retorna uma lista com os paths de todas as imagens da pasta. '''
+        self.getButtons()
+        self.logger.clear()     # As amostras da bancada anterior não valem para a nova.
+        if self.stripChart:
+            self.stripChart.resetAxes()     # As escalas vêm do data.json da bancada.
+        self.OnValueChanged(None)
+        self.getSystemStatus()
+        self.updateScrolledVisibility()
+        self.LoadConfigFile()   # Reaplica estilo, cores e tooltips aos novos botões.
+        self.frameImage(self.images[self.index])
+        self.showButtons(True)
 
-        jpgs = [f for f in os.listdir(path) if f[-4:] == ".JPG"]
-        return [os.path.join(path, f) for f in jpgs]
+        self.Thaw()
 
+    @profiler.measure()
     def OnValueChanged(self, event):
         ''' Chamada quando o valor em qualquer um dos botões é modificado. '''
 
+        eventTime = time.perf_counter()     # Para medir a latência até o som.
         if event:
             if isinstance(event, wx._core.CommandEvent):
                 name = event.GetEventObject().GetName()
@@ -486,29 +626,14 @@ class MainFrame(wx.Panel):
 
                 dic = {}
 
-        # Encontra no data.json o index corresponde aos dados dos widgets.
-        index = -1
-        hook = 'rpm'
         for dic in values:
-            # Usaremos um "anzol" para pegar todos os outros dados.
-            if dic['key'] == hook:
-                if dic['value'] == '0 (0)':
-                    self.canShowMotorPanel = False
-                    self.widgets[2][1].Hide()   # widgets[2][1] --> Painel Motor Elétrico
-                    self.updateScrolledVisibility()
-
-                for i in range(0, len(self.data)):
-                    if dic['value'] == self.data[i][hook]:
-                        index = i
-                        break
+            if dic['key'] == 'rpm' and dic['value'] == '0 (0)':
+                self.canShowMotorPanel = False
+                self.showPanel(2, False)    # widgets[2][1] --> Painel Motor Elétrico
+                self.updateScrolledVisibility()
 
-        for dic in values:
-            if dic['key'] != hook:
-                for i in range(index, len(self.data)):
-                    key = dic['key']
-                    if int(dic['value']) == self.data[i][key]:
-                        index = i
-                        break
+        # Encontra no data.json o index corresponde aos dados dos widgets.
+        index = self.system.findDataIndex(values)
 
         self.refreshOnDisplayValues(index)
         self.updateButtonTooltips()
@@ -517,23 +642,124 @@ class MainFrame(wx.Panel):
             if isinstance(event, wx._core.CommandEvent):
                 self.report.TakeNote(self.lastStatus, event.GetEventObject())
             else:
-                self.report.TakeNote(self.lastStatus, event)    # É um pb.PlateButton
+                self.report.TakeNote(self.lastStatus, event)    # É um dos ctrls, passado diretamente (ex: OnMiscButton)
 
-            self.updateSoundPlay()
+            self.updateSoundPlay(eventTime)
             self.getSystemStatus()
 
             if self.tutorialObj.isTutorialInProgress:
                 self.tutorialObj.Notify(self.lastStatus)
 
     def refreshOnDisplayValues(self, index):
-        ''' Recebe um `index` do índice no arquivo data.json que contém os dados que deverá ser exibido em um widget. '''
+        ''' Recebe um `index` do índice no arquivo data.json que contém os dados que deverá ser exibido em um widget.
+        Os instrumentos vão até os novos valores pela simulação do transitório. '''
 
         self.dataIndex = index
+        row = self.data[index]
+        values = [self.getRPM(row['rpm'])] + [row[key] for key in self.transient.keys[1:]]
+        self.transient.setTarget(values, time.perf_counter())
+        self.showInstrumentValues()
+        self.showDerivedValues()
+
+        if self.isSimulating() and not self.simulationTimer.IsRunning():
+            self.simulationTimer.Start(1000 // simulation.FPS)
+
+    def getNoiseScale(self):
+        ''' Retorna a intensidade do ruído: proporcional à rotação do motor, então com ele parado as leituras são estáveis. '''
+
+        return self.transient.getValue('rpm') / max(self.rpmTable[0])
+
+    def isSimulating(self):
+        ''' Retorna se os valores exibidos ainda vão mudar: há um transitório ou ruído. '''
+
+        return not self.transient.isSettled() or (self.noise.isActive and self.getNoiseScale() > 0)
+
+    def showInstrumentValues(self):
+        ''' Exibe os valores atuais da simulação nos widgets e nos instrumentos dos zooms. '''
+
         for i in range(0, len(self.buttons)):
             if not self.buttons[i]['isControllable']:
                 key = self.widgets[i][0].GetName()
-                value = str(self.data[index][key])
-                self.ctrls[i].SetValue(value)
+                self.view.setValue(i, self.ctrls[i], self.getDisplayValue(key))
+
+        self.setGaugeValues()
+
+    def showDerivedValues(self):
+        ''' Exibe as grandezas calculadas do ponto de operação atual, já prontas em `self.derived`. '''
+
+        for key, text in self.derived.getText(self.dataIndex).items():
+            if key in self.derivedCtrls:
+                self.view.setValue(key, self.derivedCtrls[key], text)
+
+    @profiler.measure()
+    def OnSimulationTimer(self, event):
+        ''' Avança a simulação do transitório e exibe os novos valores. Para quando todos chegam ao destino. '''
+
+        changed = self.transient.advance(time.perf_counter())
+        if self.noise.isActive:
+            self.noiseSample = self.noise.advance(self.getNoiseScale())
+            changed = True
+
+        if changed:
+            self.showInstrumentValues()
+            self.updateButtonTooltips()
+
+        if not self.isSimulating():
+            self.noiseSample[:] = 0
+            self.showInstrumentValues()
+            self.simulationTimer.Stop()
+
+    def getRPM(self, value):
+        ''' Retorna a rotação (int) de um valor do Motor Elétrico, como '890 (50)'. '''
+
+        return int(value.split()[0])
+
+    def getInstrumentValue(self, key):
+        ''' Retorna o valor (float) exibido agora de `key`: o da simulação, ou o de data.json se não for simulado. '''
+
+        if key in self.transient.index:
+            i = self.transient.index[key]
+            return max(self.transient.getValue(key) + self.noiseSample[i], self.floors[i])
+
+        return float(self.data[self.dataIndex][key])
+
+    def getDisplayValue(self, key):
+        ''' Retorna o texto exibido agora de `key`. Fora dos transitórios, é o próprio valor de data.json. '''
+
+        row = self.data[self.dataIndex]
+        if key not in self.transient.index:
+            return str(row[key])
+
+        if self.transient.isKeySettled(key) and self.noiseSample[self.transient.index[key]] == 0:
+            return str(row[key])
+
+        value = self.getInstrumentValue(key)
+        if key == 'rpm':
+            percent = np.interp(value, *self.rpmTable)
+            return f'{value:.0f} ({percent:.0f})'
+
+        return f'{value:.{self.decimals[key]}f}'
+
+    def setAcquisition(self, isActive):
+        ''' Inicia ou para a aquisição de dados. '''
+
+        if isActive:
+            self.loggerTimer.Start(self.logger.getInterval())
+        else:
+            self.loggerTimer.Stop()
+
+    def updateAcquisition(self, rate=None, window=None):
+        ''' Muda a taxa (amostras por segundo) e/ou a janela (s) da aquisição de dados. '''
+
+        self.logger.configure(rate, window)
+        if self.loggerTimer.IsRunning():
+            self.loggerTimer.Start(self.logger.getInterval())
+
+    @profiler.measure()
+    def OnLoggerTimer(self, event):
+        ''' Grava uma amostra de todas as leituras, independente do relatório. '''
+
+        self.logger.append(time.perf_counter(), [self.getInstrumentValue(key) for key in datalogger.KEYS])
 
     def getTableCoordinates(self, name):
         ''' Procura na lista `self.tables` e retorna as coordenadas (int, int) para aquela tabela. '''
@@ -544,13 +770,14 @@ class MainFrame(wx.Panel):
 
         return None
 
+    @profiler.measure()
     def OnClosePanel(self, event):
         ''' Chamada quando o botão de fechar dentro de um `ItemFrame` for clicado. '''
 
         obj = event.GetEventObject()
         ID = obj.GetId() - 1000
 
-        self.widgets[ID][1].Hide()
+        self.showPanel(ID, False)
 
         self.updateScrolledVisibility()
         self.frameImage(self.images[self.index], True)
@@ -559,14 +786,15 @@ class MainFrame(wx.Panel):
         ''' Esconde todos os itens do Painel de Controle e o esconde. '''
 
         for i in range(0, len(self.widgets)):
-            self.widgets[i][1].Hide()
+            self.showPanel(i, False)
 
         self.updateScrolledVisibility()
 
+    @profiler.measure()
     def OnNext(self, event):
         ''' Quando o usuário clica para ir para a próxima imagem. '''
 
-        if not self.canAcess[1]:
+        if not self.hasAccess(permissions.Access.RIGHT):
             return
 
         if self.tutorialObj.isTutorialInProgress:
@@ -584,10 +812,11 @@ class MainFrame(wx.Panel):
         self.frameImage(self.images[self.index])
         self.showButtons(True)
 
+    @profiler.measure()
     def OnPrevious(self, event):
         ''' Quando o usuário clica para voltar para a imagem anterior. '''
 
-        if not self.canAcess[0]:
+        if not self.hasAccess(permissions.Access.LEFT):
             return
 
         if self.tutorialObj.isTutorialInProgress:
@@ -605,12 +834,14 @@ class MainFrame(wx.Panel):
         self.frameImage(self.images[self.index])
         self.showButtons(True)
 
+    @profiler.measure()
     def OnResizing(self, event):
         ''' Chamada quando a janela muda de tamanho. '''
 
         self.frameImage(self.images[self.index], True)
         event.Skip()
 
+    @profiler.measure()
     def OnSettings(self, event):
         ''' Abre a janela de configurações. '''
 
@@ -618,17 +849,73 @@ class MainFrame(wx.Panel):
             self.settingsWindow = settings.Settings(self, True)
             self.settingsWindow.Show()
 
+    @profiler.measure()
     def OnReport(self, event):
         ''' Mostra a janela de relatorio. '''
 
         if not self.report.IsShown():
             self.report.Show()
 
+    @profiler.measure()
     def OnClearReport(self, event):
         ''' Limpa a janela do relatório. '''
 
         self.report.ClearScrolled()
 
+    @profiler.measure()
+    def OnAcquisition(self, event):
+        ''' Liga ou desliga a aquisição de dados pelo menu. '''
+
+        self.setAcquisition(event.IsChecked())
+        if event.IsChecked():
+            pub.sendMessage('OnStatusBar', msg=f'Aquisição de dados iniciada ({self.logger.rate} amostras/s).')
+        else:
+            pub.sendMessage('OnStatusBar', msg=f'Aquisição de dados parada: {self.logger.count} amostras.')
+
+    @profiler.measure()
+    def OnExportAcquisition(self, event):
+        ''' Exporta as amostras da aquisição de dados como .csv ou .npy. '''
+
+        if self.logger.count == 0:
+            wx.MessageBox('Nenhuma amostra foi gravada. Inicie a aquisição de dados pelo menu Relatório.', 'Aquisição vazia', wx.OK | wx.ICON_INFORMATION)
+            return
+
+        wildcard = 'Tabela (*.csv)|*.csv|Binário NumPy (*.npy)|*.npy'
+        dialog = wx.FileDialog(self, 'Escolha um nome para o arquivo', '', '', wildcard, wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if dialog.ShowModal() == wx.ID_OK:
+            if dialog.GetFilterIndex() == 0:
+                func = self.logger.writeCSV
+                suffix = '.csv'
+            else:
+                func = self.logger.writeNPY
+                suffix = '.npy'
+
+            filename = dialog.GetFilename()
+            if not filename.lower().endswith(suffix):
+                filename += suffix
+
+            func(os.path.join(dialog.GetDirectory(), filename))
+            wx.MessageBox(f'Arquivo {filename} salvo com sucesso.', 'Sucesso', wx.OK | wx.ICON_INFORMATION)
+
+        dialog.Destroy()
+
+    @profiler.measure()
+    def OnStripChart(self, event):
+        ''' Abre a janela do gráfico da aquisição de dados. '''
+
+        if not self.stripChart:
+            self.stripChart = stripchart.StripChart(self)
+            self.stripChart.Show()
+        else:
+            self.stripChart.Raise()
+
+    @profiler.measure()
+    def OnClearAcquisition(self, event):
+        ''' Descarta as amostras da aquisição de dados. '''
+
+        self.logger.clear()
+
+    @profiler.measure()
     def OnEquip(self, event):
         ''' Chamada quando o usuário clica para ver um dos equipamentos, seja pela toolbar ou menu. '''
 
@@ -637,8 +924,7 @@ class MainFrame(wx.Panel):
         else:
             ID = event.GetId()
 
-            # [2] -> Bomba, Zoom
-            if not self.canAcess[(ID - 1000) + 2]:
+            if not self.hasAccess(permissions.ZOOM[ID - 1000]):
                 return
 
             try:
@@ -647,11 +933,13 @@ class MainFrame(wx.Panel):
                 name = event.GetEventObject().GetLabel(ID)
 
         self.isEquipZoom = True
-        self.tableBitmap = wx.Bitmap(f'{self.path}/tables/{name}.png', wx.BITMAP_TYPE_PNG)
+        self.tablePath = f'{self.path}/tables/{name}.png'
+        self.tableBitmap = assets.manager.getBitmap(self.tablePath, wx.BITMAP_TYPE_PNG)
         self.curZoomTablePos = self.getTableCoordinates(name)
         self.showButtons(False)
         self.frameImage(f'{self.path}/misc/{name}.jpg')
 
+    @profiler.measure()
     def OnPumpCurve(self, event):
         ''' Chamada quando o usuário clica em um botão para abrir a janela da curva teórica da bomba. '''
 
@@ -663,36 +951,22 @@ class MainFrame(wx.Panel):
         ''' Muda o estilo dos botões. '''
 
         if style == 'Borda transparente':
-            style = pb.PB_STYLE_NOBG
+            style = canvas.STYLE_NOBG
         elif style == 'Cor gradiente':
-            style = pb.PB_STYLE_GRADIENT
+            style = canvas.STYLE_GRADIENT
         elif style == 'Bordas redondas':
-            style = pb.PB_STYLE_DEFAULT
+            style = canvas.STYLE_DEFAULT
         elif style == 'Bordas quadradas':
-            style = pb.PB_STYLE_SQUARE
+            style = canvas.STYLE_SQUARE
         else:
             return
 
-        # (btnRef, sizerRef, btnCoordinates)
-        for button in self.widgets:
-            button[0]._style = style
-
-        for button in self.miscButtonsRef:
-            button[0]._style = style
-
-        self.bmpImage.Refresh(False)
+        self.scene.setButtonStyle(style)
 
     def updateButtonHoverColor(self, new_color):
         ''' Atualiza a cor de fundo (hover) dos botões. '''
 
-        color = Colour(new_color)
-        for button in self.widgets:
-            button[0].SetPressColor(Colour(color))
-
-        for button in self.miscButtonsRef:
-            button[0].SetPressColor(Colour(color))
-
-        self.bmpImage.Refresh(False)
+        self.scene.setHoverColour(Colour(new_color))
 
     def updateButtonBackgroundColor(self, color):
         ''' Atualiza a cor de fundo dos botões. '''
@@ -704,66 +978,72 @@ class MainFrame(wx.Panel):
 
         for i in range (0, len(self.buttons)):
             dic = self.buttons[i]
-            self.widgets[i][0].SetBitmap(wx.Bitmap(f"images/buttons/{index}_{dic['buttonName']}.png"))
+            self.widgets[i][0].SetBitmap(assets.manager.getBitmap(f"images/buttons/{index}_{dic['buttonName']}.png"))
 
         for btn in self.miscButtonsRef:
             name = btn[0].GetName()
-            btn[0].SetBitmap(wx.Bitmap(f"images/buttons/{index}_{name}.png"))
-
-        self.bmpImage.Refresh(False)
+            btn[0].SetBitmap(assets.manager.getBitmap(f"images/buttons/{index}_{name}.png"))
 
     def updateButtonTooltips(self):
         ''' Atualiza o conteúdo das tooltips do botões de acordo com self.isTooltip.
         0 para valor da medição, 1 para descrição. '''
 
         if self.isTooltip:
-            dic = self.data[self.dataIndex]
             for i in range(0, len(self.widgets)):
                 key = self.widgets[i][0].GetName()
-                value = dic[key]
+                value = self.getDisplayValue(key)
                 unit = self.buttons[i]['unit']
 
                 if key == 'rpm':
                     unit = 'RPM (%)'
 
-                self.widgets[i][0].SetToolTip(f"{value} {unit}")
+                self.view.setTooltip(i, self.widgets[i][0], f"{value} {unit}")
 
         else:
             for i in range(0, len(self.widgets)):
-                self.widgets[i][0].SetToolTip('')
+                self.view.setTooltip(i, self.widgets[i][0], '')
 
     def getRPMValue(self):
         ''' Retorna o valor em `int` do Motor Elétrico. '''
 
-        return int(self.ctrls[2].GetValue().split()[0])
+        return self.getRPM(self.ctrls[2].GetValue())
 
-    def updateSoundPlay(self):
-        ''' Atualiza o estado do som da motor elétrico, se pode tocar ou não. '''
+    def updateSoundPlay(self, eventTime=None):
+        ''' Atualiza o estado do som da motor elétrico, se pode tocar ou não.
+        `eventTime` é o time.perf_counter() do evento que causou a mudança, usado para medir a latência. '''
 
         rpm = self.getRPMValue()
         registro = int(self.ctrls[0].GetValue())    # ctrls[0] -> 'Registro Esfera'
         isWaterFlowing = rpm > 0 and registro > 0
 
-        if isWaterFlowing:
-            self.replaceImage(0, f'{self.path}/misc/0_water.jpg')
-        else:
-            self.replaceImage(0, f'{self.path}/0.JPG')
+        if isWaterFlowing != self.isWaterFlowing:
+            self.isWaterFlowing = isWaterFlowing
+            self.updateFlow()
 
         if self.isSoundActive:
             if rpm > 0:
-                self.sound.SoundPlayback('rpm', True)
+                self.sound.SoundPlayback('rpm', True, eventTime, rpm)
             else:
-                self.sound.SoundPlayback('rpm', False)
+                self.sound.SoundPlayback('rpm', False, eventTime)
 
             if isWaterFlowing:
-                self.sound.SoundPlayback('abertura', True)
+                self.sound.SoundPlayback('abertura', True, eventTime)
             else:
-                self.sound.SoundPlayback('abertura', False)
+                self.sound.SoundPlayback('abertura', False, eventTime)
 
         else:
             self.sound.SoundPlayback('rpm', False)
             self.sound.SoundPlayback('abertura', False)
 
+    def togglePerfOverlay(self):
+        ''' Mostra ou esconde o painel de desempenho. '''
+
+        if self.perfOverlay:
+            self.perfOverlay.close()
+            self.perfOverlay = None
+        else:
+            self.perfOverlay = helper.PerfOverlay(self, self.parent.statusBar)
+
     def updateSoundVolume(self, newVolume):
         ''' Atualiza o volume do som. '''
 
@@ -774,6 +1054,11 @@ class MainFrame(wx.Panel):
 
         self.isInitMax = new_value
 
+    def updateWatchdogThreshold(self, new_value):
+        ''' Atualiza o limite (ms) sem resposta a partir do qual o watchdog registra a pilha. '''
+
+        self.parent.setWatchdogThreshold(new_value)
+
     def updateIsSoundActiveVariable(self, new_value):
         ''' Atualiza o valor de self.isSoundActive. '''
 
@@ -787,7 +1072,19 @@ class Init(wx.Frame):
         self.SetTitle('Laboratório Virtual de Bombas Hidráulicas')
         self.SetMinSize((1200, 700))
 
-        self.frame = MainFrame(self, 'data/system1')
+        assets.manager.setDisk(assets.DiskCache(assets.getCacheDir()))
+        self.registry = systems.SystemRegistry('data')
+        self.systemMenuIds = {}     # ID do item de menu -> systems.LabSystem
+        system = self.registry.getDefault()
+        if system is None:
+            wx.MessageBox('Nenhuma bancada foi encontrada. Cada bancada deve ser uma pasta em data/ com os arquivos data.json e buttons.json.',
+            'Erro', wx.OK | wx.ICON_ERROR)
+            sys.exit(1)
+
+        self.watchdog = watchdog.Watchdog(os.path.join(os.path.expanduser('~'), 'labvirtual_watchdog.log'))
+        self.heartbeat = wx.Timer(self)
+
+        self.frame = MainFrame(self, system)
 
         self.statusBar = self.CreateStatusBar()
         self.menu = wx.MenuBar()
@@ -799,6 +1096,8 @@ class Init(wx.Frame):
 
         self.timer = wx.Timer(self)
         self.Bind(wx.EVT_TIMER, self.OnTimer)
+        self.Bind(wx.EVT_TIMER, self.OnHeartbeat, self.heartbeat)
+        self.setWatchdogThreshold(self.watchdog.threshold)
 
         self.frame.Show()
         self.Centre()
@@ -806,19 +1105,19 @@ class Init(wx.Frame):
     def initToolbar(self):
         ''' Inicializa a toolbar. '''
 
-        left_arrow = self.toolbar.AddTool(wx.ID_ANY, 'Left', wx.Bitmap('images/icons/left.png'), 'Anterior')
-        right_arrow = self.toolbar.AddTool(wx.ID_ANY, 'Right', wx.Bitmap('images/icons/right.png'), 'Próxima')
-        settings = self.toolbar.AddTool(wx.ID_ANY, 'Settings', wx.Bitmap('images/icons/settings.png'), 'Configurações')
+        left_arrow = self.toolbar.AddTool(wx.ID_ANY, 'Left', assets.manager.getBitmap('images/icons/left.png'), 'Anterior')
+        right_arrow = self.toolbar.AddTool(wx.ID_ANY, 'Right', assets.manager.getBitmap('images/icons/right.png'), 'Próxima')
+        settings = self.toolbar.AddTool(wx.ID_ANY, 'Settings', assets.manager.getBitmap('images/icons/settings.png'), 'Configurações')
         self.toolbar.AddSeparator()
 
-        bomba =  self.toolbar.AddTool(1000, 'Bomba', wx.Bitmap('images/icons/water_pump.png'), 'Bomba')
-        motor =  self.toolbar.AddTool(1001, 'Motor Elétrico', wx.Bitmap('images/icons/motor.png'), 'Motor Elétrico')
-        registro =  self.toolbar.AddTool(1002, 'Registro Esfera', wx.Bitmap('images/icons/registro_esfera.png'), 'Registro Esfera')
-        vazao =  self.toolbar.AddTool(1003, 'Medidor de Vazão', wx.Bitmap('images/icons/medidor_de_vazao.png'), 'Medidor de Vazão')
-        manovac =  self.toolbar.AddTool(1004, 'Manovacuômetro', wx.Bitmap('images/icons/manovacuometro.png'), 'Manovacuômetro')
-        mano =  self.toolbar.AddTool(1005, 'Manômetro', wx.Bitmap('images/icons/manometro.png'), 'Manômetro')
-        piezometro =  self.toolbar.AddTool(1006, 'Piezômetro', wx.Bitmap('images/icons/piezometro.png'), 'Piezômetro')
-        graph =  self.toolbar.AddTool(1007, 'Curva Teórica da Bomba', wx.Bitmap('images/icons/graph.png'), 'Curva Teórica da Bomba')
+        bomba =  self.toolbar.AddTool(1000, 'Bomba', assets.manager.getBitmap('images/icons/water_pump.png'), 'Bomba')
+        motor =  self.toolbar.AddTool(1001, 'Motor Elétrico', assets.manager.getBitmap('images/icons/motor.png'), 'Motor Elétrico')
+        registro =  self.toolbar.AddTool(1002, 'Registro Esfera', assets.manager.getBitmap('images/icons/registro_esfera.png'), 'Registro Esfera')
+        vazao =  self.toolbar.AddTool(1003, 'Medidor de Vazão', assets.manager.getBitmap('images/icons/medidor_de_vazao.png'), 'Medidor de Vazão')
+        manovac =  self.toolbar.AddTool(1004, 'Manovacuômetro', assets.manager.getBitmap('images/icons/manovacuometro.png'), 'Manovacuômetro')
+        mano =  self.toolbar.AddTool(1005, 'Manômetro', assets.manager.getBitmap('images/icons/manometro.png'), 'Manômetro')
+        piezometro =  self.toolbar.AddTool(1006, 'Piezômetro', assets.manager.getBitmap('images/icons/piezometro.png'), 'Piezômetro')
+        graph =  self.toolbar.AddTool(1007, 'Curva Teórica da Bomba', assets.manager.getBitmap('images/icons/graph.png'), 'Curva Teórica da Bomba')
 
         self.Bind(wx.EVT_TOOL, self.frame.OnNext, right_arrow)
         self.Bind(wx.EVT_TOOL, self.frame.OnPrevious, left_arrow)
@@ -850,6 +1149,11 @@ class Init(wx.Frame):
         reportMenu = wx.Menu()
         openReport = reportMenu.Append(-1, 'Abrir relatório', 'Abrir a janela de relatório')
         clearReport = reportMenu.Append(-1, 'Limpar relatório', 'Limpar a janela de relatório')
+        reportMenu.AppendSeparator()
+        acquisition = reportMenu.AppendCheckItem(-1, 'Aquisição de dados', 'Gravar continuamente as leituras de todos os instrumentos')
+        chart = reportMenu.Append(-1, 'Gráfico da aquisição', 'Ver as leituras gravadas ao longo do tempo')
+        exportAcquisition = reportMenu.Append(-1, 'Exportar aquisição', 'Exportar as leituras gravadas como .csv ou .npy')
+        clearAcquisition = reportMenu.Append(-1, 'Limpar aquisição', 'Descartar as leituras gravadas')
 
         # Menu 'Equipamentos'
         equipMenu = wx.Menu()
@@ -873,6 +1177,10 @@ class Init(wx.Frame):
         self.Bind(wx.EVT_MENU, self.frame.OnNext, right)
         self.Bind(wx.EVT_MENU, self.frame.OnReport, openReport)
         self.Bind(wx.EVT_MENU, self.frame.OnClearReport, clearReport)
+        self.Bind(wx.EVT_MENU, self.frame.OnAcquisition, acquisition)
+        self.Bind(wx.EVT_MENU, self.frame.OnStripChart, chart)
+        self.Bind(wx.EVT_MENU, self.frame.OnExportAcquisition, exportAcquisition)
+        self.Bind(wx.EVT_MENU, self.frame.OnClearAcquisition, clearAcquisition)
         self.Bind(wx.EVT_MENU, self.frame.OnSettings, settings)
         self.Bind(wx.EVT_MENU, self.OnCloseApp, leave)
 
@@ -892,10 +1200,22 @@ class Init(wx.Frame):
         self.menu.Append(fileMenu, '&Arquivo')
         self.menu.Append(reportMenu, '&Relatório')
         self.menu.Append(equipMenu, '&Equipamentos')
+
+        # Menu 'Bancadas', apenas quando houver mais de uma instalada.
+        if len(self.registry) > 1:
+            systemMenu = wx.Menu()
+            for system in self.registry:
+                item = systemMenu.AppendRadioItem(-1, system.name, f'Abrir a bancada {system.name}')
+                self.systemMenuIds[item.GetId()] = system
+                self.Bind(wx.EVT_MENU, self.OnSystem, item)
+
+            self.menu.Append(systemMenu, '&Bancadas')
+
         self.menu.Append(ajudaMenu, 'Ajuda')
 
         self.SetMenuBar(self.menu)
 
+    @profiler.measure()
     def OnKey(self, event):
         ''' Captura teclas. '''
 
@@ -905,6 +1225,38 @@ class Init(wx.Frame):
         elif event.GetKeyCode() == wx.WXK_RIGHT:
             self.frame.OnNext(None)
 
+        # Ctrl + Shift + P, painel de desempenho. Não aparece em nenhum menu.
+        elif event.ControlDown() and event.ShiftDown() and event.GetKeyCode() == ord('P'):
+            self.frame.togglePerfOverlay()
+
+        # Ctrl + Shift + T, grava um trace dos handlers. Também não aparece em nenhum menu.
+        elif event.ControlDown() and event.ShiftDown() and event.GetKeyCode() == ord('T'):
+            self.toggleTrace()
+
+    def toggleTrace(self):
+        ''' Começa a gravar o trace dos handlers, ou para e o salva na pasta do usuário. '''
+
+        if not profiler.tracer.enabled:
+            profiler.tracer.begin()
+            pub.sendMessage('OnStatusBar', msg='Gravando trace. Pressione Ctrl+Shift+T novamente para salvar.')
+            return
+
+        profiler.tracer.stop()
+        path = os.path.join(os.path.expanduser('~'), datetime.now().strftime('labvirtual_trace_%Y%m%d_%H%M%S.json'))
+        try:
+            profiler.tracer.save(path)
+        except OSError as e:
+            pub.sendMessage('OnStatusBar', msg=f'Não foi possível salvar o trace: {e}', isError=True)
+        else:
+            pub.sendMessage('OnStatusBar', msg=f'Trace salvo em {path}', showTime=6000, isSucess=True)
+
+    @profiler.measure()
+    def OnSystem(self, event):
+        ''' Chamada quando o usuário escolhe uma bancada no menu. '''
+
+        self.frame.switchSystem(self.systemMenuIds[event.GetId()])
+
+    @profiler.measure()
     def printOnStatusBar(self, msg, showTime=3000, isError=False, isSucess=False):
         ''' Escreve `msg` na status bar. '''
 
@@ -918,6 +1270,7 @@ class Init(wx.Frame):
             self.statusBar.SetBackgroundColour('#95e6a7')
             self.statusBar.Refresh()
 
+    @profiler.measure()
     def OnTimer(self, event):
         ''' Chamada a cada x segundos, segundo o timer. '''
 
@@ -925,12 +1278,40 @@ class Init(wx.Frame):
         self.statusBar.SetBackgroundColour(wx.NullColour)
         self.statusBar.Refresh()
 
+    def OnHeartbeat(self, event):
+        ''' Avisa o watchdog que o loop principal continua respondendo. Não é medida pelo profiler: dispara a cada
+        poucos ms e sobrescreveria o último evento registrado pelo watchdog. '''
+
+        self.watchdog.beat()
+
+    def setWatchdogThreshold(self, threshold):
+        ''' Muda o limite (ms) do watchdog. 0 desliga: param a thread do watchdog e o heartbeat. '''
+
+        self.watchdog.setThreshold(threshold)
+        if not threshold:
+            self.heartbeat.Stop()
+            self.watchdog.stop()
+            return
+
+        self.heartbeat.Start(self.watchdog.getBeatInterval())
+        self.watchdog.start()
+
+    @profiler.measure()
     def OnCloseApp(self, event):
         ''' Fecha o app. '''
 
+        self.heartbeat.Stop()
+        self.frame.flowTimer.Stop()
+        self.frame.persistTimer.Stop()
+        self.frame.simulationTimer.Stop()
+        self.frame.loggerTimer.Stop()
+        self.frame.noise.close()
+        self.watchdog.stop()
+        self.frame.sound.close()
         self.Destroy()
 
-app = wx.App()
-frame = Init(None)
-frame.Show()
-app.MainLoop()
\ No newline at end of file
+if __name__ == '__main__':
+    app = wx.App()
+    frame = Init(None)
+    frame.Show()
+    app.MainLoop()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Arquivo responsável pelo ruído das medições: flutuação aleatória (gaussiana) e pulsação de cada instrumento.
+noise.py
+"""
+
+import math
+import threading
+import numpy as np
+
+BLOCK = 2048            # Amostras por bloco. A 30 amostras por segundo, um bloco dura pouco mais de um minuto.
+RATE = 30               # Amostras por segundo, uma por tick da simulação.
+
+class NoiseModel():
+    ''' Gera o ruído de cada grandeza `keys` em blocos pré-calculados, então cada amostra é só a leitura de uma
+    linha do bloco. Enquanto um bloco é lido, o próximo é gerado em uma thread. `config` vem de noise.json:
+    {jsonKey: {'gaussian': desvio padrão, 'pulsation': amplitude, 'frequency': Hz}}. As grandezas que não
+    estão em `config` não têm ruído. '''
+
+    def __init__(self, keys, config, seed=None):
+        self.keys = list(keys)
+        params = [config.get(key, {}) for key in self.keys]
+        self.gaussian = np.array([p.get('gaussian', 0) for p in params], np.float64)
+        self.pulsation = np.array([p.get('pulsation', 0) for p in params], np.float64)
+        self.frequency = np.array([p.get('frequency', 0) for p in params], np.float64)
+        self.isActive = bool(self.gaussian.any() or self.pulsation.any())
+
+        self.rng = np.random.default_rng(seed)
+        self.phase = self.rng.uniform(0, 2 * math.pi, len(self.keys))
+        self.generated = 0      # Amostras já geradas, para a pulsação continuar de um bloco para o outro.
+
+        self.block = self.generate()
+        self.row = 0
+        self.next = None
+        self.sample = np.zeros(len(self.keys))
+
+        self.isClosed = False
+        self.wanted = threading.Event()     # Pede um novo bloco à thread.
+        self.ready = threading.Event()      # O próximo bloco está pronto.
+        self.thread = threading.Thread(target=self.work, name='NoiseModel', daemon=True)
+        if self.isActive:
+            self.thread.start()
+            self.wanted.set()
+
+    def generate(self):
+        ''' Retorna um bloco (BLOCK, len(keys)): ruído gaussiano somado à pulsação senoidal. '''
+
+        t = (self.generated + np.arange(BLOCK)) / RATE
+        self.generated += BLOCK
+
+        block = self.rng.standard_normal((BLOCK, len(self.keys)))
+        block *= self.gaussian
+        block += self.pulsation * np.sin(2 * math.pi * self.frequency * t[:, None] + self.phase)
+        return block
+
+    def work(self):
+        ''' Thread que gera o próximo bloco sempre que pedido. '''
+
+        while True:
+            self.wanted.wait()
+            self.wanted.clear()
+            if self.isClosed:
+                return
+
+            self.next = self.generate()
+            self.ready.set()
+
+    def advance(self, scale=1):
+        ''' Lê a próxima amostra, multiplicada por `scale`, para `self.sample` e a retorna.
+        Se o próximo bloco ainda não estiver pronto quando o atual acabar, o atual é lido de novo. '''
+
+        if self.row >= BLOCK:
+            self.row = 0
+            if self.ready.is_set():
+                self.ready.clear()
+                self.block = self.next
+                self.wanted.set()
+
+        np.multiply(self.block[self.row], scale, out=self.sample)
+        self.row += 1
+        return self.sample
+
+    def close(self):
+        ''' Encerra a thread. '''
+
+        self.isClosed = True
+        self.wanted.set()
@@ -0,0 +1,68 @@
+"""
+Arquivo responsável pelas permissões de acesso às principais funções, usadas pelo tutorial.
+permissions.py
+"""
+
+# Cada bit corresponde a um índice de `allowedClicks` em first_tutorial.json.
+# [0] -> Left Arrow
+# [1] -> Right Arrow
+# [2] -> Bomba, Zoom
+# [3] -> Motor Elétrico, Zoom
+# [4] -> Registro Esfera, Zoom
+# [5] -> Medidor de Vazão, Zoom
+# [6] -> Manovacuômetro, Zoom
+# [7] -> Manometro, Zoom
+# [8] -> Piezômetro, Zoom
+# [9] -> Registro Esfera, botao
+# [10] -> Medidor de Vazão, botão
+# [11] -> Motor Elétrico, botão
+# [12] -> Manovacuômetro, botão
+# [13] -> Manômetro, botão
+# [14] -> Piezometro, botão
+# [15] -> Acionar Motor, botão
+# [16] -> Desligar Motor, botão
+
+from enum import IntFlag
+
+class Access(IntFlag):
+    NONE = 0
+
+    LEFT = 1 << 0
+    RIGHT = 1 << 1
+
+    ZOOM_BOMBA = 1 << 2
+    ZOOM_MOTOR = 1 << 3
+    ZOOM_REGISTRO = 1 << 4
+    ZOOM_VAZAO = 1 << 5
+    ZOOM_MANOVACUOMETRO = 1 << 6
+    ZOOM_MANOMETRO = 1 << 7
+    ZOOM_PIEZOMETRO = 1 << 8
+
+    BUTTON_REGISTRO = 1 << 9
+    BUTTON_VAZAO = 1 << 10
+    BUTTON_MOTOR = 1 << 11
+    BUTTON_MANOVACUOMETRO = 1 << 12
+    BUTTON_MANOMETRO = 1 << 13
+    BUTTON_PIEZOMETRO = 1 << 14
+
+    MOTOR_ON = 1 << 15
+    MOTOR_OFF = 1 << 16
+
+    ALL = (1 << 17) - 1
+
+# Na ordem dos IDs da toolbar e do menu 'Equipamentos' (1000 + i).
+ZOOM = (Access.ZOOM_BOMBA, Access.ZOOM_MOTOR, Access.ZOOM_REGISTRO, Access.ZOOM_VAZAO,
+        Access.ZOOM_MANOVACUOMETRO, Access.ZOOM_MANOMETRO, Access.ZOOM_PIEZOMETRO)
+
+# Na ordem de `index` em buttons.json.
+BUTTON = (Access.BUTTON_REGISTRO, Access.BUTTON_VAZAO, Access.BUTTON_MOTOR,
+          Access.BUTTON_MANOVACUOMETRO, Access.BUTTON_MANOMETRO, Access.BUTTON_PIEZOMETRO)
+
+def fromIndices(indices):
+    ''' Converte uma lista de índices, como `allowedClicks`, em uma máscara. '''
+
+    mask = Access.NONE
+    for i in indices:
+        mask |= 1 << i
+
+    return Access(mask)
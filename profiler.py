@@ -0,0 +1,139 @@
+"""
+Arquivo responsável pelas medições de desempenho do programa (tempo gasto nos handlers e taxa de redesenho).
+profiler.py
+"""
+
+import os
+import time
+import json
+import threading
+import functools
+from collections import deque
+
+WINDOW = 240    # Quantidade de medições guardadas por nome.
+MAX_TRACE_EVENTS = 1000000
+
+class Profiler():
+    ''' Guarda as últimas durações (ms) de cada função medida e os instantes de redesenho da imagem.
+    Nada é gravado enquanto `enabled` for False. '''
+
+    def __init__(self, window=WINDOW):
+        self.enabled = False
+        self.window = window
+        self.samples = {}                       # nome -> deque com as durações em ms
+        self.frameTimes = deque(maxlen=window)  # time.perf_counter() de cada redesenho
+
+    def record(self, name, ms):
+        ''' Grava uma duração de `ms` para `name`. '''
+
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+
+        self.samples[name].append(ms)
+
+    def markFrame(self):
+        ''' Marca que a imagem foi redesenhada agora. '''
+
+        if self.enabled:
+            self.frameTimes.append(time.perf_counter())
+
+    def getPercentiles(self, name, percentiles=(50, 90, 99)):
+        ''' Retorna {percentil: ms} das últimas medições de `name`, ou None se ainda não houver medições. '''
+
+        values = self.samples.get(name)
+        if not values:
+            return None
+
+        values = sorted(values)
+        last = len(values) - 1
+        return {p: values[min(last, int(round(p / 100 * last)))] for p in percentiles}
+
+    def getCount(self, name):
+        ''' Retorna quantas medições de `name` estão guardadas. '''
+
+        return len(self.samples.get(name, ()))
+
+    def getFPS(self):
+        ''' Retorna quantos redesenhos aconteceram no último segundo. '''
+
+        now = time.perf_counter()
+        return sum(1 for t in self.frameTimes if now - t <= 1.0)
+
+    def reset(self):
+        ''' Apaga todas as medições. '''
+
+        self.samples.clear()
+        self.frameTimes.clear()
+
+class Tracer():
+    ''' Grava o início e a duração de cada função medida e exporta no formato Chrome Trace Event (JSON),
+    que pode ser aberto no chrome://tracing, no Perfetto ou no speedscope. '''
+
+    def __init__(self, maxEvents=MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.maxEvents = maxEvents
+        self.events = []    # (nome, início em µs, duração em µs, id da thread)
+        self.origin = 0.0
+
+    def begin(self):
+        ''' Apaga o que foi gravado e começa a gravar. '''
+
+        self.events = []
+        self.origin = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        ''' Para de gravar. '''
+
+        self.enabled = False
+
+    def add(self, name, start, end):
+        ''' Grava um trecho `name` que foi de `start` a `end` (time.perf_counter()). '''
+
+        if len(self.events) < self.maxEvents:
+            self.events.append((name, (start - self.origin) * 1e6, (end - start) * 1e6, threading.get_ident()))
+
+    def save(self, path):
+        ''' Escreve os trechos gravados em `path`. '''
+
+        pid = os.getpid()
+        traceEvents = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'Laboratório Virtual'}}]
+        for name, ts, dur, tid in self.events:
+            traceEvents.append({'name': name, 'cat': 'handler', 'ph': 'X', 'ts': ts, 'dur': dur, 'pid': pid, 'tid': tid})
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}, f)
+
+stats = Profiler()
+tracer = Tracer()
+lastEvent = None    # Nome da última função medida que começou a executar.
+
+def measure(name=None):
+    ''' Decorador que mede o tempo de execução da função em `stats`, com o nome `name` ou o nome da função,
+    e grava um trecho em `tracer`. Quando os dois estão desligados, custa apenas um teste e guardar o nome em `lastEvent`. '''
+
+    def decorator(func):
+        label = name or func.__name__
+        spanName = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            global lastEvent
+            lastEvent = spanName
+
+            if not (stats.enabled or tracer.enabled):
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                if stats.enabled:
+                    stats.record(label, (end - start) * 1000)
+                if tracer.enabled:
+                    tracer.add(spanName, start, end)
+
+        return wrapper
+
+    return decorator
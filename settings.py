@@ -5,9 +5,97 @@ settings.py
 """
 
 import os
+import tempfile
+import threading
+import atexit
 import wx, wx.adv
 from wx.core import Colour
 from pubsub import pub
+import assets
+import sound
+import watchdog
+import datalogger
+
+CONFIG_PATH = os.path.join(os.path.expanduser('~'), 'labvirtual_config.ini')
+
+class ConfigWriter():
+    ''' Grava o arquivo de configurações fora da thread da UI. Escritas em sequência são agrupadas (debounce)
+    e apenas o último conteúdo é gravado, via arquivo temporário + rename, para que o arquivo nunca fique pela metade. '''
+
+    def __init__(self, path, delay=0.5):
+        self.path = path
+        self.delay = delay          # Segundos de espera antes de gravar.
+        self.latest = None          # Último conteúdo pedido, gravado ou não.
+        self.pending = None         # Conteúdo ainda não gravado.
+        self.timer = None
+        self.lock = threading.Lock()
+        self.writeLock = threading.Lock()
+
+        atexit.register(self.flush)
+
+    def write(self, text):
+        ''' Agenda a gravação de `text`. Retorna imediatamente. '''
+
+        with self.lock:
+            self.latest = text
+            self.pending = text
+            if self.timer:
+                self.timer.cancel()
+
+            self.timer = threading.Timer(self.delay, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def read(self):
+        ''' Retorna as linhas do arquivo, levando em conta uma gravação que ainda não aconteceu. '''
+
+        with self.lock:
+            if self.latest is not None:
+                return self.latest.splitlines(keepends=True)
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return f.readlines()
+
+    def flush(self):
+        ''' Grava imediatamente o conteúdo pendente, se houver. '''
+
+        # writeLock garante que duas gravações nunca se cruzem e que a mais recente sempre vença.
+        with self.writeLock:
+            with self.lock:
+                text = self.pending
+                self.pending = None
+                if self.timer:
+                    self.timer.cancel()
+                    self.timer = None
+
+            if text is None:
+                return
+
+            try:
+                self.atomicWrite(text)
+            except OSError as e:
+                if wx.GetApp():
+                    wx.CallAfter(pub.sendMessage, 'OnStatusBar', msg=f'Não foi possível salvar as configurações: {e}', isError=True)
+
+    def atomicWrite(self, text):
+        ''' Escreve `text` em um arquivo temporário na mesma pasta e o renomeia por cima de `self.path`. '''
+
+        folder = os.path.dirname(self.path)
+        fd, tmpPath = tempfile.mkstemp(prefix='.labvirtual_config.', suffix='.tmp', dir=folder)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmpPath, self.path)
+        except OSError:
+            try:
+                os.remove(tmpPath)
+            except OSError:
+                pass
+            raise
+
+configWriter = ConfigWriter(CONFIG_PATH)
 
 class Settings(wx.Frame):
     def __init__(self, parent, onlyLoadToUI=False):
@@ -69,7 +157,7 @@ class Settings(wx.Frame):
         self.getUserConfig()
         self.SaveFile()
         self.CloseFrame()
-        self.parent.bmpImage.Refresh()
+        self.parent.scene.Refresh()
 
     def OnCancelButton(self, event):
         ''' Chamada quando o usuário clica no botão de Cancelar. '''
@@ -120,6 +208,11 @@ class Settings(wx.Frame):
         self.fileLines.append("initMaximized = 0\n")
         self.fileLines.append("soundActive = 1\n")
         self.fileLines.append("volume = 25\n")
+        self.fileLines.append(f"assetBudget = {assets.DEFAULT_BUDGET // assets.MB}\n")
+        self.fileLines.append(f"audioBuffer = {sound.DEFAULT_BUFFER}\n")
+        self.fileLines.append(f"watchdogThreshold = {watchdog.DEFAULT_THRESHOLD}\n")
+        self.fileLines.append(f"acquisitionRate = {datalogger.DEFAULT_RATE}\n")
+        self.fileLines.append(f"acquisitionWindow = {datalogger.DEFAULT_WINDOW}\n")
         self.fileLines.append("tutorial = 1")
 
     def getUserConfig(self):
@@ -135,6 +228,11 @@ class Settings(wx.Frame):
         self.fileLines.append(f"initMaximized = {int(self.exibicao.GetMaxCheck())}\n")
         self.fileLines.append(f"soundActive = {int(self.som.GetSomValue())}\n")
         self.fileLines.append(f"volume = {self.som.GetVolume()}\n")
+        self.fileLines.append(f"assetBudget = {assets.manager.budget // assets.MB}\n")
+        self.fileLines.append(f"audioBuffer = {self.parent.sound.bufferSize}\n")
+        self.fileLines.append(f"watchdogThreshold = {self.parent.parent.watchdog.threshold}\n")
+        self.fileLines.append(f"acquisitionRate = {self.parent.logger.rate}\n")
+        self.fileLines.append(f"acquisitionWindow = {self.parent.logger.window}\n")
         self.fileLines.append(f"tutorial = {int(self.parent.isTutorial)}")
 
     def applyUserConfig(self, onlyLoadToUI):
@@ -190,6 +288,41 @@ class Settings(wx.Frame):
                     self.som.SetVolume(value)
                     if not onlyLoadToUI: self.som.OnVolumeChange(value)
 
+            elif config == 'assetBudget':
+                # Orçamento de memória das imagens, em MB. Não aparece na janela, apenas no arquivo.
+                value = line.split('=')[1].strip()
+                value = self.strToInt(value)
+                if isinstance(value, int) and value > 0:
+                    if not onlyLoadToUI: assets.manager.setBudget(value * assets.MB)
+
+            elif config == 'audioBuffer':
+                # Tamanho do buffer do mixer, em amostras. Também só existe no arquivo.
+                value = line.split('=')[1].strip()
+                value = self.strToInt(value)
+                if isinstance(value, int) and 64 <= value <= 8192:
+                    if not onlyLoadToUI: self.parent.sound.setBufferSize(value)
+
+            elif config == 'watchdogThreshold':
+                # Tempo (ms) sem resposta da UI até o watchdog registrar a pilha. 0 desliga. Só existe no arquivo.
+                value = line.split('=')[1].strip()
+                value = self.strToInt(value)
+                if isinstance(value, int) and value >= 0:
+                    if not onlyLoadToUI: self.parent.updateWatchdogThreshold(value)
+
+            elif config == 'acquisitionRate':
+                # Amostras por segundo da aquisição de dados. Só existe no arquivo.
+                value = line.split('=')[1].strip()
+                value = self.strToInt(value)
+                if isinstance(value, int) and 1 <= value <= datalogger.MAX_RATE:
+                    if not onlyLoadToUI: self.parent.updateAcquisition(rate=value)
+
+            elif config == 'acquisitionWindow':
+                # Segundos de histórico guardados pela aquisição de dados. Só existe no arquivo.
+                value = line.split('=')[1].strip()
+                value = self.strToInt(value)
+                if isinstance(value, int) and value > 0:
+                    if not onlyLoadToUI: self.parent.updateAcquisition(window=value)
+
             elif config == 'tutorial':
                 value = line.split('=')[1].strip()
                 value = self.strToInt(value)
@@ -197,21 +330,28 @@ class Settings(wx.Frame):
                     self.parent.isTutorial = bool(value)
 
     def SaveFile(self):
-        ''' Escreve as configurações para o arquivo e o salva. '''
+        ''' Agenda a gravação das configurações. A escrita em disco acontece em outra thread. '''
 
-        with open(f"{os.path.expanduser('~')}/labvirtual_config.ini", 'w', encoding='utf-8') as f:
-            f.write(''.join(self.fileLines))
+        configWriter.write(''.join(self.fileLines))
 
     def OpenFile(self):
         ''' Carrega as informações do arquivo para self.fileLines.'''
 
         try:
-            with open(f"{os.path.expanduser('~')}/labvirtual_config.ini", 'r', encoding='utf-8') as f:
-                self.fileLines = f.readlines()
-        except:
-            self.getDefaultConfig()
-            self.SaveFile()
-            self.applyUserConfig(False)
+            self.fileLines = configWriter.read()
+            return
+        except FileNotFoundError:
+            pass
+        except (OSError, UnicodeDecodeError):
+            # Arquivo ilegível. Guardamos uma cópia em vez de simplesmente sobrescrevê-lo.
+            try:
+                os.replace(CONFIG_PATH, f'{CONFIG_PATH}.bak')
+            except OSError:
+                pass
+
+        self.getDefaultConfig()
+        self.SaveFile()
+        self.applyUserConfig(False)
 
 class AparenciaFrame(wx.Panel):
     def __init__(self, noteRef, mainFrameRef):
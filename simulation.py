@@ -0,0 +1,101 @@
+"""
+Arquivo responsável pela simulação dos transitórios: a partida e a parada do motor e as manobras da válvula.
+simulation.py
+"""
+
+import numpy as np
+
+DT = 1 / 120            # Passo fixo da integração (s).
+FPS = 30                # Frequência do timer que avança a simulação e atualiza os instrumentos.
+MAX_LAG = 0.25          # Atraso máximo (s) recuperado em um tick. Depois de uma pausa longa, o resto é descartado.
+
+# Constantes de tempo (s) de cada grandeza. O motor acelera mais devagar do que as pressões respondem, e o nível
+# do piezômetro é o mais lento.
+TAU = {
+    'rpm': 0.5,
+    'q(l/m)': 0.4,
+    'p1': 0.3,
+    'p2': 0.3,
+    'piezometro': 0.8
+}
+DEFAULT_TAU = 0.3
+
+def getDecimals(values):
+    ''' Retorna a maior quantidade de casas decimais entre os números `values`. '''
+
+    decimals = 0
+    for value in values:
+        text = repr(value)
+        if '.' in text:
+            decimals = max(decimals, len(text.split('.')[1]))
+
+    return decimals
+
+class Transient():
+    ''' Leva todas as grandezas `keys` de um ponto de operação ao outro com dinâmica de primeira ordem,
+    dx/dt = (alvo - x) / tau, integrada com passo fixo DT. Todas as grandezas avançam juntas, em um vetor NumPy,
+    e os passos de um tick são resolvidos de uma vez pela solução exata: x += (alvo - x) * (1 - (1 - ganho) ** n). '''
+
+    def __init__(self, keys, tolerances, tau=TAU):
+        self.keys = list(keys)
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        taus = np.array([tau.get(key, DEFAULT_TAU) for key in self.keys], np.float64)
+        self.decay = np.exp(-DT / taus)                         # Fração do erro que resta após um passo.
+        self.tolerances = np.asarray(tolerances, np.float64)    # Erro abaixo do qual a grandeza chegou ao alvo.
+
+        self.state = None
+        self.target = None
+        self.error = np.empty(len(self.keys))
+        self.factor = np.empty(len(self.keys))
+        self.time = 0
+        self.accumulator = 0
+
+    def setTarget(self, values, now, animate=True):
+        ''' Muda o ponto de operação para `values` (na ordem de `keys`). Sem `animate`, salta direto para ele. '''
+
+        target = np.asarray(values, np.float64)
+        if self.state is None or not animate:
+            self.state = target.copy()
+        elif not self.isSettled():
+            self.advance(now)       # Continua do ponto em que o transitório anterior estava.
+        else:
+            self.time = now
+            self.accumulator = 0
+
+        self.target = target
+
+    def isSettled(self):
+        return self.target is None or bool(np.array_equal(self.state, self.target))
+
+    def advance(self, now):
+        ''' Avança a simulação até `now` (segundos), em passos de DT. Retorna True se o estado mudou. '''
+
+        if self.isSettled():
+            return False
+
+        self.accumulator = min(self.accumulator + now - self.time, MAX_LAG)
+        self.time = now
+        steps = int(self.accumulator / DT)
+        if steps <= 0:
+            return False
+
+        self.accumulator -= steps * DT
+        np.subtract(self.target, self.state, out=self.error)
+        np.power(self.decay, steps, out=self.factor)
+        np.subtract(1, self.factor, out=self.factor)
+        np.multiply(self.error, self.factor, out=self.factor)
+        np.add(self.state, self.factor, out=self.state)
+
+        # Perto do alvo, o valor exibido já não muda: a grandeza chega ao alvo.
+        np.subtract(self.target, self.state, out=self.error)
+        np.abs(self.error, out=self.error)
+        arrived = self.error <= self.tolerances
+        self.state[arrived] = self.target[arrived]
+        return True
+
+    def getValue(self, key):
+        return float(self.state[self.index[key]])
+
+    def isKeySettled(self, key):
+        i = self.index[key]
+        return self.state[i] == self.target[i]
@@ -8,40 +8,245 @@ sound.py
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
+import time
+import queue
+import threading
+import numpy as np
 import pygame
 
+FREQUENCY = 44100
+DEFAULT_BUFFER = 512    # Amostras por bloco do mixer. Menor = menos atraso, maior = menos risco de falhas no áudio.
+FADE_MS = 40            # Duração das entradas e saídas suaves, no lugar de um stop() seco.
+COALESCE_S = 0.016      # Janela (um frame) em que comandos seguidos são agrupados antes de irem ao mixer.
+
+resampleCache = {}      # (path, rpm, rpm de referência) -> np.ndarray, para não reamostrar de novo se o mixer for reaberto.
+
+def resample(samples, ratio):
+    ''' Reamostra `samples` (amostras x canais) por interpolação linear, em uma única operação vetorizada.
+    `ratio` > 1 deixa o som mais agudo e mais rápido, < 1 mais grave e mais lento. O som é tratado como um loop. '''
+
+    count = samples.shape[0]
+    length = max(int(count / ratio), 1)
+
+    positions = np.arange(length) * ratio
+    left = positions.astype(np.int64)
+    right = (left + 1) % count                  # A última amostra interpola com a primeira, pois o som toca em loop.
+    frac = (positions - left).reshape((length,) + (1,) * (samples.ndim - 1))
+
+    out = samples[left] * (1.0 - frac) + samples[right] * frac
+    return np.round(out).astype(samples.dtype)
+
 class SoundManager():
-    def __init__(self, parent):
+    ''' Gerencia o som. Os métodos chamados pela UI apenas colocam um comando na fila e retornam na hora.
+    Uma thread própria executa os comandos, então uma trava do dispositivo de áudio não congela a janela. '''
+
+    def __init__(self, parent, bufferSize=DEFAULT_BUFFER):
         self.parent = parent
+        self.bufferSize = bufferSize    # Tamanho pedido. O mixer é reaberto pela thread de áudio.
+        self.mixerBuffer = bufferSize   # Tamanho com que o mixer está aberto.
+        self.volume = 1.0
+        self.isPlaying = {'rpm': False, 'abertura': False}
+        self.pumpRpms = []          # Rotações para as quais o som da bomba é preparado.
+        self.pumpTable = {}         # rpm -> pygame.mixer.Sound com tom e andamento ajustados.
+        self.pumpRpm = None         # Rotação do som da bomba que está tocando.
+        self.pumpIndex = 0          # Canal da bomba em uso. São dois, para trocar de rotação sem cortes.
+        self.lastLatency = None     # Tempo (ms) entre o evento da UI e o comando chegar ao mixer.
+
+        # pre_init() precisa vir antes de pygame.init(), senão o mixer abre com o buffer padrão, bem maior.
+        pygame.mixer.pre_init(FREQUENCY, -16, 2, bufferSize)
         pygame.init()
-        pygame.mixer.init()
+        self.initMixer()
+
+        self.commands = queue.Queue()
+        self.thread = threading.Thread(target=self.audioLoop, name='audio', daemon=True)
+        self.thread.start()
+
+    # ----- Chamados pela UI ----- #
+
+    def SoundPlayback(self, key, state, eventTime=None, rpm=None):
+        ''' Toca ou para o som. `eventTime` é o time.perf_counter() do evento que causou a mudança.
+        Para 'rpm', `rpm` escolhe o som da bomba já preparado para aquela rotação. '''
+
+        self.commands.put(('playback', key, (state, eventTime, rpm)))
+
+    def SoundVolume(self, volume):
+        ''' Muda o volume. '''
+
+        self.commands.put(('volume', None, volume))
+
+    def setBufferSize(self, bufferSize):
+        ''' Pede que o mixer seja reaberto com um novo tamanho de buffer, mantendo o que estava tocando. '''
+
+        self.bufferSize = bufferSize
+        self.commands.put(('buffer', None, bufferSize))
+
+    def buildPumpTable(self, rpms):
+        ''' Pede que o som da bomba seja preparado para cada rotação em `rpms`. '''
+
+        self.commands.put(('pumpTable', None, list(rpms)))
+
+    def close(self):
+        ''' Encerra a thread de áudio. '''
+
+        self.commands.put(None)
+
+    def getLatency(self):
+        ''' Retorna um dicionário com a latência, em ms, entre o último evento e o som: o tempo até o comando
+        chegar ao mixer, o atraso do buffer de saída e a soma dos dois. '''
+
+        output = self.mixerBuffer / FREQUENCY * 1000
+        command = self.lastLatency
+
+        return {
+            'command': command,
+            'output': output,
+            'total': None if command is None else command + output
+        }
+
+    # ----- Executados na thread de áudio ----- #
+
+    def audioLoop(self):
+        ''' Laço da thread de áudio. Junta os comandos que chegam dentro de `COALESCE_S` e executa só o necessário. '''
+
+        while True:
+            batch = [self.commands.get()]
+            deadline = time.perf_counter() + COALESCE_S
+            while batch[-1] is not None:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.commands.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if not self.runCommands(batch):
+                return
+
+    def runCommands(self, batch):
+        ''' Executa um lote de comandos. Para cada som e para o volume, apenas o último pedido importa;
+        tocar e parar no mesmo lote viram só "parar". Retorna False quando a thread deve encerrar. '''
+
+        playback = {}
+        volume = None
+        for command in batch:
+            if command is None:
+                break
+
+            kind, key, value = command
+            if kind == 'playback':
+                playback[key] = value
+            elif kind == 'volume':
+                volume = value
+            elif kind == 'buffer':
+                self.reopenMixer(value)
+            elif kind == 'pumpTable':
+                self.preparePumpTable(value)
+
+        if volume is not None:
+            self.applyVolume(volume)
+
+        for key, (state, eventTime, rpm) in playback.items():
+            self.applyPlayback(key, state, eventTime, rpm)
+
+        return batch[-1] is not None
+
+    def initMixer(self):
+        ''' Inicializa o mixer com `self.mixerBuffer` e carrega os sons, que ficam decodificados em memória. '''
+
+        pygame.mixer.init(FREQUENCY, -16, 2, self.mixerBuffer)
         pygame.mixer.set_num_channels(8)
 
-        self.pumpMixer = pygame.mixer.Channel(5)
+        self.pumpMixers = [pygame.mixer.Channel(5), pygame.mixer.Channel(4)]
+        self.pumpMixer = self.pumpMixers[self.pumpIndex]
         self.waterMixer = pygame.mixer.Channel(6)
 
         self.pumpSound = pygame.mixer.Sound('sounds/water_pump.wav')
         self.waterSound = pygame.mixer.Sound('sounds/water_flowing.wav')
 
-    def SoundPlayback(self, key, state):
-        ''' Toca ou para o som. '''
+        self.applyVolume(self.volume)
+        self.preparePumpTable(self.pumpRpms)
 
-        if key == 'rpm':
+    def preparePumpTable(self, rpms):
+        ''' Prepara o som da bomba para cada rotação em `rpms`. A maior rotação toca o arquivo original e as outras
+        são reamostradas proporcionalmente. Tudo é calculado aqui, uma vez, e não na troca de rotação. '''
+
+        self.pumpRpms = list(rpms)
+        self.pumpTable.clear()
+
+        reference = max(self.pumpRpms, default=0)
+        if reference <= 0:
+            return
+
+        path = 'sounds/water_pump.wav'
+        samples = None
+        for rpm in self.pumpRpms:
+            if rpm <= 0:
+                continue
+
+            key = (path, rpm, reference)
+            if key not in resampleCache:
+                if samples is None:
+                    samples = pygame.sndarray.array(self.pumpSound)
+                resampleCache[key] = np.ascontiguousarray(resample(samples, rpm / reference))
+
+            self.pumpTable[rpm] = pygame.sndarray.make_sound(resampleCache[key])
+
+    def getPumpSound(self, rpm):
+        ''' Retorna o som da bomba para `rpm`, ou o som original se a rotação não foi preparada. '''
+
+        return self.pumpTable.get(rpm, self.pumpSound)
+
+    def reopenMixer(self, bufferSize):
+        ''' Reabre o mixer com `bufferSize`, voltando a tocar o que estava tocando. '''
+
+        if bufferSize == self.mixerBuffer:
+            return
+
+        self.mixerBuffer = bufferSize
+        pygame.mixer.quit()
+        self.initMixer()
+
+        for key, state in self.isPlaying.items():
             if state:
-                if not self.pumpMixer.get_busy():
-                    self.pumpMixer.play(self.pumpSound, loops=-1)
-            else:
-                self.pumpMixer.stop()
+                self.isPlaying[key] = False
+                self.applyPlayback(key, True, None, self.pumpRpm)
 
+    def applyPlayback(self, key, state, eventTime, rpm):
+        ''' Toca ou para o som de `key` no mixer. '''
+
+        if key == 'rpm':
+            channel, sound = self.pumpMixer, self.getPumpSound(rpm)
         elif key == 'abertura':
-            if state:
-                if not self.waterMixer.get_busy():
-                    self.waterMixer.play(self.waterSound, loops=-1)
-            else:
-                self.waterMixer.stop()
+            channel, sound = self.waterMixer, self.waterSound
+        else:
+            return
 
-    def SoundVolume(self, volume):
-        ''' Muda o volume. '''
+        if key == 'rpm' and state and self.isPlaying[key] and rpm != self.pumpRpm:
+            # Troca de rotação: o som atual sai suavemente enquanto o novo entra no outro canal.
+            channel.fadeout(FADE_MS)
+            self.pumpIndex = 1 - self.pumpIndex
+            self.pumpMixer = self.pumpMixers[self.pumpIndex]
+            self.pumpMixer.play(sound, loops=-1, fade_ms=FADE_MS)
+
+        elif self.isPlaying[key] == state:
+            return
+
+        elif state:
+            channel.play(sound, loops=-1, fade_ms=FADE_MS)
+        else:
+            channel.fadeout(FADE_MS)
+
+        self.isPlaying[key] = state
+        if key == 'rpm':
+            self.pumpRpm = rpm if state else None
+        if eventTime is not None:
+            self.lastLatency = (time.perf_counter() - eventTime) * 1000
+
+    def applyVolume(self, volume):
+        ''' Aplica o volume nos canais. '''
 
-        self.pumpMixer.set_volume(volume / 5)   # Barulho do motor é muito alto.
+        self.volume = volume
+        for channel in self.pumpMixers:
+            channel.set_volume(volume / 5)      # Barulho do motor é muito alto.
         self.waterMixer.set_volume(volume)
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""
+Arquivo responsável pela janela do gráfico da aquisição de dados: as leituras de todos os instrumentos ao longo do tempo.
+stripchart.py
+"""
+
+import numpy as np
+import wx
+import datalogger
+
+REFRESH = 250           # Intervalo (ms) entre as verificações de novas amostras.
+MARGIN = (70, 10, 12, 26)   # Margens (esquerda, direita, topo, base) em volta das faixas, em pixels.
+GAP = 8                 # Espaço entre as faixas.
+GRID = 4                # Divisões horizontais de cada faixa.
+
+BACKGROUND_COLOUR = wx.Colour(255, 255, 255)
+LANE_COLOUR = wx.Colour(247, 248, 250)
+GRID_COLOUR = wx.Colour(222, 224, 230)
+TEXT_COLOUR = wx.Colour(60, 60, 64)
+LINE_COLOURS = ['#7f7f7f', '#1f77b4', '#2ca02c', '#9467bd', '#d62728', '#ff7f0e']    # Na ordem de datalogger.KEYS.
+
+def selectBuckets(x, y, edges, ax, ay):
+    ''' O laço do Largest-Triangle-Three-Buckets (LTTB), que reduz uma curva preservando a sua forma. De cada grupo
+    [edges[i], edges[i + 1]) dos pontos (x, y[:, k]) fica o que forma o maior triângulo com o ponto escolhido no grupo
+    anterior e a média do grupo seguinte. O primeiro grupo parte dos pontos (ax, ay), de tamanho m, e o terceiro
+    vértice do último grupo é a média dos pontos depois de edges[-1]. As m séries compartilham `x` e são decididas
+    juntas, então o laço em Python tem um passo por grupo. Retorna os índices (len(edges) - 1, m). '''
+
+    sizes = np.diff(edges, append=len(x))
+    meanX = np.add.reduceat(x, edges) / sizes       # O terceiro vértice de cada grupo: a média do grupo seguinte.
+    meanY = np.add.reduceat(y, edges, axis=0) / sizes[:, None]
+
+    columns = np.arange(y.shape[1])
+    selected = np.empty((len(edges) - 1, y.shape[1]), np.intp)
+    for i in range(len(edges) - 1):
+        start, end = edges[i], edges[i + 1]
+        # Dobro da área do triângulo (a, b, c) para cada candidato b do grupo.
+        area = (ax - meanX[i + 1]) * (y[start:end] - ay) - (ax - x[start:end, None]) * (meanY[i + 1] - ay)
+        index = start + np.abs(area).argmax(axis=0)
+        selected[i] = index
+        ax = x[index]
+        ay = y[index, columns]
+
+    return selected
+
+class Decimator():
+    ''' LTTB incremental sobre o buffer circular de um datalogger.DataLogger. Os grupos têm `bucket` amostras, uma
+    potência de 2, e são alinhados ao número da amostra desde o início da aquisição. Assim um grupo fechado não muda
+    quando chegam amostras novas e o ponto escolhido nele fica guardado: a cada chamada só são calculados os grupos
+    novos, os dois do fim (o aberto e o anterior, cuja média seguinte ainda muda) e o pedaço do começo que sobrou das
+    amostras sobrescritas. Tudo é recalculado apenas quando o histórico passa a precisar de grupos maiores. '''
+
+    def __init__(self):
+        self.reset(None, 0)
+
+    def reset(self, key, bucket):
+        self.key = key          # (início da aquisição, capacidade do buffer) para os quais os grupos guardados valem.
+        self.bucket = bucket    # Amostras por grupo.
+        self.first = 0          # Número do primeiro grupo guardado (o grupo j tem as amostras j * bucket em diante).
+        self.selected = None    # Números das amostras escolhidas nos grupos fechados, (grupos, m).
+
+    def select(self, buffer, edges, end, previous):
+        ''' Roda o LTTB nos grupos de `edges` com as amostras até `end` (números desde o início da aquisição) e
+        retorna os números das escolhidas. `previous` são as escolhidas no grupo anterior, uma por série. '''
+
+        capacity = len(buffer)
+        rows = buffer[np.arange(edges[0], end) % capacity]
+        before = buffer[previous % capacity]
+        columns = np.arange(len(previous))
+        return edges[0] + selectBuckets(rows[:, 0], rows[:, 1:], edges - edges[0], before[:, 0], before[columns, columns + 1])
+
+    def update(self, logger, threshold):
+        ''' Retorna os números (desde o início da aquisição) das amostras do `logger` que ficam de cada uma das m séries,
+        (pontos, m), com cerca de `threshold` pontos. '''
+
+        buffer = logger.buffer
+        m = buffer.shape[1] - 1
+        oldest, last = logger.total - logger.count, logger.total - 1
+        if logger.count <= threshold or threshold < 3:
+            return np.repeat(np.arange(oldest, logger.total)[:, None], m, axis=1)
+
+        need = -(-(logger.count - 2) // (threshold - 2))
+        bucket = 1 << (need - 1).bit_length()
+        key = (logger.start, len(buffer))
+        if key != self.key or bucket != self.bucket:
+            self.reset(key, bucket)
+
+        # Grupos entre o primeiro e o último ponto: o pedaço antes do primeiro limite alinhado, os alinhados e o aberto no fim.
+        low, high = oldest + 1, last
+        firstBucket = -(-low // bucket)
+        aligned = np.arange(firstBucket, -(-high // bucket)) * bucket
+        offset = int(not len(aligned) or aligned[0] != low)      # 1 se houver o pedaço do começo.
+        edges = np.concatenate(([low] if offset else [], aligned, [high])).astype(np.intp)
+
+        if self.selected is None:
+            self.selected = np.empty((0, m), np.intp)
+        self.selected = self.selected[max(firstBucket - self.first, 0):]   # Grupos com amostras sobrescritas.
+        self.first = firstBucket
+
+        previous = np.full(m, oldest)
+        parts = [previous[None]]
+        if offset:
+            lead = self.select(buffer, edges[:2], edges[2] if len(edges) > 2 else logger.total, previous)
+            parts.append(lead)
+            previous = lead[-1]
+
+        cached = self.selected
+        if len(cached):
+            parts.append(cached)
+            previous = cached[-1]
+
+        start = offset + len(cached)
+        if start < len(edges) - 1:
+            fresh = self.select(buffer, edges[start:], logger.total, previous)
+            closed = max(high // bucket - 1 - self.first - len(cached), 0)
+            self.selected = np.vstack((cached, fresh[:closed]))
+            parts.append(fresh)
+
+        parts.append(np.full((1, m), last))
+        return np.vstack(parts)
+
+def formatTime(seconds):
+    ''' Retorna `seconds` como 'm:ss' ou 'h:mm:ss'. '''
+
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{seconds:02d}'
+
+    return f'{minutes}:{seconds:02d}'
+
+class StripChart(wx.Frame):
+    ''' Uma faixa por grandeza de datalogger.KEYS, com todo o histórico do `parent.logger`. As faixas, a grade e
+    os rótulos fixos são desenhados uma vez por tamanho da janela e guardados em um bitmap. As curvas são
+    reduzidas pelo LTTB (Decimator) a cerca de um ponto por pixel de largura, então nem o custo de desenhar nem o
+    de reduzir crescem com o histórico. '''
+
+    def __init__(self, parent):
+        super().__init__(parent)
+
+        self.parent = parent
+        self.SetIcon(wx.Icon('images/icons/app_logo.ico'))
+        self.SetTitle('Gráfico da aquisição')
+        self.SetSize((800, 640))
+        self.SetMinSize((400, 360))
+
+        self.panel = wx.Panel(self)
+        self.panel.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+
+        self.ranges = None      # [(mínimo, máximo), ...] de cada grandeza, de data.json.
+        self.axes = None        # wx.Bitmap com as faixas, a grade e os rótulos fixos.
+        self.decimator = Decimator()
+        self.version = None     # Estado do logger e largura para os quais `self.samples` foi calculado.
+        self.samples = None     # (tempos, valores), (pontos, m) cada, das amostras escolhidas pelo LTTB.
+        self.height = None      # Altura das faixas para a qual `self.lines` foi calculado.
+        self.lines = []         # [[(x, y), ...], ...] de cada faixa, já reduzidos.
+        self.span = None        # (início, fim) em segundos das amostras em `self.lines`.
+
+        self.timer = wx.Timer(self)
+        self.panel.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.panel.Bind(wx.EVT_SIZE, self.OnSize)
+        self.Bind(wx.EVT_TIMER, self.OnTimer, self.timer)
+        self.Bind(wx.EVT_CLOSE, self.OnCloseWindow)
+
+        self.timer.Start(REFRESH)
+        self.CenterOnParent()
+
+    def resetAxes(self):
+        ''' Descarta as escalas e o fundo guardados, como depois de trocar de bancada. '''
+
+        self.ranges = None
+        self.axes = None
+        self.version = None
+        self.panel.Refresh()
+
+    def getRanges(self):
+        ''' Retorna a escala (mínimo, máximo) de cada grandeza: a faixa de valores de data.json, com uma folga. '''
+
+        ranges = []
+        for key in datalogger.KEYS:
+            values = [self.parent.getRPM(row[key]) if key == 'rpm' else float(row[key]) for row in self.parent.data]
+            low, high = min(values), max(values)
+            margin = (high - low) * 0.05 or 1
+            ranges.append((low - margin, high + margin))
+
+        return ranges
+
+    def getLanes(self, size):
+        ''' Retorna o wx.Rect de cada faixa para o painel com tamanho `size`. '''
+
+        left, right, top, bottom = MARGIN
+        count = len(datalogger.KEYS)
+        width = max(size.width - left - right, 1)
+        height = max((size.height - top - bottom - GAP * (count - 1)) // count, 1)
+        return [wx.Rect(left, top + i * (height + GAP), width, height) for i in range(count)]
+
+    def drawAxes(self, size):
+        ''' Desenha e guarda o fundo do gráfico para o painel com tamanho `size`. '''
+
+        if self.ranges is None:
+            self.ranges = self.getRanges()
+
+        self.axes = wx.Bitmap(size.width, size.height)
+        dc = wx.MemoryDC(self.axes)
+        dc.SetBackground(wx.Brush(BACKGROUND_COLOUR))
+        dc.Clear()
+        dc.SetFont(wx.Font(8, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        dc.SetTextForeground(TEXT_COLOUR)
+
+        for rect, name, (low, high) in zip(self.getLanes(size), self.parent.report.order, self.ranges):
+            dc.SetPen(wx.Pen(GRID_COLOUR))
+            dc.SetBrush(wx.Brush(LANE_COLOUR))
+            dc.DrawRectangle(rect)
+            for i in range(1, GRID):
+                y = rect.y + rect.height * i // GRID
+                dc.DrawLine(rect.x, y, rect.right, y)
+
+            dc.DrawText(name, rect.x + 4, rect.y + 2)
+            for value, y in ((high, rect.y), (low, rect.bottom)):
+                text = f'{value:.3g}'
+                width, height = dc.GetTextExtent(text)
+                dc.DrawText(text, rect.x - width - 6, min(max(y - height // 2, 0), rect.bottom - height))
+
+        dc.SelectObject(wx.NullBitmap)
+
+    def getSamples(self, width):
+        ''' Retorna (tempos, valores), (pontos, m) cada, das amostras que o LTTB escolhe para `width` pixels, ou None
+        se não houver o que desenhar. Também atualiza `self.span`. '''
+
+        logger = self.parent.logger
+        self.span = None
+        if logger.count < 2:
+            return None
+
+        buffer = logger.buffer
+        start = buffer[(logger.total - logger.count) % len(buffer), 0]
+        end = buffer[(logger.total - 1) % len(buffer), 0]
+        if end <= start:
+            return None
+
+        self.span = (start, end)
+        rows = self.decimator.update(logger, width) % len(buffer)
+        columns = np.arange(rows.shape[1])
+        return buffer[rows, 0], buffer[rows, columns + 1]
+
+    def getLines(self, lanes):
+        ''' Calcula as curvas de cada faixa em `lanes`. As amostras só são reduzidas de novo se houver novas ou a
+        largura tiver mudado. Se só a altura mudar, os mesmos pontos são reposicionados. '''
+
+        logger = self.parent.logger
+        version = (logger.start, logger.total, lanes[0].width)
+        if version != self.version:
+            self.version = version
+            self.samples = self.getSamples(lanes[0].width)
+            self.height = None
+
+        if lanes[0].height == self.height:
+            return
+
+        self.height = lanes[0].height
+        self.lines = []
+        if self.samples is None:
+            return
+
+        times, values = self.samples
+        start, end = self.span
+        for i, (rect, (low, high)) in enumerate(zip(lanes, self.ranges)):
+            x = rect.x + (times[:, i] - start) / (end - start) * (rect.width - 1)
+            y = rect.bottom - (values[:, i] - low) / (high - low) * (rect.height - 1)
+            points = np.column_stack((x, y)).round().astype(int)
+            self.lines.append([tuple(point) for point in points.tolist()])
+
+    def OnSize(self, event):
+        self.axes = None
+        self.panel.Refresh()
+        event.Skip()
+
+    def OnTimer(self, event):
+        ''' Redesenha apenas se houver amostras novas. '''
+
+        logger = self.parent.logger
+        if self.version is None or (logger.start, logger.total) != self.version[:2]:
+            self.panel.Refresh()
+
+    def OnPaint(self, event):
+        dc = wx.AutoBufferedPaintDC(self.panel)
+        size = self.panel.GetClientSize()
+        if self.axes is None or self.axes.GetSize() != size:
+            self.drawAxes(size)
+
+        dc.DrawBitmap(self.axes, 0, 0)
+        lanes = self.getLanes(size)
+        self.getLines(lanes)
+
+        for rect, points, colour in zip(lanes, self.lines, LINE_COLOURS):
+            dc.SetClippingRegion(rect)
+            dc.SetPen(wx.Pen(colour, 1))
+            dc.DrawLines(points)
+            dc.DestroyClippingRegion()
+
+        dc.SetFont(wx.Font(8, wx.FONTFAMILY_SWISS, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL))
+        dc.SetTextForeground(TEXT_COLOUR)
+        bottom = lanes[-1].bottom + 6
+        if self.span is None:
+            dc.DrawText('Sem amostras. Inicie a aquisição de dados pelo menu Relatório.', lanes[-1].x, bottom)
+            return
+
+        start, end = self.span
+        text = formatTime(end)
+        dc.DrawText(formatTime(start), lanes[-1].x, bottom)
+        dc.DrawText(text, lanes[-1].right - dc.GetTextExtent(text)[0], bottom)
+        text = f'{self.parent.logger.count} amostras'
+        dc.DrawText(text, lanes[-1].x + (lanes[-1].width - dc.GetTextExtent(text)[0]) // 2, bottom)
+
+    def OnCloseWindow(self, event):
+        ''' Chamada quando a janela é fechada. '''
+
+        self.timer.Stop()
+        self.parent.stripChart = None
+        self.Destroy()
@@ -0,0 +1,98 @@
+"""
+Arquivo responsável pelo registro dos sistemas (bancadas) do laboratório encontrados em `data/`.
+systems.py
+"""
+
+import os
+import json
+
+class LabSystem():
+    ''' Representa uma bancada em `data/<nome>`. Nada é lido do disco até ser pedido. '''
+
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.jsonCache = {}     # Arquivos .json já carregados, por nome.
+        self.images = None      # Paths das imagens principais, preenchido sob demanda.
+
+    def getJson(self, name):
+        ''' Carrega (uma única vez) e retorna o conteúdo de `name`.json. '''
+
+        if name not in self.jsonCache:
+            with open(f"{self.path}/{name}.json", 'r', encoding='utf-8') as f:
+                self.jsonCache[name] = json.loads(f.read())
+
+        return self.jsonCache[name]
+
+    def getImages(self):
+        ''' Retorna uma lista com os paths das imagens principais (.JPG) da bancada, em ordem. '''
+
+        if self.images is None:
+            jpgs = sorted(f for f in os.listdir(self.path) if f[-4:] == ".JPG")
+            self.images = [os.path.join(self.path, f) for f in jpgs]
+
+        return self.images[:]
+
+    def findDataIndex(self, values, hook='rpm'):
+        ''' Retorna o índice da linha de data.json correspondente aos valores dos controles, `values`
+        (lista de {'key': jsonKey, 'value': valor do widget}). A linha do `hook` é encontrada primeiro
+        e as outras chaves são procuradas a partir dela. '''
+
+        data = self.getJson('data')
+
+        # Usaremos um "anzol" para pegar todos os outros dados.
+        index = -1
+        for dic in values:
+            if dic['key'] == hook:
+                for i in range(0, len(data)):
+                    if dic['value'] == data[i][hook]:
+                        index = i
+                        break
+
+        for dic in values:
+            if dic['key'] != hook:
+                for i in range(index, len(data)):
+                    key = dic['key']
+                    if int(dic['value']) == data[i][key]:
+                        index = i
+                        break
+
+        return index
+
+    def unload(self):
+        ''' Libera tudo o que foi carregado desta bancada. '''
+
+        self.jsonCache.clear()
+        self.images = None
+
+class SystemRegistry():
+    ''' Descobre as bancadas em `root`. Apenas os nomes das pastas são lidos na inicialização. '''
+
+    def __init__(self, root='data'):
+        self.root = root
+        self.systems = []
+
+        for name in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+            path = f'{root}/{name}'
+            if os.path.isfile(f'{path}/data.json') and os.path.isfile(f'{path}/buttons.json'):
+                self.systems.append(LabSystem(path))
+
+    def __len__(self):
+        return len(self.systems)
+
+    def __iter__(self):
+        return iter(self.systems)
+
+    def get(self, name):
+        ''' Retorna a bancada `name`, ou None se ela não existir. '''
+
+        for system in self.systems:
+            if system.name == name:
+                return system
+
+        return None
+
+    def getDefault(self):
+        ''' Retorna a bancada que deve ser aberta no startup, ou None se nenhuma foi encontrada. '''
+
+        return self.systems[0] if self.systems else None
@@ -3,28 +3,12 @@ Classe responsável pelos tutoriais do programa.
 tutorial.py
 """
 
-# self.parent.canAcess[]
-# [0] -> Left Arrow
-# [1] -> Right Arrow
-# [2] -> Bomba, Zoom
-# [3] -> Motor Elétrico, Zoom
-# [4] -> Registro Esfera, Zoom
-# [5] -> Medidor de Vazão, Zoom
-# [6] -> Manovacuômetro, Zoom
-# [7] -> Manometro, Zoom
-# [8] -> Piezômetro, Zoom
-# [9] -> Registro Esfera, botao
-# [10] -> Medidor de Vazão, botão
-# [11] -> Motor Elétrico, botão
-# [12] -> Manovacuômetro, botão
-# [13] -> Manômetro, botão
-# [14] -> Piezometro, botão
-# [15] -> Acionar Motor, botão
-# [16] -> Desligar Motor, botão
+# self.parent.canAcess -> máscara permissions.Access. Os índices de `allowedClicks` estão descritos em permissions.py.
 
 import wx
-from pubsub import pub
 import settings
+import permissions
+import profiler
 
 class MainTutorial():
     def __init__(self, parent):
@@ -37,7 +21,9 @@ class MainTutorial():
         self.pos = ()
 
         self.data = self.parent.getTutorialFile('first_tutorial')
+        self.stepAccess = [permissions.fromIndices(step['allowedClicks']) for step in self.data]    # Máscara de cada passo.
 
+    @profiler.measure()
     def Notify(self, value, buttonPressed=None):
         ''' Recebe uma notificação com os valores (dict / string) do sistema quando algum for modificado. '''
 
@@ -68,7 +54,6 @@ class MainTutorial():
     def InitTutorial(self):
         ''' Inicia o tutorial. '''
 
-        self.parent.loadTutorialBitmaps()
         self.isTutorialInProgress = True
         self.parent.isTutorial = True
         self.index = 0
@@ -81,22 +66,17 @@ class MainTutorial():
 
         self.tutorialHandler()
 
-    def refreshTutorialImage(self, isJustRepositioning=False):
-        ''' Atualiza a imagem e posição em `self.index` no frame principal. '''
-
-        if not isJustRepositioning:
-            self.parent.tutorialBitmap = self.parent.mascotBitmaps[self.index]
+    def refreshTutorialImage(self):
+        ''' Atualiza a posição do mascote de `self.index`. A imagem é desenhada como camada por MainFrame.getOverlayLayers. '''
 
         self.pos = self.data[self.index]['coordinates']
 
+    @profiler.measure()
     def tutorialHandler(self):
         ''' Gerencia o progresso do tutorial a partir de `self.index`. '''
 
-        # Seta todos os cliques para False, depois apenas o que queremos para True
-        clicks = self.data[self.index]['allowedClicks']
-        pub.sendMessage('acessHandler', boolValue=False, setAll=True)
-        for i in range(0, len(clicks)):
-            pub.sendMessage('acessHandler', index=clicks[i], boolValue=True)
+        # Libera apenas os cliques permitidos neste passo.
+        self.parent.setAccess(self.stepAccess[self.index])
 
         self.refreshTutorialImage()
         self.curEquip = None
@@ -129,7 +109,7 @@ class MainTutorial():
         self.isTutorialInProgress = False
         self.parent.isEquipZoom = False
         self.parent.ctrls[2].Enable(True)
-        pub.sendMessage('acessHandler', boolValue=True, setAll=True)
+        self.parent.setAccess(permissions.Access.ALL)
 
         self.parent.frameImage(self.parent.getFirstImagePath())
         self.parent.showButtons(True)
@@ -0,0 +1,57 @@
+"""
+Arquivo responsável por guardar o estado exibido nos widgets, para que apenas os que mudaram sejam atualizados.
+viewmodel.py
+"""
+
+class ViewModel():
+    ''' Espelho do que está na tela: valores dos wx.TextCtrl, tooltips e visibilidade dos painéis.
+    Cada função compara o novo estado com o guardado em `key` e só chama o wxPython se houver diferença.
+    Retornam True quando o widget foi atualizado. '''
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        ''' Esquece tudo o que foi exibido. Deve ser chamada quando os widgets forem recriados. '''
+
+        self.values = {}        # key -> texto exibido
+        self.tooltips = {}      # key -> texto da tooltip
+        self.shown = {}         # key -> visibilidade
+
+    def setValue(self, key, ctrl, value):
+        ''' Exibe `value` em `ctrl`. '''
+
+        if self.values.get(key) == value:
+            return False
+
+        ctrl.SetValue(value)
+        self.values[key] = value
+        return True
+
+    def setTooltip(self, key, widget, text):
+        ''' Troca a tooltip de `widget` por `text`. '''
+
+        if self.tooltips.get(key) == text:
+            return False
+
+        widget.SetToolTip(text)
+        self.tooltips[key] = text
+        return True
+
+    def isShown(self, key, widget):
+        ''' Retorna se `widget` está visível. O wxPython só é consultado na primeira vez. '''
+
+        if key not in self.shown:
+            self.shown[key] = widget.IsShown()
+
+        return self.shown[key]
+
+    def setShown(self, key, widget, show):
+        ''' Mostra ou esconde `widget`. '''
+
+        if self.isShown(key, widget) == show:
+            return False
+
+        widget.Show(show)
+        self.shown[key] = show
+        return True
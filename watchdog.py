@@ -0,0 +1,89 @@
+"""
+Arquivo responsável por detectar travamentos da interface e registrar onde a thread principal estava parada.
+watchdog.py
+"""
+
+import sys
+import time
+import logging
+import threading
+import traceback
+import profiler
+
+DEFAULT_THRESHOLD = 500     # ms sem heartbeat para considerar a UI travada.
+MAX_SAMPLES = 10            # Amostras de pilha registradas por travamento.
+
+class Watchdog():
+    ''' Thread que confere se o loop principal do wx continua chamando `beat()`. Se passar de `threshold` ms
+    sem heartbeat, registra a pilha da thread principal (via sys._current_frames) e o último evento tratado. '''
+
+    def __init__(self, logPath, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.lastBeat = time.monotonic()
+        self.mainThreadId = threading.main_thread().ident
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+        self.logger = logging.getLogger('labvirtual.watchdog')
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = logging.FileHandler(logPath, encoding='utf-8', delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.logger.addHandler(handler)
+
+    def start(self):
+        ''' Começa a vigiar. '''
+
+        if self.thread:
+            return
+
+        self.beat()
+        self.stopEvent = threading.Event()      # Um por thread, para uma thread parada não voltar com o próximo start().
+        self.thread = threading.Thread(target=self.watch, args=(self.stopEvent,), name='watchdog', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        ''' Para de vigiar. start() volta a vigiar. '''
+
+        self.stopEvent.set()
+        self.thread = None
+
+    def beat(self):
+        ''' Chamada pela thread principal para dizer que o loop do wx está vivo. '''
+
+        self.lastBeat = time.monotonic()
+
+    def setThreshold(self, threshold):
+        ''' Muda o limite, em ms. Com 0 não há amostras: quem usa o watchdog deve chamar stop(). '''
+
+        self.threshold = threshold
+
+    def getBeatInterval(self):
+        ''' Retorna de quanto em quanto tempo (ms) a thread principal deve chamar `beat()`. '''
+
+        return max(int(self.threshold or DEFAULT_THRESHOLD) // 4, 20)
+
+    def watch(self, stopEvent):
+        ''' Laço da thread do watchdog, até `stopEvent`. '''
+
+        samples = 0
+        while not stopEvent.wait(self.getBeatInterval() / 1000):
+            stalled = (time.monotonic() - self.lastBeat) * 1000
+            if not self.threshold or stalled < self.threshold:
+                samples = 0
+                continue
+
+            # Uma amostra a cada `threshold` ms de travamento, para ver se a pilha muda.
+            if samples < MAX_SAMPLES and stalled >= self.threshold * (samples + 1):
+                samples += 1
+                self.sample(stalled, samples)
+
+    def sample(self, stalled, number):
+        ''' Registra a pilha atual da thread principal. '''
+
+        frame = sys._current_frames().get(self.mainThreadId)
+        stack = ''.join(traceback.format_stack(frame)) if frame else '(pilha indisponível)\n'
+
+        event = profiler.lastEvent or 'nenhum'
+        self.logger.warning(f'UI sem resposta há {stalled:.0f} ms, amostra {number}. Último evento: {event}\n{stack}')